@@ -40,8 +40,12 @@ class AlertManager:
             },
         )
 
-    def send_alerts(self, results: Dict[str, Any]) -> None:
-        """Send alerts based on test results"""
+    def send_alerts(self, results: Dict[str, Any], individual: bool = True) -> None:
+        """Send alerts based on test results
+
+        With individual=False, only the summary alert is sent (the critical
+        failures were already alerted with send_critical_alerts).
+        """
 
         try:
             # Determine alert severity and type
@@ -52,7 +56,7 @@ class AlertManager:
                 return
 
             # Send individual alerts for critical failures
-            if alert_info["critical_failures"]:
+            if individual and alert_info["critical_failures"]:
                 self._send_individual_alerts(alert_info["critical_failures"], results)
 
             # Send summary alert
@@ -62,6 +66,17 @@ class AlertManager:
         except Exception as e:
             logging.error(f"Failed to send alerts: {str(e)}")
 
+    def send_critical_alerts(self, results: Dict[str, Any]) -> None:
+        """Send the individual alerts of the critical failures in partial results"""
+        try:
+            critical_failures = self._analyze_results_for_alerting(results)[
+                "critical_failures"
+            ]
+            if len(critical_failures) >= self.thresholds["critical_failure_threshold"]:
+                self._send_individual_alerts(critical_failures, results)
+        except Exception as e:
+            logging.error(f"Failed to send alerts: {str(e)}")
+
     def _analyze_results_for_alerting(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze results to determine what alerts to send"""
 
@@ -205,7 +220,7 @@ class AlertManager:
             "medium_failures": len(alert_info["medium_failures"]),
             "failure_rate": alert_info["failure_rate"],
             "execution_duration": results.get("execution_duration", 0),
-            "model_count": len(results.get("models", {})),
+            "model_count": results.get("total_models", len(results.get("models", {}))),
             "failure_details": failure_details,
         }
 
@@ -72,6 +72,39 @@ def init(project_name: str, profile_template: str):
     type=int,
     help="Number of parallel threads",
 )
+@click.option(
+    "--max-bytes",
+    type=int,
+    help="Byte budget for the run (BigQuery, Snowflake)",
+)
+@click.option(
+    "--max-cost",
+    type=float,
+    help="Planner cost budget for the run (PostgreSQL, Redshift)",
+)
+@click.option(
+    "--budget-action",
+    default="skip",
+    type=click.Choice(["skip", "sample"]),
+    help="What to do with the tests over budget",
+)
+@click.option(
+    "--level2-processes",
+    default=0,
+    type=int,
+    help="Worker processes computing Level 2 analyses (0: in the threads)",
+)
+@click.option(
+    "--granularity",
+    default="model",
+    type=click.Choice(["model", "test"]),
+    help="Unit of work spread over the threads",
+)
+@click.option(
+    "--resume",
+    metavar="RUN_ID",
+    help="Resume an interrupted run, running only its tests not journaled",
+)
 def run(
     models: tuple,
     level: str,
@@ -80,6 +113,12 @@ def run(
     project_dir: str,
     fail_fast: bool,
     threads: int,
+    max_bytes: int,
+    max_cost: float,
+    budget_action: str,
+    level2_processes: int,
+    granularity: str,
+    resume: str,
 ):
     """Run 2QC+ quality tests"""
     try:
@@ -97,6 +136,12 @@ def run(
             level=level,
             fail_fast=fail_fast,
             threads=threads,
+            max_bytes=max_bytes,
+            max_cost=max_cost,
+            budget_action=budget_action,
+            level2_processes=level2_processes,
+            granularity=granularity,
+            resume=resume,
         )
 
         # Display results
@@ -116,6 +161,61 @@ def run(
         sys.exit(1)
 
 
+@cli.command()
+@click.option(
+    "--models",
+    multiple=True,
+    help="Specific models to plan (default: all)",
+)
+@click.option(
+    "--level",
+    type=click.Choice(["1", "2", "all"]),
+    default="all",
+    help="Quality control level to plan",
+)
+@click.option("--target", default="dev", help="Target environment")
+@click.option(
+    "--profiles-dir",
+    default=".",
+    help="Directory containing profiles.yml",
+)
+@click.option("--project-dir", default=".", help="Project directory")
+def plan(
+    models: tuple, level: str, target: str, profiles_dir: str, project_dir: str
+):
+    """Estimate the cost of each test without running it"""
+    try:
+        project = QC2PlusProject.load_project(project_dir)
+        click.echo(f"🔍 Planning 2QC+ for project: {project.name}")
+
+        runner = QC2PlusRunner(project, target, profiles_dir)
+        entries = runner.plan(models=list(models) if models else None, level=level)
+
+        click.echo(
+            f"{'#':>3}  {'MODEL':<25} {'TEST':<35} {'LEVEL':<7} "
+            f"{'BYTES':>10} {'COST':>12}"
+        )
+        for rank, entry in enumerate(entries, start=1):
+            cost = f"{entry['cost']:,.0f}" if entry["cost"] is not None else "-"
+            click.echo(
+                f"{rank:>3}  {entry['model']:<25} {entry['test']:<35} "
+                f"{entry['level']:<7} {_format_bytes(entry['bytes']):>10} {cost:>12}"
+            )
+            if entry.get("error"):
+                click.echo(f"     └─ {entry['error']}")
+
+        total_bytes = sum(entry["bytes"] or 0 for entry in entries)
+        total_cost = sum(entry["cost"] or 0 for entry in entries)
+        click.echo(
+            f"📊 {len(entries)} tests - total: {_format_bytes(total_bytes)}, "
+            f"cost {total_cost:,.0f}"
+        )
+
+    except Exception as e:
+        click.echo(f"❌ Error planning tests: {str(e)}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.option("--target", default="dev", help="Target environment")
 @click.option(
@@ -213,6 +313,16 @@ def list_models(project_dir: str, output_format: str):
         sys.exit(1)
 
 
+def _format_bytes(num_bytes) -> str:
+    """Human-readable byte count"""
+    if num_bytes is None:
+        return "-"
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if num_bytes < 1024 or unit == "TB":
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes:.0f} B"
+        num_bytes /= 1024
+
+
 def _display_results(results: dict):
     """Display test results in a formatted way"""
     # click.echo("\n" + "="*40)
@@ -236,14 +346,24 @@ def _display_results(results: dict):
     # Detailed results by model
     for model_name, model_results in results.get("models", {}).items():
         click.echo(f"\n📋 Model: {model_name}")
+        if model_results.get("status") == "skipped":
+            click.echo(f"  ⏭️ {model_results.get('message', 'Skipped')}")
         # click.echo("-" * 40)
 
         # Level 1 results
         if model_results.get("level1"):
             click.echo("  Level 1 (Business Rules):")
             for test_name, test_result in model_results["level1"].items():
-                status = "✅" if test_result["passed"] else "❌"
-                click.echo(f"    {status} {test_name}")
+                if test_result.get("status") == "timeout":
+                    status = "⏱️"
+                elif test_result.get("status") == "skipped":
+                    status = "⏭️"
+                elif test_result.get("status") == "cancelled":
+                    status = "🛑"
+                else:
+                    status = "✅" if test_result["passed"] else "❌"
+                cached = " ♻️ (cached)" if test_result.get("cached") else ""
+                click.echo(f"    {status} {test_name}{cached}")
                 if not test_result["passed"] and "message" in test_result:
                     click.echo(f"      └─ {test_result['message']}")
 
@@ -251,9 +371,17 @@ def _display_results(results: dict):
         if model_results.get("level2"):
             click.echo("  Level 2 (ML Anomalies):")
             for analyzer_name, analyzer_result in model_results["level2"].items():
-                status = "✅" if analyzer_result["passed"] else "⚠️"
+                if analyzer_result.get("status") == "skipped":
+                    status = "⏭️"
+                elif analyzer_result.get("status") == "cancelled":
+                    status = "🛑"
+                else:
+                    status = "✅" if analyzer_result["passed"] else "⚠️"
                 anomalies = analyzer_result.get("anomalies_count", 0)
-                click.echo(f"    {status} {analyzer_name} ({anomalies} anomalies)")
+                cached = " ♻️ (cached)" if analyzer_result.get("cached") else ""
+                click.echo(
+                    f"    {status} {analyzer_name} ({anomalies} anomalies){cached}"
+                )
 
 
 def main():
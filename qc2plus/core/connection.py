@@ -1,16 +1,70 @@
 """
 2QC+ Database Connection Manager (CORRIGÉ FINAL)
-Supports PostgreSQL, Snowflake, BigQuery, Redshift
+Supports PostgreSQL, Snowflake, BigQuery, Redshift, DuckDB (local files)
 """
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, Optional
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
+from qc2plus.sql.db_functions import DB_FUNCTIONS
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query was cancelled by the server after its timeout"""
+
+
+class QueryCancelledError(Exception):
+    """Raised when a query was cancelled by cancel_running_queries (fail-fast)"""
+
+
+# Error fragments reported by the backends when a statement hits its timeout
+TIMEOUT_ERROR_MARKERS = (
+    "statement timeout",  # PostgreSQL / Redshift
+    "000630",  # Snowflake STATEMENT_TIMEOUT_IN_SECONDS
+    "reached its statement or warehouse timeout",
+    "job timed out",  # BigQuery job_timeout_ms
+)
+
+
+# Passes of cancel_running_queries over the queries still in flight, and the
+# delay between two passes
+CANCEL_ATTEMPTS = 3
+CANCEL_RETRY_SECONDS = 0.5
+
+# Concurrent queries of aexecute_query (and connections of the PostgreSQL
+# asyncio engine) when the target does not set max_concurrent_queries
+DEFAULT_ASYNC_QUERIES = 20
+
+# First and longest delay between two status checks of a BigQuery or
+# Snowflake job awaited by aexecute_query
+ASYNC_POLL_MIN_SECONDS = 0.1
+ASYNC_POLL_MAX_SECONDS = 2.0
+
+# Total cost of the top node of a PostgreSQL/Redshift EXPLAIN plan
+EXPLAIN_COST_PATTERN = re.compile(r"cost=[\d.]+\.\.([\d.]+)")
+
+# Output columns of the Level 1 tests that can be batched into one statement
+BATCH_RESULT_COLUMNS = (
+    "column_name",
+    "failed_rows",
+    "total_rows",
+    "message",
+    "invalid_examples",
+)
+
 
 class ConnectionManager:
     """Manages database connections for multiple database types"""
@@ -24,6 +78,31 @@ class ConnectionManager:
         self.quality_db_type: Optional[str] = None
         self._closed = False
 
+        # Run-scoped table statistics cache, keyed by (schema, table)
+        self._table_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._table_stats_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._table_stats_lock = threading.Lock()
+
+        # Tables created for the current run: model samples (keyed by model)
+        # and reference key-sets (keyed by (table, column))
+        self._run_tables: List[str] = []
+        self._materialized_samples: Dict[str, str] = {}
+        self._reference_key_sets: Dict[Tuple[str, str], str] = {}
+        self._reference_key_set_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._run_tables_lock = threading.Lock()
+
+        # Data source queries in flight, with what is needed to cancel them on
+        # the server, and whether the run was cancelled (fail-fast)
+        self._running_queries: Dict[int, Dict[str, Any]] = {}
+        self._running_queries_lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+        # asyncio engine of aexecute_query (False when asyncpg is missing),
+        # its query slots and the BigQuery client of the awaited jobs
+        self._async_engine: Any = None
+        self._async_query_slots: Optional[asyncio.Semaphore] = None
+        self._bigquery_client: Any = None
+
         # Get target configuration
         profile_name = list(profiles.keys())[0]
         profile = profiles[profile_name]
@@ -47,6 +126,41 @@ class ConnectionManager:
             self.db_type = self.target_config["type"]
             self.quality_db_type = self.target_config["type"]
 
+        # `parquet` is the DuckDB adapter reading local files
+        if self.db_type == "parquet":
+            self.db_type = "duckdb"
+        if self.quality_db_type == "parquet":
+            self.quality_db_type = "duckdb"
+
+        # Cap on in-flight data source queries for this target (back-pressure
+        # for concurrent tests). None means unlimited.
+        self.max_concurrent_queries = self.target_config.get(
+            "max_concurrent_queries", self.data_config.get("max_concurrent_queries")
+        )
+        self._query_slots = (
+            threading.BoundedSemaphore(self.max_concurrent_queries)
+            if self.max_concurrent_queries
+            else None
+        )
+
+        # Cap on the tests of one table running at the same time when tests
+        # are scheduled individually (None: unlimited)
+        self.max_concurrent_per_table = self.target_config.get(
+            "max_concurrent_per_table",
+            self.data_config.get("max_concurrent_per_table"),
+        )
+
+        # Default query timeout of the target, overridable per model and test
+        self.timeout_seconds = self.target_config.get(
+            "timeout_seconds", self.data_config.get("timeout_seconds")
+        )
+
+        # Number of small test queries combined into one statement (0: off)
+        self.batch_size = int(
+            self.target_config.get("batch_size", self.data_config.get("batch_size"))
+            or 0
+        )
+
         # Initialize connections
         self._create_engines()
 
@@ -115,6 +229,8 @@ class ConnectionManager:
             return self._create_bigquery_engine(config)
         elif db_type == "redshift":
             return self._create_redshift_engine(config)
+        elif db_type in ("duckdb", "parquet"):
+            return self._create_duckdb_engine(config)
         else:
             raise ValueError(f"Unsupported database type: {db_type}")
 
@@ -123,21 +239,456 @@ class ConnectionManager:
         query: str,
         params: Optional[Dict[str, Any]] = None,
         use_data_source: bool = True,
+        timeout_seconds: Optional[float] = None,
     ) -> pd.DataFrame:
-        """Execute a query and return results as DataFrame"""
+        """Execute a query and return results as DataFrame
+
+        Data source queries are bounded by timeout_seconds (or the target
+        default), enforced by the backend so that the query is cancelled on
+        the server. QueryTimeoutError is raised when the timeout is reached.
+        """
+        slots = self._query_slots if use_data_source else None
+        if timeout_seconds is None and use_data_source:
+            timeout_seconds = self.timeout_seconds
+
         try:
             engine = self.data_engine if use_data_source else self.quality_engine
-            with engine.connect() as conn:
-                if params:
-                    clean_params = json.loads(json.dumps(params, default=str))
+            db_type = self.db_type if use_data_source else self.quality_db_type
+            clean_params = (
+                json.loads(json.dumps(params, default=str)) if params else None
+            )
+            with slots or nullcontext(), engine.connect() as conn, (
+                self._track_query(conn, db_type) if use_data_source else nullcontext()
+            ) as handle:
+                if db_type == "bigquery" and handle and not clean_params:
+                    # Labelled job, so that it can be found and cancelled
+                    return self._read_bigquery(
+                        conn, query, timeout_seconds, {"qc2plus_query": handle["label"]}
+                    )
+                if timeout_seconds:
+                    return self._read_sql_with_timeout(
+                        conn, query, clean_params, db_type, timeout_seconds
+                    )
+                if clean_params:
                     return pd.read_sql(text(query), conn, params=clean_params)
                 else:
 
                     return pd.read_sql(text(query), conn)
         except Exception as e:
+            if use_data_source and self._cancel_event.is_set():
+                raise QueryCancelledError("Query cancelled (fail-fast)") from e
+            if timeout_seconds and self._is_timeout_error(e):
+                logging.error(f"Query cancelled after {timeout_seconds}s timeout")
+                raise QueryTimeoutError(
+                    f"Query exceeded timeout of {timeout_seconds}s"
+                ) from e
             logging.error(f"Query execution failed: {str(e)}")
             raise
 
+    def _read_sql_with_timeout(
+        self,
+        conn,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        db_type: str,
+        timeout_seconds: float,
+    ) -> pd.DataFrame:
+        """Run a query under the backend's own statement timeout"""
+        timeout_ms = int(timeout_seconds * 1000)
+
+        if db_type == "postgresql":
+            # SET LOCAL only lasts for the transaction, pooled connections
+            # are left untouched
+            with conn.begin():
+                conn.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+                return pd.read_sql(text(query), conn, params=params)
+
+        if db_type == "redshift":
+            try:
+                with conn.begin():
+                    conn.execute(text(f"SET statement_timeout TO {timeout_ms}"))
+                    return pd.read_sql(text(query), conn, params=params)
+            finally:
+                with conn.begin():
+                    conn.execute(text("RESET statement_timeout"))
+
+        if db_type == "snowflake":
+            try:
+                conn.execute(
+                    text(
+                        "ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = "
+                        f"{max(int(timeout_seconds), 1)}"
+                    )
+                )
+                return pd.read_sql(text(query), conn, params=params)
+            finally:
+                conn.execute(text("ALTER SESSION UNSET STATEMENT_TIMEOUT_IN_SECONDS"))
+
+        if db_type == "bigquery" and not params:
+            return self._read_bigquery(conn, query, timeout_seconds)
+
+        if db_type == "duckdb":
+            # In-process database: the query is interrupted from a timer
+            dbapi_connection = conn.connection.dbapi_connection
+            timer = threading.Timer(timeout_seconds, dbapi_connection.interrupt)
+            timer.start()
+            try:
+                with conn.begin():
+                    return pd.read_sql(text(query), conn, params=params)
+            except Exception as e:
+                if not timer.is_alive():
+                    raise QueryTimeoutError(
+                        f"Query exceeded timeout of {timeout_seconds}s"
+                    ) from e
+                raise
+            finally:
+                timer.cancel()
+
+        logging.warning(
+            f"Query timeouts are not supported for {db_type}, running without timeout"
+        )
+        return pd.read_sql(text(query), conn, params=params)
+
+    @staticmethod
+    def _read_bigquery(
+        conn,
+        query: str,
+        timeout_seconds: Optional[float] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Run a BigQuery job with a timeout and labels"""
+        from google.cloud.bigquery import QueryJobConfig
+
+        # The job is cancelled by BigQuery once job_timeout_ms is reached
+        job_config = QueryJobConfig(labels=labels or {})
+        if timeout_seconds:
+            job_config.job_timeout_ms = int(timeout_seconds * 1000)
+
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(query, job_config=job_config)
+            columns = [column[0] for column in cursor.description or []]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _track_query(self, conn, db_type: str):
+        """Register the query about to run on `conn` until it returns"""
+        dbapi_connection = conn.connection.dbapi_connection
+        if db_type in ("postgresql", "redshift"):
+            get_backend_pid = getattr(dbapi_connection, "get_backend_pid", None)
+            if get_backend_pid:
+                pid = get_backend_pid()
+            else:
+                # Outside of the SQLAlchemy transaction of the query
+                cursor = dbapi_connection.cursor()
+                cursor.execute("SELECT pg_backend_pid()")
+                pid = cursor.fetchone()[0]
+                cursor.close()
+            handle = {"pid": pid}
+        elif db_type == "snowflake":
+            handle = {"session_id": dbapi_connection.session_id}
+        elif db_type == "bigquery":
+            handle = {"client": dbapi_connection._client, "label": uuid.uuid4().hex}
+        else:
+            handle = {"connection": dbapi_connection}
+        handle["db_type"] = db_type
+
+        key = id(handle)
+        with self._running_queries_lock:
+            self._running_queries[key] = handle
+        try:
+            # Queries starting after a cancellation do not run
+            if self._cancel_event.is_set():
+                raise QueryCancelledError("Run cancelled (fail-fast)")
+            yield handle
+        finally:
+            with self._running_queries_lock:
+                self._running_queries.pop(key, None)
+
+    def cancel_running_queries(self) -> int:
+        """
+        Cancel the data source queries in flight on the server, and make the
+        next ones fail, until reset_cancellation() is called.
+
+        Used by fail-fast: PostgreSQL/Redshift `pg_cancel_backend`, Snowflake
+        `SYSTEM$CANCEL_ALL_QUERIES` on the query's session, BigQuery
+        `jobs.cancel` on the labelled job, DuckDB `interrupt()`. The queries
+        raise QueryCancelledError. Returns the number of queries cancelled.
+        """
+        self._cancel_event.set()
+
+        cancelled = set()
+        for attempt in range(CANCEL_ATTEMPTS):
+            with self._running_queries_lock:
+                handles = dict(self._running_queries)
+            if not handles:
+                break
+            if attempt:
+                # A query registered just before its execution started
+                # ignores the cancellation: cancel it again
+                time.sleep(CANCEL_RETRY_SECONDS)
+                with self._running_queries_lock:
+                    handles = dict(self._running_queries)
+
+            for key, handle in handles.items():
+                try:
+                    self._cancel_query(handle)
+                    cancelled.add(key)
+                except Exception as e:
+                    logging.warning(f"Could not cancel a running query: {str(e)}")
+
+        logging.info(f"Cancelled {len(cancelled)} running queries")
+        return len(cancelled)
+
+    def _cancel_query(self, handle: Dict[str, Any]) -> None:
+        """Cancel one in-flight query on the server"""
+        db_type = handle["db_type"]
+        if db_type in ("postgresql", "redshift"):
+            with self.data_engine.connect() as conn:
+                conn.execute(
+                    text("SELECT pg_cancel_backend(:pid)"), {"pid": handle["pid"]}
+                )
+        elif db_type == "snowflake":
+            # The session runs nothing but this query
+            with self.data_engine.connect() as conn:
+                conn.execute(
+                    text("SELECT SYSTEM$CANCEL_ALL_QUERIES(:session_id)"),
+                    {"session_id": handle["session_id"]},
+                )
+        elif db_type == "bigquery":
+            client = handle["client"]
+            for job in client.list_jobs(state_filter="running"):
+                if (job.labels or {}).get("qc2plus_query") == handle["label"]:
+                    client.cancel_job(job.job_id, location=job.location)
+        else:
+            handle["connection"].interrupt()
+
+    @property
+    def run_cancelled(self) -> bool:
+        """Whether cancel_running_queries() was called since the last reset"""
+        return self._cancel_event.is_set()
+
+    def reset_cancellation(self) -> None:
+        """Allow queries to run again after cancel_running_queries()"""
+        self._cancel_event.clear()
+
+    @staticmethod
+    def _is_timeout_error(error: Exception) -> bool:
+        """Check whether an error was raised by a server-side statement timeout"""
+        message = f"{type(error).__name__} {error}".lower()
+        orig = getattr(error, "orig", None)
+        if orig is not None:
+            message += f" {type(orig).__name__} {orig}".lower()
+        return any(marker in message for marker in TIMEOUT_ERROR_MARKERS)
+
+    async def aexecute_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Execute a data source query from a coroutine, without holding a thread
+
+        PostgreSQL queries run on SQLAlchemy's asyncio engine (asyncpg).
+        BigQuery and Snowflake queries are submitted as jobs, then polled.
+        Other backends (and parametrized BigQuery/Snowflake queries) run
+        execute_query in the default thread pool. Timeouts and fail-fast
+        raise QueryTimeoutError and QueryCancelledError as in execute_query,
+        and cancelling the awaiting task cancels the query on the server.
+        """
+        if timeout_seconds is None:
+            timeout_seconds = self.timeout_seconds
+        if self._cancel_event.is_set():
+            raise QueryCancelledError("Run cancelled (fail-fast)")
+
+        native = (
+            self.db_type == "postgresql" and self._get_async_engine()
+        ) or (self.db_type in ("bigquery", "snowflake") and not params)
+        if not native:
+            return await asyncio.to_thread(
+                self.execute_query, query, params, True, timeout_seconds
+            )
+
+        if self._async_query_slots is None:
+            self._async_query_slots = asyncio.Semaphore(
+                self.max_concurrent_queries or DEFAULT_ASYNC_QUERIES
+            )
+        try:
+            async with self._async_query_slots:
+                if self.db_type == "postgresql":
+                    return await self._aread_postgresql(query, params, timeout_seconds)
+                if self.db_type == "bigquery":
+                    return await self._aread_bigquery(query, timeout_seconds)
+                return await self._aread_snowflake(query, timeout_seconds)
+        except (QueryTimeoutError, QueryCancelledError):
+            raise
+        except Exception as e:
+            if self._cancel_event.is_set():
+                raise QueryCancelledError("Query cancelled (fail-fast)") from e
+            if timeout_seconds and self._is_timeout_error(e):
+                logging.error(f"Query cancelled after {timeout_seconds}s timeout")
+                raise QueryTimeoutError(
+                    f"Query exceeded timeout of {timeout_seconds}s"
+                ) from e
+            logging.error(f"Query execution failed: {str(e)}")
+            raise
+
+    def _get_async_engine(self) -> Any:
+        """SQLAlchemy asyncio engine of the PostgreSQL data source, if available"""
+        if self._async_engine is None:
+            try:
+                import asyncpg  # noqa: F401
+                from sqlalchemy.ext.asyncio import create_async_engine
+            except ImportError:
+                logging.warning(
+                    "Async PostgreSQL support requires additional dependencies "
+                    "(pip install qc2plus[async]), running queries in threads"
+                )
+                self._async_engine = False
+                return None
+            self._async_engine = create_async_engine(
+                self.data_engine.url.set(drivername="postgresql+asyncpg"),
+                pool_size=self.max_concurrent_queries or DEFAULT_ASYNC_QUERIES,
+                max_overflow=0,
+            )
+        return self._async_engine or None
+
+    async def _aread_postgresql(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        timeout_seconds: Optional[float],
+    ) -> pd.DataFrame:
+        """Run a query on the asyncio engine (asyncpg)"""
+        clean_params = json.loads(json.dumps(params, default=str)) if params else {}
+        async with self._async_engine.connect() as conn, conn.begin():
+            if timeout_seconds:
+                await conn.execute(
+                    text(f"SET LOCAL statement_timeout = {int(timeout_seconds * 1000)}")
+                )
+            result = await conn.execute(text(query), clean_params)
+            return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    async def _aread_bigquery(
+        self, query: str, timeout_seconds: Optional[float]
+    ) -> pd.DataFrame:
+        """Submit a BigQuery job and poll it until it is done"""
+        from google.cloud.bigquery import QueryJobConfig
+
+        if self._bigquery_client is None:
+            with self.data_engine.connect() as conn:
+                self._bigquery_client = conn.connection.dbapi_connection._client
+
+        job_config = QueryJobConfig()
+        if timeout_seconds:
+            job_config.job_timeout_ms = int(timeout_seconds * 1000)
+        job = await asyncio.to_thread(
+            self._bigquery_client.query, query, job_config=job_config
+        )
+        await self._apoll_job(lambda: not job.done(), job.cancel, timeout_seconds)
+
+        def fetch() -> pd.DataFrame:
+            rows = job.result()
+            return pd.DataFrame(
+                [tuple(row.values()) for row in rows],
+                columns=[field.name for field in rows.schema],
+            )
+
+        return await asyncio.to_thread(fetch)
+
+    async def _aread_snowflake(
+        self, query: str, timeout_seconds: Optional[float]
+    ) -> pd.DataFrame:
+        """Submit a Snowflake query asynchronously and poll it until it is done"""
+
+        def submit() -> str:
+            connection = self.data_engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute_async(query)
+                return cursor.sfqid
+            finally:
+                connection.close()
+
+        def is_running(query_id: str) -> bool:
+            connection = self.data_engine.raw_connection()
+            try:
+                snowflake_connection = connection.dbapi_connection
+                return snowflake_connection.is_still_running(
+                    snowflake_connection.get_query_status_throw_if_error(query_id)
+                )
+            finally:
+                connection.close()
+
+        def cancel(query_id: str) -> None:
+            with self.data_engine.connect() as conn:
+                conn.execute(
+                    text("SELECT SYSTEM$CANCEL_QUERY(:query_id)"),
+                    {"query_id": query_id},
+                )
+
+        def fetch(query_id: str) -> pd.DataFrame:
+            connection = self.data_engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.get_results_from_sfqid(query_id)
+                # Case-insensitive names are lowercased, as by the SQLAlchemy
+                # dialect of execute_query
+                columns = [
+                    column[0].lower() if column[0].isupper() else column[0]
+                    for column in cursor.description or []
+                ]
+                return pd.DataFrame(cursor.fetchall(), columns=columns)
+            finally:
+                connection.close()
+
+        query_id = await asyncio.to_thread(submit)
+        await self._apoll_job(
+            lambda: is_running(query_id), lambda: cancel(query_id), timeout_seconds
+        )
+        return await asyncio.to_thread(fetch, query_id)
+
+    async def _apoll_job(
+        self,
+        is_running: Callable[[], bool],
+        cancel: Callable[[], None],
+        timeout_seconds: Optional[float],
+    ) -> None:
+        """
+        Wait for a job running on the server, checking its status with a
+        growing delay. The job is cancelled on the server on timeout, on
+        fail-fast (cancel_running_queries) and when the awaiting task is
+        cancelled.
+        """
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        delay = ASYNC_POLL_MIN_SECONDS
+        try:
+            while await asyncio.to_thread(is_running):
+                if self._cancel_event.is_set():
+                    raise QueryCancelledError("Query cancelled (fail-fast)")
+                if deadline and time.monotonic() >= deadline:
+                    logging.error(f"Query cancelled after {timeout_seconds}s timeout")
+                    raise QueryTimeoutError(
+                        f"Query exceeded timeout of {timeout_seconds}s"
+                    )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, ASYNC_POLL_MAX_SECONDS)
+        except (Exception, asyncio.CancelledError):
+            try:
+                await asyncio.to_thread(cancel)
+            except Exception as e:
+                logging.warning(f"Could not cancel a running query: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        """Dispose of the asyncio engine and query slots of aexecute_query"""
+        if self._async_engine:
+            await self._async_engine.dispose()
+            self._async_engine = None
+        self._async_query_slots = None
+
     def execute_sql(
         self,
         sql: str,
@@ -258,6 +809,55 @@ class ConnectionManager:
                 target_environment VARCHAR(50)
             ) """
 
+        # Table 4: quality_incremental_state (high-water marks of incremental tests)
+        quality_incremental_state_sql = f"""
+            CREATE TABLE IF NOT EXISTS {schema}.quality_incremental_state (
+                model_name VARCHAR(255) NOT NULL,
+                test_name VARCHAR(255) NOT NULL,
+                target_environment VARCHAR(50) NOT NULL,
+                watermark_column VARCHAR(255) NOT NULL,
+                high_water_mark TEXT,
+                config_hash VARCHAR(255),
+                failed_rows INTEGER,
+                total_rows INTEGER,
+                last_full_refresh TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) """
+
+        # Table 5: quality_metric_snapshots (daily values of statistical_threshold)
+        quality_metric_snapshots_sql = f"""
+            CREATE TABLE IF NOT EXISTS {schema}.quality_metric_snapshots (
+                model_name VARCHAR(255) NOT NULL,
+                test_name VARCHAR(255) NOT NULL,
+                target_environment VARCHAR(50) NOT NULL,
+                metric_date DATE NOT NULL,
+                metric_value DOUBLE PRECISION,
+                config_hash VARCHAR(255),
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) """
+
+        # Table 6: quality_result_cache (results reused while a table is unchanged)
+        quality_result_cache_sql = f"""
+            CREATE TABLE IF NOT EXISTS {schema}.quality_result_cache (
+                model_name VARCHAR(255) NOT NULL,
+                target_environment VARCHAR(50) NOT NULL,
+                level VARCHAR(10) NOT NULL,
+                fingerprint VARCHAR(255) NOT NULL,
+                results TEXT,
+                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) """
+
+        # Table 7: quality_run_journal (completed tests of a run, to resume it)
+        quality_run_journal_sql = f"""
+            CREATE TABLE IF NOT EXISTS {schema}.quality_run_journal (
+                run_id VARCHAR(255) NOT NULL,
+                model_name VARCHAR(255) NOT NULL,
+                level VARCHAR(10) NOT NULL,
+                test_name VARCHAR(255) NOT NULL,
+                result TEXT,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) """
+
         # Adapt SQL for BigQuery
         if self.quality_db_type == "bigquery":
             quality_test_results_sql = self._adapt_sql_for_bigquery(
@@ -267,6 +867,18 @@ class ConnectionManager:
                 quality_run_summary_sql
             )
             quality_anomalies_sql = self._adapt_sql_for_bigquery(quality_anomalies_sql)
+            quality_incremental_state_sql = self._adapt_sql_for_bigquery(
+                quality_incremental_state_sql
+            )
+            quality_metric_snapshots_sql = self._adapt_sql_for_bigquery(
+                quality_metric_snapshots_sql
+            )
+            quality_result_cache_sql = self._adapt_sql_for_bigquery(
+                quality_result_cache_sql
+            )
+            quality_run_journal_sql = self._adapt_sql_for_bigquery(
+                quality_run_journal_sql
+            )
 
         try:
             with self.quality_engine.begin() as conn:
@@ -276,6 +888,10 @@ class ConnectionManager:
                 conn.execute(text(quality_test_results_sql))
                 conn.execute(text(quality_run_summary_sql))
                 conn.execute(text(quality_anomalies_sql))
+                conn.execute(text(quality_incremental_state_sql))
+                conn.execute(text(quality_metric_snapshots_sql))
+                conn.execute(text(quality_result_cache_sql))
+                conn.execute(text(quality_run_journal_sql))
             logging.info(
                 f"Quality monitoring tables created successfully in schema: {schema}"
             )
@@ -283,6 +899,255 @@ class ConnectionManager:
             logging.error(f"Failed to create quality tables: {str(e)}")
             raise
 
+    def get_incremental_state(
+        self, model_name: str, test_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get the stored high-water mark and counts of an incremental test"""
+        schema = self.quality_config.get("schema", "public")
+        query = f"""
+            SELECT watermark_column, high_water_mark, config_hash,
+                   failed_rows, total_rows, last_full_refresh
+            FROM {schema}.quality_incremental_state
+            WHERE model_name = :model_name
+            AND test_name = :test_name
+            AND target_environment = :target
+        """
+        df = self.execute_query(
+            query,
+            {"model_name": model_name, "test_name": test_name, "target": self.target},
+            use_data_source=False,
+        )
+        if df.empty:
+            return None
+
+        state = df.iloc[0].to_dict()
+        # High-water marks are stored as JSON to keep numbers numeric
+        state["high_water_mark"] = (
+            json.loads(state["high_water_mark"])
+            if state["high_water_mark"] is not None
+            else None
+        )
+        return state
+
+    def save_incremental_state(
+        self, model_name: str, test_name: str, state: Dict[str, Any]
+    ) -> None:
+        """Store the high-water mark and counts of an incremental test"""
+        schema = self.quality_config.get("schema", "public")
+        key = {"model_name": model_name, "test_name": test_name, "target": self.target}
+        record = {
+            **key,
+            "watermark_column": state["watermark_column"],
+            "high_water_mark": json.dumps(state["high_water_mark"]),
+            "config_hash": state["config_hash"],
+            "failed_rows": int(state["failed_rows"]),
+            "total_rows": int(state["total_rows"]),
+            "last_full_refresh": state["last_full_refresh"],
+        }
+
+        delete_sql = f"""
+            DELETE FROM {schema}.quality_incremental_state
+            WHERE model_name = :model_name
+            AND test_name = :test_name
+            AND target_environment = :target
+        """
+        insert_sql = f"""
+            INSERT INTO {schema}.quality_incremental_state
+            (model_name, test_name, target_environment, watermark_column,
+             high_water_mark, config_hash, failed_rows, total_rows, last_full_refresh)
+            VALUES (:model_name, :test_name, :target, :watermark_column,
+                    :high_water_mark, :config_hash, :failed_rows, :total_rows,
+                    :last_full_refresh)
+        """
+
+        with self.quality_engine.begin() as conn:
+            conn.execute(text(delete_sql), key)
+            conn.execute(text(insert_sql), record)
+
+    def get_metric_snapshots(
+        self, model_name: str, test_name: str, since: date
+    ) -> pd.DataFrame:
+        """Get the daily metric snapshots of a test from `since` onwards"""
+        schema = self.quality_config.get("schema", "public")
+        query = f"""
+            SELECT metric_date, metric_value, config_hash
+            FROM {schema}.quality_metric_snapshots
+            WHERE model_name = :model_name
+            AND test_name = :test_name
+            AND target_environment = :target
+            AND metric_date >= :since
+        """
+        return self.execute_query(
+            query,
+            {
+                "model_name": model_name,
+                "test_name": test_name,
+                "target": self.target,
+                "since": since,
+            },
+            use_data_source=False,
+        )
+
+    def save_metric_snapshots(
+        self,
+        model_name: str,
+        test_name: str,
+        config_hash: str,
+        snapshots: List[Tuple[date, Optional[float]]],
+    ) -> None:
+        """Store daily metric snapshots of a test, replacing the same dates"""
+        if not snapshots:
+            return
+
+        schema = self.quality_config.get("schema", "public")
+        key = {"model_name": model_name, "test_name": test_name, "target": self.target}
+        dates = [metric_date for metric_date, _ in snapshots]
+
+        delete_sql = f"""
+            DELETE FROM {schema}.quality_metric_snapshots
+            WHERE model_name = :model_name
+            AND test_name = :test_name
+            AND target_environment = :target
+            AND metric_date BETWEEN :first_date AND :last_date
+        """
+        insert_sql = f"""
+            INSERT INTO {schema}.quality_metric_snapshots
+            (model_name, test_name, target_environment, metric_date, metric_value,
+             config_hash)
+            VALUES (:model_name, :test_name, :target, :metric_date, :metric_value,
+                    :config_hash)
+        """
+        records = [
+            {
+                **key,
+                "metric_date": metric_date,
+                "metric_value": metric_value,
+                "config_hash": config_hash,
+            }
+            for metric_date, metric_value in snapshots
+        ]
+
+        with self.quality_engine.begin() as conn:
+            conn.execute(
+                text(delete_sql),
+                {**key, "first_date": min(dates), "last_date": max(dates)},
+            )
+            conn.execute(text(insert_sql), records)
+
+    def get_cached_results(
+        self, model_name: str, level: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get the cached results of a model with their fingerprint and date"""
+        schema = self.quality_config.get("schema", "public")
+        query = f"""
+            SELECT fingerprint, results, cached_at
+            FROM {schema}.quality_result_cache
+            WHERE model_name = :model_name
+            AND target_environment = :target
+            AND level = :level
+        """
+        df = self.execute_query(
+            query,
+            {"model_name": model_name, "target": self.target, "level": level},
+            use_data_source=False,
+        )
+        if df.empty:
+            return None
+
+        entry = df.iloc[0].to_dict()
+        entry["results"] = json.loads(entry["results"])
+        entry["cached_at"] = pd.Timestamp(entry["cached_at"])
+        return entry
+
+    def save_cached_results(
+        self,
+        model_name: str,
+        level: str,
+        fingerprint: str,
+        results: Dict[str, Any],
+        cached_at: datetime,
+    ) -> None:
+        """Store the results of a model for the given data fingerprint"""
+        schema = self.quality_config.get("schema", "public")
+        key = {"model_name": model_name, "target": self.target, "level": level}
+        record = {
+            **key,
+            "fingerprint": fingerprint,
+            # Numpy values and timestamps are stored as strings
+            "results": json.dumps(results, default=str),
+            "cached_at": cached_at,
+        }
+
+        delete_sql = f"""
+            DELETE FROM {schema}.quality_result_cache
+            WHERE model_name = :model_name
+            AND target_environment = :target
+            AND level = :level
+        """
+        insert_sql = f"""
+            INSERT INTO {schema}.quality_result_cache
+            (model_name, target_environment, level, fingerprint, results, cached_at)
+            VALUES (:model_name, :target, :level, :fingerprint, :results, :cached_at)
+        """
+
+        with self.quality_engine.begin() as conn:
+            conn.execute(text(delete_sql), key)
+            conn.execute(text(insert_sql), record)
+
+    def get_journal_entries(self, run_id: str) -> pd.DataFrame:
+        """Get the journaled test results of a run (results as JSON strings)"""
+        schema = self.quality_config.get("schema", "public")
+        query = f"""
+            SELECT model_name, level, test_name, result
+            FROM {schema}.quality_run_journal
+            WHERE run_id = :run_id
+        """
+        return self.execute_query(query, {"run_id": run_id}, use_data_source=False)
+
+    def save_journal_entries(
+        self,
+        run_id: str,
+        entries: List[Tuple[str, str, str, Dict[str, Any]]],
+        completed_at: datetime,
+    ) -> None:
+        """Journal completed (model, level, test, result) entries of a run"""
+        if not entries:
+            return
+
+        schema = self.quality_config.get("schema", "public")
+        insert_sql = f"""
+            INSERT INTO {schema}.quality_run_journal
+            (run_id, model_name, level, test_name, result, completed_at)
+            VALUES (:run_id, :model_name, :level, :test_name, :result, :completed_at)
+        """
+        records = [
+            {
+                "run_id": run_id,
+                "model_name": model_name,
+                "level": level,
+                "test_name": test_name,
+                # Numpy values and timestamps are stored as strings
+                "result": json.dumps(result, default=str),
+                "completed_at": completed_at,
+            }
+            for model_name, level, test_name, result in entries
+        ]
+
+        with self.quality_engine.begin() as conn:
+            conn.execute(text(insert_sql), records)
+
+    def prune_journal(self, before: datetime) -> None:
+        """Delete the journal entries completed before a date"""
+        schema = self.quality_config.get("schema", "public")
+        with self.quality_engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"DELETE FROM {schema}.quality_run_journal "
+                    "WHERE completed_at < :before"
+                ),
+                {"before": before},
+            )
+
     def _adapt_sql_for_bigquery(self, sql: str) -> str:
         """Adapt SQL for BigQuery"""
         sql = sql.replace("VARCHAR(255)", "STRING")
@@ -293,6 +1158,7 @@ class ConnectionManager:
         sql = sql.replace("TEXT", "STRING")
         sql = sql.replace("INTEGER", "INT64")
         sql = sql.replace("DECIMAL(10,4)", "FLOAT64")
+        sql = sql.replace("DOUBLE PRECISION", "FLOAT64")
         sql = sql.replace("CURRENT_TIMESTAMP", "CURRENT_TIMESTAMP()")
 
         sql = sql.replace("PRIMARY KEY", "")
@@ -358,6 +1224,502 @@ class ConnectionManager:
         )
         return create_engine(connection_string)
 
+    def _create_duckdb_engine(self, config: Dict[str, Any]) -> Engine:
+        """Create DuckDB engine, exposing local Parquet/CSV files as views"""
+        try:
+            import duckdb_engine  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "DuckDB support requires additional dependencies.\n"
+                "Install with: pip install qc2plus[duckdb]"
+            )
+
+        # A named in-memory database is shared by all pooled connections
+        database = config.get("path") or f":memory:qc2plus_{uuid.uuid4().hex[:8]}"
+        duckdb_config = {
+            key: config[key] for key in ("threads", "memory_limit") if key in config
+        }
+        engine = create_engine(
+            f"duckdb:///{database}", connect_args={"config": duckdb_config}
+        )
+
+        schema = config.get("schema", "main")
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+            for table_name, file_path in self._get_duckdb_files(config).items():
+                conn.execute(
+                    text(
+                        f"CREATE OR REPLACE VIEW {schema}.{table_name} AS "
+                        f"SELECT * FROM {self._duckdb_file_reader(file_path)}"
+                    )
+                )
+
+        return engine
+
+    @staticmethod
+    def _get_duckdb_files(config: Dict[str, Any]) -> Dict[str, str]:
+        """Files to expose as views: `files` mapping and files of `directory`"""
+        files = {}
+        if config.get("directory"):
+            for path in sorted(Path(config["directory"]).iterdir()):
+                if path.suffix.lower() in (".parquet", ".csv"):
+                    files[path.stem] = str(path)
+        files.update(config.get("files") or {})
+        return files
+
+    @staticmethod
+    def _duckdb_file_reader(file_path: str) -> str:
+        """DuckDB table function reading a file (or glob) by its extension.
+
+        Queries on the views only read the projected columns, and filters are
+        pushed down to the Parquet row groups by DuckDB.
+        """
+        escaped = file_path.replace("'", "''")
+        if file_path.lower().endswith((".csv", ".csv.gz")):
+            return f"read_csv_auto('{escaped}')"
+        return f"read_parquet('{escaped}', hive_partitioning = true)"
+
+    def execute_batch(
+        self, queries: Dict[str, str], timeout_seconds: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Run several single-row test queries in one statement.
+
+        The queries, keyed by an identifier, must return the standard Level 1
+        columns (BATCH_RESULT_COLUMNS). They are combined with UNION ALL, each
+        row tagged with its identifier, and the rows are split back per query.
+        """
+        cast_text = DB_FUNCTIONS.get(self.db_type, DB_FUNCTIONS["postgresql"])[
+            "cast_text"
+        ]
+        selects = []
+        for index, query in enumerate(queries.values()):
+            # Aligned column types, as UNION ALL requires
+            selects.append(
+                f"""
+                SELECT
+                    {index} AS qc2plus_batch_index,
+                    {cast_text('column_name')} AS column_name,
+                    CAST(failed_rows AS BIGINT) AS failed_rows,
+                    CAST(total_rows AS BIGINT) AS total_rows,
+                    {cast_text('message')} AS message,
+                    {cast_text('invalid_examples')} AS invalid_examples
+                FROM (
+                    {query.strip()}
+                ) AS qc2plus_batch_{index}"""
+            )
+
+        df = self.execute_query(
+            "\nUNION ALL\n".join(selects), timeout_seconds=timeout_seconds
+        )
+
+        return {
+            query_id: df.loc[
+                df["qc2plus_batch_index"] == index, list(BATCH_RESULT_COLUMNS)
+            ].reset_index(drop=True)
+            for index, query_id in enumerate(queries)
+        }
+
+    def estimate_query_cost(self, query: str) -> Dict[str, Optional[float]]:
+        """
+        Estimate the cost of a data source query without running it.
+
+        Returns `bytes` (bytes to be processed, from a BigQuery dry run or
+        Snowflake EXPLAIN USING JSON) and `cost` (planner cost units, from
+        PostgreSQL/Redshift EXPLAIN). A figure is None when the backend does
+        not provide it.
+        """
+        estimate = {"bytes": None, "cost": None}
+
+        if self.db_type in ("postgresql", "redshift"):
+            df = self.execute_query(f"EXPLAIN {query}")
+            match = EXPLAIN_COST_PATTERN.search(str(df.iloc[0, 0]))
+            if match:
+                estimate["cost"] = float(match.group(1))
+
+        elif self.db_type == "snowflake":
+            df = self.execute_query(f"EXPLAIN USING JSON {query}")
+            global_stats = json.loads(df.iloc[0, 0]).get("GlobalStats", {})
+            if global_stats.get("bytesAssigned") is not None:
+                estimate["bytes"] = float(global_stats["bytesAssigned"])
+
+        elif self.db_type == "bigquery":
+            from google.cloud.bigquery import QueryJobConfig
+
+            with self.data_engine.connect() as conn:
+                cursor = conn.connection.cursor()
+                try:
+                    cursor.execute(
+                        query,
+                        job_config=QueryJobConfig(dry_run=True, use_query_cache=False),
+                    )
+                    estimate["bytes"] = float(cursor.query_job.total_bytes_processed)
+                finally:
+                    cursor.close()
+
+        return estimate
+
+    def clear_table_stats(self) -> None:
+        """Reset the table statistics cache (called at the start of each run)"""
+        with self._table_stats_lock:
+            self._table_stats.clear()
+            self._table_stats_locks.clear()
+
+    def get_row_count(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        approximate: bool = False,
+    ) -> int:
+        """
+        Get the row count of a data source table, computed once per run.
+
+        With approximate=True the count is read from catalog metadata when the
+        backend exposes it, otherwise an exact COUNT(*) is run. An exact count
+        already in the cache is always reused.
+        """
+        schema = schema or self.config.get("schema", "public")
+        key = (schema, table_name)
+
+        with self._table_stats_lock:
+            key_lock = self._table_stats_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            stats = self._table_stats.get(key)
+            if stats and (approximate or not stats["approximate"]):
+                return stats["row_count"]
+
+            row_count = None
+            if approximate:
+                row_count = self._get_catalog_row_count(table_name, schema)
+
+            is_approximate = row_count is not None
+            if row_count is None:
+                df = self.execute_query(
+                    f"SELECT COUNT(*) AS row_count FROM {schema}.{table_name}"
+                )
+                row_count = int(df.iloc[0]["row_count"])
+
+            self._table_stats[key] = {
+                "row_count": row_count,
+                "approximate": is_approximate,
+            }
+            return row_count
+
+    def _create_run_table(self, prefix: str, select_sql: str) -> str:
+        """
+        Create a data source table from `select_sql` for the current run.
+
+        The table is created in the target schema (a regular table, so that
+        every pooled connection can read it) and dropped by drop_run_tables.
+        """
+        schema = self.config.get("schema", "public")
+        table_name = f"{prefix}_{uuid.uuid4().hex[:8]}"
+        qualified_name = f"{schema}.{table_name}"
+
+        if self.db_type == "snowflake":
+            # Transient tables have no fail-safe storage
+            create = f"CREATE TRANSIENT TABLE {qualified_name}"
+        elif self.db_type == "bigquery":
+            # Expiration in case the run dies before its cleanup
+            create = (
+                f"CREATE TABLE {qualified_name} OPTIONS ("
+                "expiration_timestamp = TIMESTAMP_ADD(CURRENT_TIMESTAMP(), INTERVAL 1 DAY))"
+            )
+        else:
+            create = f"CREATE TABLE {qualified_name}"
+
+        self.execute_sql(f"{create} AS {select_sql}", use_data_source=True)
+
+        with self._run_tables_lock:
+            self._run_tables.append(table_name)
+        return table_name
+
+    def materialize_sample(self, model_name: str, sample_clause: str) -> str:
+        """
+        Store the sample of a model in a data source table for the current run.
+
+        `sample_clause` is the FROM clause produced by build_sample_clause.
+        """
+        table_name = self._create_run_table(
+            f"qc2plus_sample_{model_name}", f"SELECT * FROM {sample_clause}"
+        )
+
+        with self._run_tables_lock:
+            self._materialized_samples[model_name] = table_name
+        logging.info(f"Materialized sample of {model_name} in {table_name}")
+        return table_name
+
+    def get_materialized_sample(self, model_name: str) -> Optional[str]:
+        """Get the table holding the materialized sample of a model, if any"""
+        with self._run_tables_lock:
+            return self._materialized_samples.get(model_name)
+
+    def get_reference_key_set(
+        self, reference_table: str, reference_column: str
+    ) -> str:
+        """
+        Get a table of the distinct keys of a reference column, built once per
+        run and shared by every relationship test pointing at that column.
+        """
+        key = (reference_table, reference_column)
+
+        with self._run_tables_lock:
+            key_lock = self._reference_key_set_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            table_name = self._reference_key_sets.get(key)
+            if table_name:
+                return table_name
+
+            schema = self.config.get("schema", "public")
+            table_name = self._create_run_table(
+                f"qc2plus_keys_{reference_table}_{reference_column}",
+                f"SELECT DISTINCT {reference_column} FROM {schema}.{reference_table} "
+                f"WHERE {reference_column} IS NOT NULL",
+            )
+            self._reference_key_sets[key] = table_name
+            logging.info(
+                f"Materialized keys of {reference_table}.{reference_column} "
+                f"in {table_name}"
+            )
+            return table_name
+
+    def drop_run_tables(self) -> None:
+        """Drop the tables created during the run (called at its end)"""
+        with self._run_tables_lock:
+            table_names = list(self._run_tables)
+            self._run_tables.clear()
+            self._materialized_samples.clear()
+            self._reference_key_sets.clear()
+            self._reference_key_set_locks.clear()
+
+        schema = self.config.get("schema", "public")
+        for table_name in table_names:
+            try:
+                self.execute_sql(
+                    f"DROP TABLE IF EXISTS {schema}.{table_name}",
+                    use_data_source=True,
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Failed to drop run table {schema}.{table_name}: {str(e)}"
+                )
+
+    def _get_catalog_row_count(self, table_name: str, schema: str) -> Optional[int]:
+        """Read an approximate row count from catalog metadata"""
+        params = {"table_name": table_name, "schema": schema}
+
+        if self.db_type == "postgresql":
+            query = """
+                SELECT c.reltuples AS row_count
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema
+                AND c.relname = :table_name
+            """
+        elif self.db_type == "redshift":
+            query = """
+                SELECT tbl_rows AS row_count
+                FROM svv_table_info
+                WHERE "schema" = :schema
+                AND "table" = :table_name
+            """
+        elif self.db_type == "bigquery":
+            query = f"""
+                SELECT row_count
+                FROM `{self.config['project']}.{schema}.__TABLES__`
+                WHERE table_id = :table_name
+            """
+            params = {"table_name": table_name}
+        elif self.db_type == "snowflake":
+            query = """
+                SELECT row_count
+                FROM information_schema.tables
+                WHERE table_schema = UPPER(:schema)
+                AND table_name = UPPER(:table_name)
+            """
+        else:
+            return None
+
+        try:
+            df = self.execute_query(query, params)
+        except Exception as e:
+            logging.warning(
+                f"Catalog row count unavailable for {schema}.{table_name}: {str(e)}"
+            )
+            return None
+
+        if df.empty or pd.isna(df.iloc[0]["row_count"]):
+            return None
+
+        row_count = int(df.iloc[0]["row_count"])
+        # PostgreSQL reports -1 for tables that were never analyzed
+        return row_count if row_count >= 0 else None
+
+    def get_table_metadata(
+        self, table_name: str, schema: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Read the row count, size and last modification time of a data source
+        table from catalog metadata, without reading the table.
+
+        Returns `row_count`, `size_bytes` and `last_modified`; a value is None
+        when the catalog does not provide it (PostgreSQL and Redshift do not
+        record modification times, DuckDB views have no statistics).
+        """
+        schema = schema or self.config.get("schema", "public")
+        params = {"table_name": table_name, "schema": schema}
+        metadata = {"row_count": None, "size_bytes": None, "last_modified": None}
+
+        if self.db_type == "postgresql":
+            # Live statistics, updated continuously by the stats collector
+            query = """
+                SELECT n_live_tup AS row_count,
+                       pg_total_relation_size(relid) AS size_bytes,
+                       NULL AS last_modified
+                FROM pg_stat_user_tables
+                WHERE schemaname = :schema
+                AND relname = :table_name
+            """
+        elif self.db_type == "redshift":
+            # svv_table_info reports the size in 1 MB blocks
+            query = """
+                SELECT tbl_rows AS row_count,
+                       size * 1024 * 1024 AS size_bytes,
+                       NULL AS last_modified
+                FROM svv_table_info
+                WHERE "schema" = :schema
+                AND "table" = :table_name
+            """
+        elif self.db_type == "bigquery":
+            query = f"""
+                SELECT row_count, size_bytes,
+                       TIMESTAMP_MILLIS(last_modified_time) AS last_modified
+                FROM `{self.config['project']}.{schema}.__TABLES__`
+                WHERE table_id = :table_name
+            """
+            params = {"table_name": table_name}
+        elif self.db_type == "snowflake":
+            query = """
+                SELECT row_count, bytes AS size_bytes, last_altered AS last_modified
+                FROM information_schema.tables
+                WHERE table_schema = UPPER(:schema)
+                AND table_name = UPPER(:table_name)
+            """
+        else:
+            return metadata
+
+        df = self.execute_query(query, params)
+        if df.empty:
+            raise ValueError(f"Table {schema}.{table_name} not found in the catalog")
+
+        row = df.iloc[0]
+        for key in metadata:
+            if not pd.isna(row[key]):
+                metadata[key] = row[key]
+
+        # Keep numbers as plain Python ints (catalogs may return floats/Decimals)
+        for key in ("row_count", "size_bytes"):
+            if metadata[key] is not None:
+                metadata[key] = int(metadata[key])
+        if metadata["last_modified"] is not None:
+            metadata["last_modified"] = pd.Timestamp(metadata["last_modified"])
+        return metadata
+
+    def get_table_fingerprint(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        column: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get values that change whenever the data of a table changes.
+
+        Catalog sources: PostgreSQL table oid and insert/update/delete
+        counters, BigQuery and Snowflake row count, size, creation and last
+        modification times. With `column` (e.g. an updated_at column), the
+        row count and maximum of the column are added, which is the only
+        fingerprint available on Redshift and DuckDB. Returns None when no
+        fingerprint can be computed.
+        """
+        schema = schema or self.config.get("schema", "public")
+        params = {"table_name": table_name, "schema": schema}
+        fingerprint = {}
+
+        if self.db_type == "postgresql":
+            # A recreated table gets a new oid and fresh counters
+            query = """
+                SELECT relid, n_live_tup, n_tup_ins, n_tup_upd, n_tup_del
+                FROM pg_stat_user_tables
+                WHERE schemaname = :schema
+                AND relname = :table_name
+            """
+        elif self.db_type == "bigquery":
+            query = f"""
+                SELECT row_count, size_bytes, creation_time, last_modified_time
+                FROM `{self.config['project']}.{schema}.__TABLES__`
+                WHERE table_id = :table_name
+            """
+            params = {"table_name": table_name}
+        elif self.db_type == "snowflake":
+            query = """
+                SELECT row_count, bytes, created, last_altered
+                FROM information_schema.tables
+                WHERE table_schema = UPPER(:schema)
+                AND table_name = UPPER(:table_name)
+            """
+        else:
+            query = None
+
+        if query:
+            df = self.execute_query(query, params)
+            if df.empty:
+                raise ValueError(
+                    f"Table {schema}.{table_name} not found in the catalog"
+                )
+            fingerprint.update(df.iloc[0].to_dict())
+
+        if column:
+            df = self.execute_query(
+                f"SELECT COUNT(*) AS row_count, MAX({column}) AS max_value "
+                f"FROM {schema}.{table_name}"
+            )
+            row = df.iloc[0]
+            fingerprint["scan_row_count"] = row["row_count"]
+            fingerprint["max_value"] = row["max_value"]
+
+        if not fingerprint:
+            return None
+        # Plain strings, comparable across runs once stored as JSON
+        return {
+            key: None if pd.isna(value) else str(value)
+            for key, value in fingerprint.items()
+        }
+
+    def get_last_test_result(
+        self, model_name: str, test_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get the latest stored result of a test on the current target"""
+        schema = self.quality_config.get("schema", "public")
+        query = f"""
+            SELECT status, failed_rows, total_rows, execution_time
+            FROM {schema}.quality_test_results
+            WHERE model_name = :model_name
+            AND test_name = :test_name
+            AND target_environment = :target
+            ORDER BY execution_time DESC
+            LIMIT 1
+        """
+        df = self.execute_query(
+            query,
+            {"model_name": model_name, "test_name": test_name, "target": self.target},
+            use_data_source=False,
+        )
+        if df.empty:
+            return None
+        return df.iloc[0].to_dict()
+
     def get_table_info(self, table_name: str, schema: str = None) -> Dict[str, Any]:
         """Get table information (columns, types, etc.)"""
         schema = schema or self.config.get("schema", "public")
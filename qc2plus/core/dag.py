@@ -0,0 +1,86 @@
+"""
+2QC+ Model Dependency Graph
+Orders model runs from the `depends_on` declarations of the models
+"""
+
+from typing import Any, Dict, List, Set
+
+
+class ModelGraph:
+    """Dependencies between the models of a run"""
+
+    def __init__(self, models: Dict[str, Dict[str, Any]]):
+        # Dependencies on models outside the run are already satisfied
+        self.dependencies: Dict[str, Set[str]] = {
+            name: {
+                upstream
+                for upstream in (config.get("depends_on") or [])
+                if upstream in models and upstream != name
+            }
+            for name, config in models.items()
+        }
+        self.dependents: Dict[str, Set[str]] = {name: set() for name in models}
+        for name, upstreams in self.dependencies.items():
+            for upstream in upstreams:
+                self.dependents[upstream].add(name)
+
+        self.order = self._topological_order()
+        self.weights = self._critical_path_weights(models)
+
+    def _topological_order(self) -> List[str]:
+        """Models after all their dependencies, raising on cycles"""
+        remaining = {
+            name: len(upstreams) for name, upstreams in self.dependencies.items()
+        }
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) < len(self.dependencies):
+            cycle = sorted(name for name, count in remaining.items() if count > 0)
+            raise ValueError(f"Circular dependency between models: {', '.join(cycle)}")
+        return order
+
+    def _critical_path_weights(
+        self, models: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Number of tests on the longest chain starting at each model.
+
+        Running the heaviest chains first shortens the total run time when
+        models run in parallel.
+        """
+        weights = {}
+        for name in reversed(self.order):
+            downstream = max(
+                (weights[dependent] for dependent in self.dependents[name]), default=0
+            )
+            weights[name] = self._count_tests(models[name]) + downstream
+        return weights
+
+    @staticmethod
+    def _count_tests(model_config: Dict[str, Any]) -> int:
+        """Number of Level 1 tests and Level 2 analyses of a model (at least 1)"""
+        qc2plus_tests = model_config.get("qc2plus_tests") or {}
+        return max(
+            1,
+            len(qc2plus_tests.get("level1") or [])
+            + len(qc2plus_tests.get("level2") or {}),
+        )
+
+    def descendants(self, name: str) -> Set[str]:
+        """All the models depending directly or transitively on a model"""
+        found = set()
+        stack = list(self.dependents[name])
+        while stack:
+            dependent = stack.pop()
+            if dependent not in found:
+                found.add(dependent)
+                stack.extend(self.dependents[dependent])
+        return found
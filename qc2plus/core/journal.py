@@ -0,0 +1,151 @@
+"""
+2QC+ Run Journal
+Checkpoints the completed tests of a run so that it can be resumed
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from qc2plus.core.connection import ConnectionManager
+
+# Days the journal of a run is kept for a resume
+JOURNAL_RETENTION_DAYS = 7
+
+
+class RunJournal:
+    """
+    Completed test results of a run, keyed by model, level and test.
+
+    Entries go to the quality_run_journal table, or to a JSON lines file per
+    run when a journal directory is set (`journal-path` in
+    qc2plus_project.yml), which does not depend on the quality database.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        connection_manager: ConnectionManager,
+        journal_dir: Optional[Path] = None,
+    ):
+        self.run_id = run_id
+        self.connection_manager = connection_manager
+        self.journal_dir = Path(journal_dir) if journal_dir else None
+        # (model, level, test) already in the journal
+        self._recorded: Set[Tuple[str, str, str]] = set()
+        # Tests are recorded from the threads running them
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Journal file of the run (local journal only)"""
+        return self.journal_dir / f"{self.run_id}.jsonl" if self.journal_dir else None
+
+    def load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Journaled results of the run, as {model: {"level1": ..., "level2": ...}}"""
+        entries = []
+        if self.path:
+            if self.path.exists():
+                with open(self.path, "r") as f:
+                    for line in f:
+                        # A line cut short by a crash is ignored
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        entries.append(
+                            (
+                                entry["model"],
+                                entry["level"],
+                                entry["test"],
+                                entry["result"],
+                            )
+                        )
+        else:
+            df = self.connection_manager.get_journal_entries(self.run_id)
+            entries = [
+                (row.model_name, row.level, row.test_name, json.loads(row.result))
+                for row in df.itertuples(index=False)
+            ]
+
+        journaled: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for model_name, level, test_name, result in entries:
+            model_results = journaled.setdefault(
+                model_name, {"level1": {}, "level2": {}}
+            )
+            model_results[level][test_name] = result
+            self._recorded.add((model_name, level, test_name))
+        return journaled
+
+    def record(self, model_name: str, model_results: Dict[str, Any]) -> None:
+        """
+        Journal the completed tests of a model not journaled yet. Tests with
+        an error or cancelled by fail-fast are not journaled, so that a
+        resumed run runs them again.
+        """
+        with self._lock:
+            self._record(model_name, model_results)
+
+    def _record(self, model_name: str, model_results: Dict[str, Any]) -> None:
+        entries = [
+            (model_name, level, test_name, result)
+            for level in ("level1", "level2")
+            for test_name, result in (model_results.get(level) or {}).items()
+            if isinstance(result, dict)
+            and "error" not in result
+            and result.get("status") != "cancelled"
+            and (model_name, level, test_name) not in self._recorded
+        ]
+        if not entries:
+            return
+
+        try:
+            if self.path:
+                self._append(entries)
+            else:
+                self.connection_manager.save_journal_entries(
+                    self.run_id, entries, datetime.now()
+                )
+            self._recorded.update(entry[:3] for entry in entries)
+        except Exception as e:
+            logging.warning(f"Could not journal results of {model_name}: {str(e)}")
+
+    def _append(self, entries: List[Tuple[str, str, str, Dict[str, Any]]]) -> None:
+        """Append entries to the journal file, on disk before returning"""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        completed_at = datetime.now().isoformat()
+        with open(self.path, "a") as f:
+            for model_name, level, test_name, result in entries:
+                entry = {
+                    "model": model_name,
+                    "level": level,
+                    "test": test_name,
+                    "result": result,
+                    "completed_at": completed_at,
+                }
+                # Numpy values and timestamps are stored as strings
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def prune(self, retention_days: int = JOURNAL_RETENTION_DAYS) -> None:
+        """Delete the journals of runs older than retention_days"""
+        try:
+            if self.journal_dir:
+                if not self.journal_dir.exists():
+                    return
+                cutoff = time.time() - retention_days * 86400
+                for path in self.journal_dir.glob("*.jsonl"):
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+            else:
+                self.connection_manager.prune_journal(
+                    datetime.now() - timedelta(days=retention_days)
+                )
+        except Exception as e:
+            logging.warning(f"Could not prune the run journal: {str(e)}")
@@ -0,0 +1,202 @@
+"""
+2QC+ Query Planner
+Estimates the cost of quality tests on the backend before running them
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from qc2plus.core.connection import ConnectionManager
+from qc2plus.level1.engine import FULL_TABLE_COUNT_TESTS, Level1Engine
+from qc2plus.sql.db_functions import DB_FUNCTIONS
+
+# Level 2 configuration keys and the result key of their analyzer
+LEVEL2_ANALYSES = {
+    "correlation_analysis": "correlation",
+    "temporal_analysis": "temporal",
+    "distribution_analysis": "distribution",
+}
+
+# Below this fraction of its estimated cost, an over-budget test is skipped
+# rather than sampled
+MIN_BUDGET_SAMPLE_FRACTION = 0.01
+
+
+class QueryPlanner:
+    """Compiles the queries of a run and gets their estimated cost"""
+
+    def __init__(
+        self,
+        connection_manager: ConnectionManager,
+        level1_engine: Level1Engine,
+        level2_analyzers: Dict[str, Any],
+    ):
+        self.connection_manager = connection_manager
+        self.level1_engine = level1_engine
+        # Analyzers keyed by result name (correlation, temporal, distribution)
+        self.level2_analyzers = level2_analyzers
+
+    def plan(
+        self, models: Dict[str, Dict[str, Any]], level: str = "all"
+    ) -> List[Dict[str, Any]]:
+        """Estimate every test of the models, most expensive first"""
+        entries = []
+
+        for model_name, model_config in models.items():
+            qc2plus_tests = model_config.get("qc2plus_tests") or {}
+
+            if level in ["1", "all"]:
+                for test_config in qc2plus_tests.get("level1") or []:
+                    for test_type, test_params in test_config.items():
+                        entries.append(
+                            self._plan_level1_test(
+                                model_name, test_type, test_params, model_config
+                            )
+                        )
+
+            if level in ["2", "all"]:
+                level2_config = qc2plus_tests.get("level2") or {}
+                for config_key, analyzer_name in LEVEL2_ANALYSES.items():
+                    if config_key in level2_config:
+                        entries.append(
+                            self._plan_level2_analysis(
+                                model_name, analyzer_name, level2_config[config_key]
+                            )
+                        )
+
+        return sorted(
+            entries,
+            key=lambda entry: (entry["bytes"] or 0, entry["cost"] or 0),
+            reverse=True,
+        )
+
+    def apply_budget(
+        self,
+        entries: List[Dict[str, Any]],
+        max_bytes: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        action: str = "skip",
+    ) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """
+        Decide which tests exceed the budget, keyed by (model, level, test).
+
+        Tests are admitted from the cheapest to the most expensive, so the
+        most expensive ones are left out. With action="sample", the first
+        test over budget that a block sample would make cheaper (`samplable`)
+        is kept with a sample fitting the remaining budget. Tests without an
+        estimate always run.
+        """
+        if max_bytes is not None:
+            metric, limit = "bytes", max_bytes
+        else:
+            metric, limit = "cost", max_cost
+        if limit is None:
+            return {}
+
+        decisions = {}
+        used = 0.0
+        for entry in sorted(entries, key=lambda entry: entry[metric] or 0):
+            estimate = entry[metric]
+            if estimate is None:
+                continue
+            if used + estimate <= limit:
+                used += estimate
+                continue
+
+            key = (entry["model"], entry["level"], entry["test"])
+            fraction = (limit - used) / estimate
+            if (
+                action == "sample"
+                and entry.get("samplable")
+                and fraction >= MIN_BUDGET_SAMPLE_FRACTION
+            ):
+                decisions[key] = {
+                    "action": "sample",
+                    "fraction": round(fraction, 4),
+                    metric: estimate,
+                }
+                used = limit
+            else:
+                decisions[key] = {"action": "skip", metric: estimate}
+
+        return decisions
+
+    def _plan_level1_test(
+        self,
+        model_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Compile and estimate a Level 1 test"""
+        sample_config = self.level1_engine._resolve_sample_config(
+            test_params, model_config
+        )
+        entry = {
+            "model": model_name,
+            "level": "level1",
+            "test": self.level1_engine.get_test_name(test_type, test_params),
+            "sampled": bool(sample_config),
+            "samplable": not sample_config
+            and self._sample_reduces_scan(test_type),
+        }
+        if self.level1_engine.is_metadata_test(test_type, test_params):
+            # Catalog lookups do not scan the table
+            return {**entry, "queries": [], "bytes": 0.0, "cost": 0.0, "error": None}
+        try:
+            query = self.level1_engine.compile_test(
+                test_type, test_params, model_name, sample_config=sample_config
+            )
+        except Exception as e:
+            return {**entry, "queries": [], "bytes": None, "cost": None, "error": str(e)}
+
+        return {**entry, **self._estimate([query])}
+
+    def _sample_reduces_scan(self, test_type: str) -> bool:
+        """
+        Whether a block sample reduces the data a test reads: not without
+        native table sampling (Redshift filters a full scan with RANDOM()),
+        nor for tests counting their failed rows on the whole table
+        """
+        db_functions = DB_FUNCTIONS.get(
+            self.connection_manager.db_type, DB_FUNCTIONS["postgresql"]
+        )
+        return (
+            "tablesample" in db_functions
+            and test_type not in FULL_TABLE_COUNT_TESTS
+        )
+
+    def _plan_level2_analysis(
+        self, model_name: str, analyzer_name: str, config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Compile and estimate the queries of a Level 2 analysis"""
+        entry = {
+            "model": model_name,
+            "level": "level2",
+            "test": analyzer_name,
+            "sampled": False,
+            "samplable": False,
+        }
+        try:
+            queries = self.level2_analyzers[analyzer_name].compile_queries(
+                model_name, config
+            )
+        except Exception as e:
+            return {**entry, "queries": [], "bytes": None, "cost": None, "error": str(e)}
+
+        return {**entry, **self._estimate(queries)}
+
+    def _estimate(self, queries: List[str]) -> Dict[str, Any]:
+        """Sum the backend estimates of queries (None when unknown)"""
+        totals = {"bytes": None, "cost": None}
+        try:
+            for query in queries:
+                estimate = self.connection_manager.estimate_query_cost(query)
+                for metric, value in estimate.items():
+                    if value is not None:
+                        totals[metric] = (totals[metric] or 0) + value
+        except Exception as e:
+            logging.warning(f"Cost estimation failed: {str(e)}")
+            return {"queries": queries, "bytes": None, "cost": None, "error": str(e)}
+
+        return {"queries": queries, **totals, "error": None}
@@ -305,6 +305,9 @@ For more information, visit: https://github.com/qc2plus/qc2plus
             for test_config in level1_tests:
                 for test_type, test_params in test_config.items():
                     test_name = f"{test_type}_{test_params.get('column_name', 'test')}"
+                    if level1_engine.is_metadata_test(test_type, test_params):
+                        model_tests[test_name] = "-- Metadata test (catalog only)"
+                        continue
                     try:
                         # This is a simplified compilation - full compilation
                         # needs DB connection
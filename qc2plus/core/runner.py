@@ -3,26 +3,85 @@
 Orchestrates execution of Level 1 and Level 2 quality tests
 """
 
+import asyncio
+import hashlib
+import heapq
+import json
 import logging
+import multiprocessing
+import queue
+import threading
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import yaml
 
 from qc2plus.alerting.alerts import AlertManager
 from qc2plus.core.connection import ConnectionManager
+from qc2plus.core.dag import ModelGraph
+from qc2plus.core.journal import RunJournal
+from qc2plus.core.planner import LEVEL2_ANALYSES, QueryPlanner
 from qc2plus.core.project import QC2PlusProject
-from qc2plus.level1.engine import Level1Engine
+from qc2plus.level1.engine import METADATA_TESTS, Level1Engine
 from qc2plus.level2.anomaly_filter import AnomalyFilter
 from qc2plus.level2.correlation import CorrelationAnalyzer
 from qc2plus.level2.distribution import DistributionAnalyzer
 from qc2plus.level2.temporal import TemporalAnalyzer
+from qc2plus.level2.worker import (
+    PROCESS_POOL_ANALYZERS,
+    analysis_failed,
+    compute_analysis,
+    warm_up,
+)
 from qc2plus.persistence.persistence import PersistenceManager
 
+# Default maximum age of the results reused for an unchanged table
+DEFAULT_RESULT_CACHE_HOURS = 24
+
+# Level 1 tests re-run on models served from the result cache: their result
+# depends on the current date, on other tables or on arbitrary SQL
+UNCACHED_LEVEL1_TESTS = {
+    "future_date",
+    "freshness",
+    "statistical_threshold",
+    "relationship",
+    "custom_sql",
+} | METADATA_TESTS
+
+# Level 1 tests scanning or joining whole tables, started before the others
+# when tests are scheduled individually
+HEAVY_LEVEL1_TESTS = {
+    "unique",
+    "relationship",
+    "accepted_benchmark_values",
+    "statistical_threshold",
+    "custom_sql",
+}
+
+# Tests and analyses of arun in progress at the same time (the queries are
+# also capped by the target's max_concurrent_queries)
+DEFAULT_ASYNC_CONCURRENCY = 500
+
+# Number of test results written to the quality tables at once by iter_run
+PERSIST_BATCH_SIZE = 100
+
+# Longest time (seconds) iter_run keeps completed results before writing them
+PERSIST_FLUSH_SECONDS = 30
+
+# Events iter_run buffers ahead of its consumer before pausing the run
+STREAM_QUEUE_SIZE = 1000
+
 
 class QC2PlusRunner:
     """Main test runner orchestrating all quality checks"""
@@ -51,6 +110,39 @@ class QC2PlusRunner:
         self.temporal_analyzer = TemporalAnalyzer(self.connection_manager)
         self.distribution_analyzer = DistributionAnalyzer(self.connection_manager)
 
+        # Cost estimation and per-run budget decisions, keyed by
+        # (model, level, test)
+        self.planner = QueryPlanner(
+            self.connection_manager,
+            self.level1_engine,
+            {
+                "correlation": self.correlation_analyzer,
+                "temporal": self.temporal_analyzer,
+                "distribution": self.distribution_analyzer,
+            },
+        )
+        self._budget_decisions: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+        # Data fingerprints of the models using the result cache, and the
+        # cache entries matching them for the current run
+        self._fingerprints: Dict[str, str] = {}
+        self._cache_hits: Dict[str, Dict[str, Any]] = {}
+
+        # Worker processes computing the CPU-bound Level 2 analyses of a run
+        self._level2_pool: Optional[ProcessPoolExecutor] = None
+
+        # Streaming state of iter_run (None for a regular run)
+        self._stream: Optional[Dict[str, Any]] = None
+
+        # Journal of the completed tests of the current run, and the results
+        # journaled before a resume, keyed by model
+        journal_path = self.project.config.get("journal-path")
+        self.journal_dir = (
+            self.project.project_dir / journal_path if journal_path else None
+        )
+        self._journal: Optional[RunJournal] = None
+        self._journaled: Dict[str, Dict[str, Any]] = {}
+
         # Initialize alerting and persistence
         self.alert_manager = AlertManager(self.project.config.get("alerting", {}))
 
@@ -75,26 +167,174 @@ class QC2PlusRunner:
         level: str = "all",
         fail_fast: bool = False,
         threads: int = 1,
+        max_bytes: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        budget_action: str = "skip",
+        level2_processes: int = 0,
+        granularity: str = "model",
+        resume: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Run quality tests"""
+        """Run quality tests
+
+        With max_bytes (BigQuery, Snowflake) or max_cost (PostgreSQL,
+        Redshift planner cost), the tests are estimated first and the most
+        expensive ones over budget are skipped, or sampled with
+        budget_action="sample".
+
+        With level2_processes, the model threads only fetch the data of the
+        correlation and temporal analyses, and their computation runs on a
+        pool of that many worker processes.
 
-        run_id = str(uuid.uuid4())
+        With granularity="test" and several threads, every Level 1 test and
+        Level 2 analysis of every model is a separate task of one work queue,
+        instead of one task per model.
+
+        Completed tests are journaled with the run id. With resume=<run_id>,
+        the run keeps that id, only runs the tests not journaled yet and
+        merges the journaled results into its results.
+        """
+
+        results, test_models, graph = self._start_run(
+            models, level, max_bytes, max_cost, budget_action, resume
+        )
+        if not test_models:
+            return results
+
+        if level2_processes and level in ["2", "all"]:
+            self._level2_pool = self._start_level2_pool(level2_processes)
+
+        try:
+            if graph:
+                results = self._run_dag(
+                    test_models, graph, level, fail_fast, threads, results
+                )
+            elif granularity == "test" and threads > 1:
+                results = self._run_test_queue(
+                    test_models, level, fail_fast, threads, results
+                )
+            elif threads > 1:
+                results = self._run_parallel(
+                    test_models, level, fail_fast, threads, results
+                )
+            else:
+                results = self._run_sequential(test_models, level, fail_fast, results)
+        finally:
+            self._release_run_resources()
+
+        return self._finish_run(results)
+
+    async def arun(
+        self,
+        models: Optional[List[str]] = None,
+        level: str = "all",
+        fail_fast: bool = False,
+        concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+        max_bytes: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        budget_action: str = "skip",
+        level2_processes: int = 0,
+        resume: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run quality tests on asyncio
+
+        Every Level 1 test and Level 2 analysis of every model is a coroutine
+        of the event loop, at most `concurrency` at a time (and
+        `max_concurrent_per_table` per model). Level 1 queries are awaited
+        with ConnectionManager.aexecute_query, so waiting tests hold neither
+        a thread nor a connection. Level 2 analyses and the run preparation
+        run in the default thread pool. Models with depends_on wait for their
+        upstream models. Takes the other options of run().
+        """
+        results, test_models, graph = await asyncio.to_thread(
+            self._start_run, models, level, max_bytes, max_cost, budget_action, resume
+        )
+        if not test_models:
+            return results
+
+        if level2_processes and level in ["2", "all"]:
+            self._level2_pool = self._start_level2_pool(level2_processes)
+
+        try:
+            await self._arun_models(
+                test_models, graph, level, fail_fast, concurrency, results
+            )
+        finally:
+            await self.connection_manager.aclose()
+            await asyncio.to_thread(self._release_run_resources)
+
+        return await asyncio.to_thread(self._finish_run, results)
+
+    def _start_run(
+        self,
+        models: Optional[List[str]],
+        level: str,
+        max_bytes: Optional[float],
+        max_cost: Optional[float],
+        budget_action: str,
+        resume: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[ModelGraph]]:
+        """Select the models of a run and prepare it, before any model is tested"""
+        run_id = resume or str(uuid.uuid4())
         start_time = time.time()
 
         logging.info(f"Starting 2QC+ run {run_id} for target: {self.target}")
 
+        # Table statistics (row counts) are only valid for the current run
+        self.connection_manager.clear_table_stats()
+        self.connection_manager.reset_cancellation()
+
         # Get models to test
-        all_models = self.project.get_models()
-        if models:
-            test_models = {
-                name: config for name, config in all_models.items() if name in models
-            }
-        else:
-            test_models = all_models
+        test_models = self._select_models(models)
 
         if not test_models:
             logging.warning("No models found to test")
-            return self._create_empty_result(run_id, start_time)
+            return self._create_empty_result(run_id, start_time), {}, None
+
+        # Models declaring depends_on run after their upstream models
+        graph = None
+        if any(config.get("depends_on") for config in test_models.values()):
+            graph = ModelGraph(test_models)
+
+        # Completed tests are journaled, to resume the run after a crash
+        self._journal = RunJournal(run_id, self.connection_manager, self.journal_dir)
+        self._journaled = {}
+        if resume:
+            self._journaled = {
+                model_name: journaled
+                for model_name, journaled in self._journal.load().items()
+                if model_name in test_models
+            }
+            completed = sum(
+                len(journaled["level1"]) + len(journaled["level2"])
+                for journaled in self._journaled.values()
+            )
+            logging.info(f"Resuming run {run_id}: {completed} tests already completed")
+            test_models = self._without_journaled_tests(test_models)
+        else:
+            self._journal.prune()
+
+        # Run-wide optimizations (shared reference key-sets)
+        self.level1_engine.prepare_run(test_models)
+
+        # Models whose data did not change since their cached results (the
+        # partial results of resumed models are not cached)
+        self._prepare_result_cache(test_models, level)
+        for model_name in self._journaled:
+            self._fingerprints.pop(model_name, None)
+            self._cache_hits.pop(model_name, None)
+
+        # Per-run cost budget
+        self._budget_decisions = {}
+        if max_bytes is not None or max_cost is not None:
+            plan = self.planner.plan(test_models, level)
+            self._budget_decisions = self.planner.apply_budget(
+                plan, max_bytes=max_bytes, max_cost=max_cost, action=budget_action
+            )
+            if self._budget_decisions:
+                logging.warning(
+                    f"{len(self._budget_decisions)} tests over budget "
+                    f"({budget_action}): {sorted(self._budget_decisions)}"
+                )
 
         # Run tests
         results = {
@@ -109,16 +349,22 @@ class QC2PlusRunner:
             "execution_time": start_time,
             "target": self.target,
         }
-
-        if threads > 1:
-            results = self._run_parallel(
-                test_models, level, fail_fast, threads, results
-            )
-        else:
-            results = self._run_sequential(test_models, level, fail_fast, results)
-
+        if self._stream:
+            self._stream["run_id"] = run_id
+        return results, test_models, graph
+
+    def _release_run_resources(self) -> None:
+        """Drop the tables and stop the worker processes of the run"""
+        # Tables created for the run (samples, key-sets) are not kept
+        self.connection_manager.drop_run_tables()
+        if self._level2_pool:
+            self._level2_pool.shutdown(cancel_futures=True)
+            self._level2_pool = None
+
+    def _finish_run(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute the final status of a run, then persist and alert it"""
         # Calculate final statistics
-        execution_duration = int(time.time() - start_time)
+        execution_duration = int(time.time() - results["execution_time"])
         results["execution_duration"] = execution_duration
 
         # Filter False anomaly
@@ -132,16 +378,95 @@ class QC2PlusRunner:
         else:
             results["status"] = "success"
 
-        # Persist results
-        self._persist_results(results)
+        if self._stream:
+            # Test results were persisted and alerted as they completed
+            self._finish_stream(results)
+        else:
+            # Persist results
+            self._persist_results(results)
+
+            # Send alerts
+            self._send_alerts(results)
 
-        # Send alerts
-        self._send_alerts(results)
+        self._journal = None
+        self._journaled = {}
 
-        logging.info(f"Completed 2QC+ run {run_id} in {execution_duration}s")
+        logging.info(
+            f"Completed 2QC+ run {results['run_id']} in {execution_duration}s"
+        )
 
         return results
 
+    def iter_run(
+        self,
+        models: Optional[List[str]] = None,
+        level: str = "all",
+        persist_batch_size: int = PERSIST_BATCH_SIZE,
+        **run_options: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """Run quality tests, yielding the results as they complete
+
+        Takes the options of run(). Yields a {"type": "test"} event as each
+        test completes and a {"type": "model"} event when the tests of a model
+        are all done, then a final {"type": "run"} event with the run summary.
+
+        Results are persisted in batches of persist_batch_size tests (or
+        after PERSIST_FLUSH_SECONDS), without waiting for their model, and
+        critical failures are alerted as soon as their test completes. The run
+        only keeps the status of each model and its failed tests (for the
+        summary alert), so its memory does not grow with the number of tests.
+        Stopping the iteration cancels the queries still running.
+        """
+        events: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        closed = threading.Event()
+        errors = []
+
+        def emit(event: Optional[Dict[str, Any]]) -> None:
+            # The run waits for its consumer, unless it stopped iterating
+            while not closed.is_set():
+                try:
+                    events.put(event, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            self._stream = {
+                "emit": emit,
+                "batch_size": persist_batch_size,
+                "pending": {},
+                "pending_tests": 0,
+                "pending_since": None,
+                "failed": {},
+                # Tests already emitted, by model, until the model is done
+                "emitted": {},
+                "lock": threading.Lock(),
+            }
+            try:
+                summary = self.run(models, level, **run_options)
+                emit({"type": "run", **summary})
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self._stream = None
+                emit(None)
+
+        producer = threading.Thread(target=produce, name="qc2plus-run", daemon=True)
+        producer.start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                yield event
+            if errors:
+                raise errors[0]
+        finally:
+            closed.set()
+            if producer.is_alive():
+                self.connection_manager.cancel_running_queries()
+                producer.join()
+
     def _run_sequential(
         self,
         test_models: Dict[str, Any],
@@ -155,10 +480,7 @@ class QC2PlusRunner:
             logging.info(f"Testing model: {model_name}")
 
             model_results = self._test_model(model_name, model_config, level)
-            results["models"][model_name] = model_results
-
-            # Update counters
-            self._update_counters(results, model_results)
+            self._record_model_results(results, model_name, model_results)
 
             # Check fail-fast condition
             if fail_fast and model_results.get("has_critical_failure", False):
@@ -188,38 +510,599 @@ class QC2PlusRunner:
             }
 
             # Collect results
+            cancelled = False
             for future in as_completed(future_to_model):
                 model_name = future_to_model[future]
+                if future.cancelled():
+                    continue
                 try:
                     model_results = future.result()
-                    results["models"][model_name] = model_results
-
-                    # Update counters
-                    self._update_counters(results, model_results)
+                    self._record_model_results(results, model_name, model_results)
 
                     # Check fail-fast condition
-                    if fail_fast and model_results.get("has_critical_failure", False):
-                        logging.error(
-                            f"Critical failure in {model_name}, cancelling remaining tests"
-                        )
-                        # Cancel remaining futures
+                    if (
+                        fail_fast
+                        and not cancelled
+                        and model_results.get("has_critical_failure", False)
+                    ):
+                        # Cancel remaining futures, then the running queries:
+                        # the models in progress end with cancelled tests
                         for f in future_to_model:
                             f.cancel()
+                        self._cancel_run(model_name)
                         results["status"] = "critical_failure"
-                        break
+                        cancelled = True
 
                 except Exception as e:
                     logging.error(f"Error testing model {model_name}: {str(e)}")
-                    results["models"][model_name] = {
-                        "status": "error",
-                        "error": str(e),
-                        "has_critical_failure": True,
-                    }
                     results["failed_tests"] += 1
                     results["critical_failures"] += 1
+                    self._record_model_results(
+                        results,
+                        model_name,
+                        {
+                            "status": "error",
+                            "error": str(e),
+                            "has_critical_failure": True,
+                        },
+                    )
+
+        return results
+
+    def _run_dag(
+        self,
+        test_models: Dict[str, Any],
+        graph: ModelGraph,
+        level: str,
+        fail_fast: bool,
+        threads: int,
+        results: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Run models as soon as their upstream models are done, up to `threads`
+        at a time, longest critical path first. The models downstream of a
+        model with a critical failure are skipped.
+        """
+        remaining = {
+            name: set(upstreams) for name, upstreams in graph.dependencies.items()
+        }
+        ready = [
+            (-graph.weights[name], name)
+            for name, upstreams in remaining.items()
+            if not upstreams
+        ]
+        heapq.heapify(ready)
+        running = {}
+        stop = False
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            while ready or running:
+                while ready and len(running) < threads and not stop:
+                    _, model_name = heapq.heappop(ready)
+                    logging.info(f"Testing model: {model_name}")
+                    future = executor.submit(
+                        self._test_model, model_name, test_models[model_name], level
+                    )
+                    running[future] = model_name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    model_name = running.pop(future)
+                    try:
+                        model_results = future.result()
+                    except Exception as e:
+                        logging.error(f"Error testing model {model_name}: {str(e)}")
+                        model_results = {
+                            "status": "error",
+                            "error": str(e),
+                            "has_critical_failure": True,
+                        }
+                        results["failed_tests"] += 1
+                        results["critical_failures"] += 1
+                    self._record_model_results(results, model_name, model_results)
+
+                    if model_results.get("has_critical_failure", False):
+                        if fail_fast and not stop:
+                            self._cancel_run(model_name)
+                            results["status"] = "critical_failure"
+                            stop = True
+                        skipped = graph.descendants(model_name) - set(results["models"])
+                        if skipped:
+                            logging.warning(
+                                f"Critical failure in {model_name}, skipping "
+                                f"downstream models: {sorted(skipped)}"
+                            )
+                        for dependent in skipped:
+                            self._record_model_results(
+                                results,
+                                dependent,
+                                self._upstream_skipped_result(model_name),
+                            )
+                        continue
+
+                    for dependent in graph.dependents[model_name]:
+                        remaining[dependent].discard(model_name)
+                        if not remaining[dependent] and (
+                            dependent not in results["models"]
+                        ):
+                            heapq.heappush(
+                                ready, (-graph.weights[dependent], dependent)
+                            )
+
+        return results
+
+    def _run_test_queue(
+        self,
+        test_models: Dict[str, Any],
+        level: str,
+        fail_fast: bool,
+        threads: int,
+        results: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Run the tests of all the models from one work queue, so that a large
+        model is spread over all the threads.
+
+        Level 2 analyses and heavy Level 1 tests of the largest models start
+        first. At most `max_concurrent_per_table` tasks of a model run at the
+        same time (the target's `max_concurrent_queries` still caps the
+        queries). The results are grouped back by model.
+        """
+        per_table = self.connection_manager.max_concurrent_per_table
+        queue = []
+        model_results = {}
+        unfinished = {}
+        for model_name, model_config in test_models.items():
+            tasks = self._model_tasks(model_name, model_config, level)
+            model_results[model_name] = {
+                "status": "success",
+                "has_critical_failure": False,
+                "level1": {},
+                "level2": {},
+            }
+            unfinished[model_name] = len(tasks)
+            queue.extend(tasks)
+            if not tasks:
+                self._finish_queued_model(
+                    model_name, model_config, level, model_results, results
+                )
+        queue.sort(key=lambda task: task["priority"], reverse=True)
+
+        running = {}
+        running_per_model = {model_name: 0 for model_name in test_models}
+        stop = False
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            while (queue and not stop) or running:
+                for task in list(queue):
+                    if stop or len(running) >= threads:
+                        break
+                    if per_table and running_per_model[task["model"]] >= per_table:
+                        continue
+                    queue.remove(task)
+                    running_per_model[task["model"]] += 1
+                    future = executor.submit(self._run_task, task, test_models, level)
+                    running[future] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    model_name = task["model"]
+                    running_per_model[model_name] -= 1
+                    merged = model_results[model_name]
+                    self._merge_task_results(task, future, merged)
+
+                    # Fail-fast as soon as a task fails, not when its model is done
+                    if (
+                        fail_fast
+                        and not stop
+                        and (
+                            merged.get("has_critical_failure", False)
+                            or any(
+                                self._is_critical_failure(test_result)
+                                for test_result in merged["level1"].values()
+                                if isinstance(test_result, dict)
+                            )
+                        )
+                    ):
+                        self._cancel_run(model_name)
+                        results["status"] = "critical_failure"
+                        stop = True
+
+                    unfinished[model_name] -= 1
+                    if unfinished[model_name] == 0:
+                        self._finish_queued_model(
+                            model_name,
+                            test_models[model_name],
+                            level,
+                            model_results,
+                            results,
+                        )
+
+        # Tasks not started before fail-fast are recorded as cancelled, so that
+        # every model is in the results
+        for task in queue:
+            model_name = task["model"]
+            cancelled = self._cancelled_task_results(task)
+            if task["kind"] == "model":
+                model_results[model_name].update(cancelled)
+            else:
+                model_results[model_name][task["kind"]].update(cancelled)
+            unfinished[model_name] -= 1
+            if unfinished[model_name] == 0:
+                self._finish_queued_model(
+                    model_name, test_models[model_name], level, model_results, results
+                )
+
+        return results
+
+    def _model_tasks(
+        self, model_name: str, model_config: Dict[str, Any], level: str
+    ) -> List[Dict[str, Any]]:
+        """Split the tests of a model into work queue tasks"""
+        qc2plus_tests = model_config.get("qc2plus_tests") or {}
+        level1_tests = qc2plus_tests.get("level1") or []
+        level2_config = qc2plus_tests.get("level2") or {}
+        # Tasks of the models with the most tests first, then heaviest first
+        model_size = len(level1_tests) + len(level2_config)
+
+        def task(kind: str, tests: Any, weight: int) -> Dict[str, Any]:
+            return {
+                "model": model_name,
+                "kind": kind,
+                "tests": tests,
+                "priority": (weight, model_size),
+            }
+
+        # Results reused from the cache: the model stays a single task
+        if model_name in self._cache_hits:
+            return [task("model", None, 0)]
+
+        tasks = []
+        if level in ["1", "all"] and level1_tests:
+            # A fused scan or a materialized sample is shared by all the tests
+            if model_config.get("fused") or model_config.get("materialize_sample"):
+                tasks.append(task("level1", level1_tests, 2))
+            else:
+                batch_size = self.connection_manager.batch_size
+                batchable_tests = []
+                for test_config in level1_tests:
+                    if batch_size and all(
+                        self.level1_engine.is_batchable(
+                            test_type, test_params, model_config
+                        )
+                        for test_type, test_params in test_config.items()
+                    ):
+                        batchable_tests.append(test_config)
+                        continue
+                    heavy = bool(set(test_config) & HEAVY_LEVEL1_TESTS)
+                    tasks.append(task("level1", [test_config], 2 if heavy else 1))
+                # One task per batched statement
+                for start in range(0, len(batchable_tests), batch_size or 1):
+                    tasks.append(
+                        task("level1", batchable_tests[start : start + batch_size], 1)
+                    )
+
+        if level in ["2", "all"]:
+            for config_key in LEVEL2_ANALYSES:
+                if config_key in level2_config:
+                    tasks.append(
+                        task("level2", {config_key: level2_config[config_key]}, 3)
+                    )
+
+        return tasks
+
+    def _run_task(
+        self, task: Dict[str, Any], test_models: Dict[str, Any], level: str
+    ) -> Dict[str, Any]:
+        """Run one work queue task"""
+        model_name = task["model"]
+        model_config = test_models[model_name]
+
+        if task["kind"] == "model":
+            model_results = self._test_model(model_name, model_config, level)
+            # Results reused from the cache are only known at the end
+            for level_key in ("level1", "level2"):
+                self._record_test_results(
+                    model_name, level_key, model_results.get(level_key) or {}
+                )
+            return model_results
+        if task["kind"] == "level2":
+            level2_results = self._run_level2_tests(model_name, task["tests"])
+            self._record_test_results(model_name, "level2", level2_results)
+            return level2_results
+
+        level1_tests, skipped_results = self._apply_level1_budget(
+            model_name, task["tests"]
+        )
+        self._record_test_results(model_name, "level1", skipped_results)
+        self._run_level1_batches(model_name, model_config, level1_tests)
+        level1_results = self.level1_engine.run_tests(
+            model_name,
+            level1_tests,
+            model_config=model_config,
+            on_result=self._test_result_callback(model_name),
+        )
+        level1_results.update(skipped_results)
+        return level1_results
+
+    def _merge_task_results(
+        self,
+        task: Dict[str, Any],
+        future: Future,
+        model_results: Dict[str, Any],
+    ) -> None:
+        """Add the results of a finished task to the results of its model"""
+        try:
+            task_results = future.result()
+        except Exception as e:
+            logging.error(f"Error testing model {task['model']}: {str(e)}")
+            model_results["status"] = "error"
+            if task["kind"] == "level1":
+                for test_config in task["tests"]:
+                    for test_type, test_params in test_config.items():
+                        test_name = self.level1_engine.get_test_name(
+                            test_type, test_params
+                        )
+                        model_results["level1"][test_name] = {
+                            "passed": False,
+                            "error": str(e),
+                            "severity": test_params.get("severity", "medium"),
+                        }
+            elif task["kind"] == "level2":
+                model_results["level2"]["error"] = str(e)
+            else:
+                model_results.update({"error": str(e), "has_critical_failure": True})
+            if task["kind"] != "model":
+                self._record_test_results(
+                    task["model"], task["kind"], model_results[task["kind"]]
+                )
+            return
+
+        if task["kind"] == "model":
+            model_results.update(task_results)
+        else:
+            model_results[task["kind"]].update(task_results)
+            # Already recorded by the task itself, unless it failed early
+            self._record_test_results(task["model"], task["kind"], task_results)
+
+    def _finish_queued_model(
+        self,
+        model_name: str,
+        model_config: Dict[str, Any],
+        level: str,
+        model_results: Dict[str, Dict[str, Any]],
+        results: Dict[str, Any],
+    ) -> None:
+        """Reassemble the results of a model whose tasks are all done"""
+        merged = model_results[model_name]
+
+        # Results in the order of a model run (cached results already are)
+        if not merged.get("cached_at"):
+            level1_tests = (model_config.get("qc2plus_tests") or {}).get("level1")
+            level1_order = [
+                self.level1_engine.get_test_name(test_type, test_params)
+                for test_config in level1_tests or []
+                for test_type, test_params in test_config.items()
+            ]
+            for level_key, order in (
+                ("level1", level1_order),
+                ("level2", list(LEVEL2_ANALYSES.values()) + ["error"]),
+            ):
+                merged[level_key] = {
+                    name: merged[level_key][name]
+                    for name in order
+                    if name in merged[level_key]
+                }
+            self._save_cached_results(model_name, level, merged)
+
+        merged["has_critical_failure"] = merged.get(
+            "has_critical_failure", False
+        ) or any(
+            self._is_critical_failure(test_result)
+            for test_result in merged["level1"].values()
+            if isinstance(test_result, dict)
+        )
+        self._record_model_results(results, model_name, merged)
+
+    async def _arun_models(
+        self,
+        test_models: Dict[str, Any],
+        graph: Optional[ModelGraph],
+        level: str,
+        fail_fast: bool,
+        concurrency: int,
+        results: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Run the tasks of all the models as coroutines and group their results
+        back by model, as _run_test_queue does. A model with depends_on starts
+        once its upstream models are done, and is skipped when one of them has
+        a critical failure.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        per_table = self.connection_manager.max_concurrent_per_table
+        done = {model_name: asyncio.Event() for model_name in test_models}
+        # Model whose critical failure blocks a model (itself or upstream)
+        failed_upstream: Dict[str, str] = {}
+        model_results: Dict[str, Dict[str, Any]] = {}
+        in_flight = set()
+        stop = False
+
+        async def run_task(
+            task: Dict[str, Any], table_slots: asyncio.Semaphore
+        ) -> Dict[str, Any]:
+            async with table_slots, slots:
+                current = asyncio.current_task()
+                in_flight.add(current)
+                try:
+                    if stop:
+                        return self._cancelled_task_results(task)
+                    return await self._arun_task(task, test_models, level)
+                except asyncio.CancelledError:
+                    # Cancelled by fail-fast, not with the whole run
+                    if not stop:
+                        raise
+                    return self._cancelled_task_results(task)
+                finally:
+                    in_flight.discard(current)
+
+        async def run_model(model_name: str) -> None:
+            nonlocal stop
+            model_config = test_models[model_name]
+            try:
+                upstreams = sorted(graph.dependencies[model_name]) if graph else []
+                for upstream in upstreams:
+                    await done[upstream].wait()
+                blocking = next(
+                    (failed_upstream[u] for u in upstreams if u in failed_upstream),
+                    None,
+                )
+                if blocking:
+                    logging.warning(
+                        f"Critical failure in {blocking}, skipping downstream "
+                        f"model: {model_name}"
+                    )
+                    failed_upstream[model_name] = blocking
+                    self._record_model_results(
+                        results, model_name, self._upstream_skipped_result(blocking)
+                    )
+                    return
+                if stop:
+                    return
+
+                logging.info(f"Testing model: {model_name}")
+                tasks = sorted(
+                    self._model_tasks(model_name, model_config, level),
+                    key=lambda task: task["priority"],
+                    reverse=True,
+                )
+                model_results[model_name] = {
+                    "status": "success",
+                    "has_critical_failure": False,
+                    "level1": {},
+                    "level2": {},
+                }
+                table_slots = asyncio.Semaphore(per_table or max(len(tasks), 1))
+                futures = [
+                    asyncio.ensure_future(run_task(task, table_slots))
+                    for task in tasks
+                ]
+                if futures:
+                    await asyncio.wait(futures)
+                for task, future in zip(tasks, futures):
+                    self._merge_task_results(task, future, model_results[model_name])
+                self._finish_queued_model(
+                    model_name, model_config, level, model_results, results
+                )
+
+                if results["models"][model_name].get("has_critical_failure", False):
+                    failed_upstream[model_name] = model_name
+                    if fail_fast and not stop:
+                        stop = True
+                        for future in list(in_flight):
+                            future.cancel()
+                        await asyncio.to_thread(self._cancel_run, model_name)
+                        results["status"] = "critical_failure"
+            finally:
+                done[model_name].set()
+
+        # Heaviest dependency chains (or largest models) first
+        if graph:
+            order = sorted(test_models, key=lambda name: -graph.weights[name])
+        else:
+            order = sorted(
+                test_models,
+                key=lambda name: -ModelGraph._count_tests(test_models[name]),
+            )
+        await asyncio.gather(*(run_model(model_name) for model_name in order))
 
         return results
 
+    async def _arun_task(
+        self, task: Dict[str, Any], test_models: Dict[str, Any], level: str
+    ) -> Dict[str, Any]:
+        """
+        Run one task of arun: Level 1 tests as coroutines, the other tasks
+        (Level 2 analyses, fused or sampled models, cached models) in the
+        default thread pool
+        """
+        model_name = task["model"]
+        model_config = test_models[model_name]
+        if (
+            task["kind"] != "level1"
+            or model_config.get("fused")
+            or model_config.get("materialize_sample")
+        ):
+            return await asyncio.to_thread(self._run_task, task, test_models, level)
+
+        level1_tests, level1_results = self._apply_level1_budget(
+            model_name, task["tests"]
+        )
+        # The journal syncs its writes to disk: kept off the event loop
+        await asyncio.to_thread(
+            self._record_test_results, model_name, "level1", dict(level1_results)
+        )
+        await asyncio.to_thread(
+            self._run_level1_batches, model_name, model_config, level1_tests
+        )
+        for test_config in level1_tests:
+            for test_type, test_params in test_config.items():
+                test_name = self.level1_engine.get_test_name(test_type, test_params)
+                level1_results[test_name] = await self.level1_engine.arun_test(
+                    model_name, test_type, test_params, model_config
+                )
+                await asyncio.to_thread(
+                    self._record_test_results,
+                    model_name,
+                    "level1",
+                    {test_name: level1_results[test_name]},
+                )
+        return level1_results
+
+    def _cancelled_task_results(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Results of a task interrupted or never started because of fail-fast"""
+        cancelled = {
+            "passed": False,
+            "status": "cancelled",
+            "error": "Run cancelled (fail-fast)",
+        }
+        if task["kind"] == "level1":
+            return {
+                self.level1_engine.get_test_name(test_type, test_params): {
+                    **cancelled,
+                    "severity": test_params.get("severity", "medium"),
+                }
+                for test_config in task["tests"]
+                for test_type, test_params in test_config.items()
+            }
+        if task["kind"] == "level2":
+            return {
+                LEVEL2_ANALYSES[config_key]: dict(cancelled)
+                for config_key in task["tests"]
+            }
+        return {"status": "cancelled", "level1": {}, "level2": {}}
+
+    def _cancel_run(self, model_name: str) -> None:
+        """Fail-fast: stop the queries still running on the server"""
+        logging.error(f"Critical failure in {model_name}, cancelling running queries")
+        self.connection_manager.cancel_running_queries()
+
+    @staticmethod
+    def _upstream_skipped_result(upstream_model: str) -> Dict[str, Any]:
+        """Result of a model not tested because an upstream model failed"""
+        return {
+            "status": "skipped",
+            "has_critical_failure": False,
+            "message": (
+                f"Skipped - upstream model {upstream_model} has a critical failure"
+            ),
+            "level1": {},
+            "level2": {},
+        }
+
     def _test_model(
         self,
         model_name: str,
@@ -227,6 +1110,12 @@ class QC2PlusRunner:
         level: str,
     ) -> Dict[str, Any]:
         """Test a single model"""
+        cache_entry = self._cache_hits.get(model_name)
+        if cache_entry:
+            return self._reuse_cached_results(
+                model_name, model_config, level, cache_entry
+            )
+
         model_results = {
             "status": "success",
             "has_critical_failure": False,
@@ -239,19 +1128,23 @@ class QC2PlusRunner:
         # Run Level 1 tests
         if level in ["1", "all"] and "level1" in qc2plus_tests:
             try:
+                level1_tests, skipped_results = self._apply_level1_budget(
+                    model_name, qc2plus_tests["level1"]
+                )
+                self._run_level1_batches(model_name, model_config, level1_tests)
                 level1_results = self.level1_engine.run_tests(
                     model_name,
-                    qc2plus_tests["level1"],
+                    level1_tests,
                     model_config=model_config,
+                    on_result=self._test_result_callback(model_name),
                 )
+                level1_results.update(skipped_results)
                 model_results["level1"] = level1_results
+                self._record_test_results(model_name, "level1", skipped_results)
 
                 # Check for critical failures
                 for test_name, test_result in level1_results.items():
-                    if (
-                        not test_result["passed"]
-                        and test_result.get("severity") == "critical"
-                    ):
+                    if self._is_critical_failure(test_result):
                         model_results["has_critical_failure"] = True
 
             except Exception as e:
@@ -266,28 +1159,202 @@ class QC2PlusRunner:
                     model_name, qc2plus_tests["level2"]
                 )
                 model_results["level2"] = level2_results
+                self._record_test_results(model_name, "level2", level2_results)
 
             except Exception as e:
                 logging.error(f"Level 2 tests failed for {model_name}: {str(e)}")
                 model_results["level2"] = {"error": str(e)}
                 model_results["status"] = "error"
 
+        self._save_cached_results(model_name, level, model_results)
+
         return model_results
 
+    def _save_cached_results(
+        self, model_name: str, level: str, model_results: Dict[str, Any]
+    ) -> None:
+        """Cache the results of a model using the result cache, if complete"""
+        if model_name in self._fingerprints and self._is_cacheable(model_results):
+            try:
+                self.connection_manager.save_cached_results(
+                    model_name,
+                    level,
+                    self._fingerprints[model_name],
+                    model_results,
+                    datetime.now(),
+                )
+            except Exception as e:
+                logging.warning(f"Could not cache results of {model_name}: {str(e)}")
+
+    @staticmethod
+    def _get_result_cache_config(
+        model_config: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Result cache options of a model (`result_cache: true` or a dict)"""
+        cache_config = model_config.get("result_cache")
+        if not cache_config:
+            return None
+        if not isinstance(cache_config, dict):
+            cache_config = {}
+        return {
+            "max_age_hours": cache_config.get(
+                "max_age_hours", DEFAULT_RESULT_CACHE_HOURS
+            ),
+            "fingerprint_column": cache_config.get("fingerprint_column"),
+        }
+
+    def _prepare_result_cache(self, test_models: Dict[str, Any], level: str) -> None:
+        """Fingerprint the models using the result cache and find the valid entries"""
+        self._fingerprints = {}
+        self._cache_hits = {}
+
+        for model_name, model_config in test_models.items():
+            cache_config = self._get_result_cache_config(model_config)
+            if not cache_config:
+                continue
+
+            try:
+                table_fingerprint = self.connection_manager.get_table_fingerprint(
+                    model_name, column=cache_config["fingerprint_column"]
+                )
+                if table_fingerprint is None:
+                    logging.info(
+                        f"No data fingerprint for {model_name} "
+                        f"(set result_cache.fingerprint_column), results not cached"
+                    )
+                    continue
+
+                # A change of the model configuration also invalidates the cache
+                fingerprint = hashlib.sha256(
+                    json.dumps(
+                        {"data": table_fingerprint, "model": model_config},
+                        sort_keys=True,
+                        default=str,
+                    ).encode()
+                ).hexdigest()
+                self._fingerprints[model_name] = fingerprint
+
+                entry = self.connection_manager.get_cached_results(model_name, level)
+            except Exception as e:
+                logging.warning(f"Result cache unavailable for {model_name}: {str(e)}")
+                continue
+
+            if entry is None or entry["fingerprint"] != fingerprint:
+                continue
+
+            cached_at = entry["cached_at"]
+            if cached_at.tzinfo is not None:
+                cached_at = cached_at.tz_convert(None)
+            age_hours = (datetime.now() - cached_at).total_seconds() / 3600
+            if age_hours <= cache_config["max_age_hours"]:
+                self._cache_hits[model_name] = entry
+
+    def _reuse_cached_results(
+        self,
+        model_name: str,
+        model_config: Dict[str, Any],
+        level: str,
+        cache_entry: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Results of an unchanged model from the cache, re-running live tests"""
+        logging.info(
+            f"Data of {model_name} unchanged since {cache_entry['cached_at']}, "
+            f"reusing cached results"
+        )
+        cached = cache_entry["results"]
+        model_results = {
+            "status": cached.get("status", "success"),
+            "has_critical_failure": False,
+            "cached_at": str(cache_entry["cached_at"]),
+            "level1": {},
+            "level2": {},
+        }
+        for level_key in ("level1", "level2"):
+            for test_name, test_result in (cached.get(level_key) or {}).items():
+                model_results[level_key][test_name] = {
+                    **test_result,
+                    "status": "cached",
+                    "cached": True,
+                }
+
+        # Tests depending on the date or on other tables are always re-run
+        level1_tests = (model_config.get("qc2plus_tests") or {}).get("level1") or []
+        live_tests = [
+            test_config
+            for test_config in level1_tests
+            if set(test_config) & UNCACHED_LEVEL1_TESTS
+        ]
+        if live_tests and level in ["1", "all"]:
+            try:
+                live_tests, skipped_results = self._apply_level1_budget(
+                    model_name, live_tests
+                )
+                model_results["level1"].update(
+                    self.level1_engine.run_tests(
+                        model_name, live_tests, model_config=model_config
+                    )
+                )
+                model_results["level1"].update(skipped_results)
+            except Exception as e:
+                logging.error(f"Level 1 tests failed for {model_name}: {str(e)}")
+                model_results["level1"] = {"error": str(e)}
+                model_results["status"] = "error"
+
+        model_results["has_critical_failure"] = any(
+            self._is_critical_failure(test_result)
+            for test_name, test_result in model_results["level1"].items()
+            if test_name != "error"
+        )
+        return model_results
+
+    @staticmethod
+    def _is_critical_failure(test_result: Dict[str, Any]) -> bool:
+        """Whether a Level 1 test failed with critical severity (not cancelled)"""
+        return (
+            not test_result.get("passed", False)
+            and test_result.get("severity") == "critical"
+            and test_result.get("status") != "cancelled"
+        )
+
+    @staticmethod
+    def _is_cacheable(model_results: Dict[str, Any]) -> bool:
+        """Whether every test of the model ran to completion"""
+        if model_results["status"] != "success":
+            return False
+        for level_key in ("level1", "level2"):
+            for test_result in model_results[level_key].values():
+                if test_result.get("error") or test_result.get("status") in (
+                    "timeout",
+                    "skipped",
+                    "cancelled",
+                ):
+                    return False
+        return True
+
     def _run_level2_tests(
         self, model_name: str, level2_config: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Run Level 2 ML-based tests"""
         level2_results = {}
 
+        # Analyses over the run budget
+        for analyzer_name in LEVEL2_ANALYSES.values():
+            decision = self._budget_decisions.get((model_name, "level2", analyzer_name))
+            if decision:
+                level2_results[analyzer_name] = self._budget_skipped_result(decision)
+
         # Correlation analysis
-        if "correlation_analysis" in level2_config:
+        if (
+            "correlation_analysis" in level2_config
+            and "correlation" not in level2_results
+        ):
             try:
-                correlation_result = self.correlation_analyzer.analyze(
+                level2_results["correlation"] = self._start_level2_analysis(
+                    "correlation",
+                    self.correlation_analyzer,
                     model_name,
                     level2_config["correlation_analysis"],
                 )
-                level2_results["correlation"] = correlation_result
             except Exception as e:
                 logging.error(f"Correlation analysis failed for {model_name}: {str(e)}")
                 level2_results["correlation"] = {
@@ -296,12 +1363,14 @@ class QC2PlusRunner:
                 }
 
         # Temporal analysis
-        if "temporal_analysis" in level2_config:
+        if "temporal_analysis" in level2_config and "temporal" not in level2_results:
             try:
-                temporal_result = self.temporal_analyzer.analyze(
-                    model_name, level2_config["temporal_analysis"]
+                level2_results["temporal"] = self._start_level2_analysis(
+                    "temporal",
+                    self.temporal_analyzer,
+                    model_name,
+                    level2_config["temporal_analysis"],
                 )
-                level2_results["temporal"] = temporal_result
             except Exception as e:
                 logging.error(f"Temporal analysis failed for {model_name}: {str(e)}")
                 level2_results["temporal"] = {
@@ -310,7 +1379,10 @@ class QC2PlusRunner:
                 }
 
         # Distribution analysis
-        if "distribution_analysis" in level2_config:
+        if (
+            "distribution_analysis" in level2_config
+            and "distribution" not in level2_results
+        ):
             try:
                 distribution_result = self.distribution_analyzer.analyze(
                     model_name,
@@ -326,16 +1398,157 @@ class QC2PlusRunner:
                     "passed": False,
                 }
 
+        # Analyses whose queries were cancelled by fail-fast
+        if self.connection_manager.run_cancelled:
+            for result in level2_results.values():
+                if isinstance(result, dict) and result.get("error"):
+                    result["status"] = "cancelled"
+
+        # Computations handed to the worker processes
+        for analyzer_name, result in level2_results.items():
+            if isinstance(result, Future):
+                try:
+                    level2_results[analyzer_name] = result.result()
+                except Exception as e:
+                    level2_results[analyzer_name] = analysis_failed(
+                        analyzer_name, model_name, e
+                    )
+
         return level2_results
 
+    @staticmethod
+    def _start_level2_pool(processes: int) -> ProcessPoolExecutor:
+        """Start the Level 2 worker processes with the analysis libraries loaded"""
+        # Forking would copy the threads and database connections of the run
+        pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up,
+        )
+        # Workers start on demand: start them now, while Level 1 tests run
+        for _ in range(processes):
+            pool.submit(warm_up)
+        return pool
+
+    def _start_level2_analysis(
+        self,
+        analyzer_name: str,
+        analyzer: Any,
+        model_name: str,
+        config: Dict[str, Any],
+    ) -> Any:
+        """
+        Run a Level 2 analysis, or, with the worker pool, fetch its data and
+        return the Future of its computation
+        """
+        if self._level2_pool is None or analyzer_name not in PROCESS_POOL_ANALYZERS:
+            return analyzer.analyze(model_name, config)
+
+        try:
+            data = analyzer.fetch_data(model_name, config)
+        except Exception as e:
+            # Same result as analyze() when its queries fail
+            return analysis_failed(analyzer_name, model_name, e)
+        return self._level2_pool.submit(
+            compute_analysis, analyzer_name, model_name, config, data
+        )
+
+    def plan(
+        self, models: Optional[List[str]] = None, level: str = "all"
+    ) -> List[Dict[str, Any]]:
+        """Estimate the cost of each test without running it, most expensive first"""
+        self.connection_manager.clear_table_stats()
+        return self.planner.plan(self._select_models(models), level)
+
+    def _select_models(self, models: Optional[List[str]]) -> Dict[str, Any]:
+        """Get the configuration of the models to test (default: all)"""
+        all_models = self.project.get_models()
+        if models:
+            return {
+                name: config for name, config in all_models.items() if name in models
+            }
+        return all_models
+
+    def _run_level1_batches(
+        self,
+        model_name: str,
+        model_config: Dict[str, Any],
+        level1_tests: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Run the batchable Level 1 tests of a model once it is scheduled, so
+        that skipped models never query and fail-fast cancels the batches
+        """
+        if not self.connection_manager.batch_size or len(level1_tests) < 2:
+            return
+
+        batch_model = {**model_config, "qc2plus_tests": {"level1": level1_tests}}
+        try:
+            batched = self.level1_engine.run_batches(
+                {model_name: batch_model}, self.connection_manager.batch_size
+            )
+            if batched:
+                logging.info(f"{batched} Level 1 tests of {model_name} run in batches")
+        except Exception as e:
+            logging.error(f"Batched execution failed for {model_name}: {str(e)}")
+
+    def _apply_level1_budget(
+        self, model_name: str, level1_tests: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Drop or sample the Level 1 tests of a model that exceed the run budget"""
+        if not self._budget_decisions:
+            return level1_tests, {}
+
+        kept_tests = []
+        skipped_results = {}
+        for test_config in level1_tests:
+            for test_type, test_params in test_config.items():
+                test_name = self.level1_engine.get_test_name(test_type, test_params)
+                decision = self._budget_decisions.get((model_name, "level1", test_name))
+
+                if not decision:
+                    kept_tests.append({test_type: test_params})
+                elif decision["action"] == "sample":
+                    # Block sampling reduces the bytes actually read
+                    sample = {"method": "block", "percentage": decision["fraction"]}
+                    kept_tests.append({test_type: {**test_params, "sample": sample}})
+                else:
+                    skipped_results[test_name] = {
+                        **self._budget_skipped_result(decision),
+                        "severity": test_params.get("severity", "medium"),
+                    }
+
+        return kept_tests, skipped_results
+
+    @staticmethod
+    def _budget_skipped_result(decision: Dict[str, Any]) -> Dict[str, Any]:
+        """Result of a test skipped because it exceeds the run budget"""
+        estimate = ", ".join(
+            f"{metric}={decision[metric]:,.0f}"
+            for metric in ("bytes", "cost")
+            if metric in decision
+        )
+        return {
+            "passed": True,
+            "status": "skipped",
+            "anomalies_count": 0,
+            "failed_rows": 0,
+            "total_rows": 0,
+            "message": f"Skipped - over the run budget (estimated {estimate})",
+        }
+
     def _update_counters(
         self, results: Dict[str, Any], model_results: Dict[str, Any]
     ) -> None:
         """Update test counters"""
 
-        # Count Level 1 tests
+        # Count Level 1 tests (tests skipped by the budget or cancelled by
+        # fail-fast are not counted)
         for test_name, test_result in model_results.get("level1", {}).items():
-            if test_name != "error":
+            if test_name != "error" and test_result.get("status") not in (
+                "skipped",
+                "cancelled",
+            ):
                 results["total_tests"] += 1
                 if test_result.get("passed", False):
                     results["passed_tests"] += 1
@@ -346,7 +1559,10 @@ class QC2PlusRunner:
 
         # Count Level 2 tests
         for analyzer_name, analyzer_result in model_results.get("level2", {}).items():
-            if analyzer_name != "error":
+            if analyzer_name != "error" and analyzer_result.get("status") not in (
+                "skipped",
+                "cancelled",
+            ):
                 results["total_tests"] += 1
                 if analyzer_result.get("passed", False):
                     results["passed_tests"] += 1
@@ -391,6 +1607,247 @@ class QC2PlusRunner:
             }
             return results
 
+    def _record_model_results(
+        self,
+        results: Dict[str, Any],
+        model_name: str,
+        model_results: Dict[str, Any],
+    ) -> None:
+        """Add the results of a finished model to the run"""
+        journaled = self._journaled.get(model_name)
+        if journaled:
+            model_results = self._merge_journaled_results(model_results, journaled)
+        results["models"][model_name] = model_results
+        self._update_counters(results, model_results)
+        if self._journal:
+            self._journal.record(model_name, model_results)
+        if self._stream:
+            self._stream_model_results(results, model_name, model_results)
+
+    def _without_journaled_tests(self, test_models: Dict[str, Any]) -> Dict[str, Any]:
+        """Configurations of the models without their journaled tests (resume)"""
+        remaining = {}
+        for model_name, model_config in test_models.items():
+            journaled = self._journaled.get(model_name)
+            if not journaled:
+                remaining[model_name] = model_config
+                continue
+
+            qc2plus_tests = dict(model_config.get("qc2plus_tests") or {})
+            if "level1" in qc2plus_tests:
+                qc2plus_tests["level1"] = [
+                    {test_type: test_params}
+                    for test_config in qc2plus_tests["level1"] or []
+                    for test_type, test_params in test_config.items()
+                    if self.level1_engine.get_test_name(test_type, test_params)
+                    not in journaled["level1"]
+                ]
+            if "level2" in qc2plus_tests:
+                qc2plus_tests["level2"] = {
+                    config_key: config
+                    for config_key, config in (qc2plus_tests["level2"] or {}).items()
+                    if LEVEL2_ANALYSES.get(config_key) not in journaled["level2"]
+                }
+            remaining[model_name] = {**model_config, "qc2plus_tests": qc2plus_tests}
+        return remaining
+
+    def _merge_journaled_results(
+        self, model_results: Dict[str, Any], journaled: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Results of a resumed model: its journaled tests, then the new ones"""
+        merged = dict(model_results)
+        for level_key in ("level1", "level2"):
+            merged[level_key] = {
+                **journaled[level_key],
+                **(model_results.get(level_key) or {}),
+            }
+        merged["has_critical_failure"] = model_results.get(
+            "has_critical_failure", False
+        ) or any(
+            self._is_critical_failure(test_result)
+            for test_result in journaled["level1"].values()
+        )
+        return merged
+
+    def _test_result_callback(
+        self, model_name: str
+    ) -> Optional[Callable[[str, Dict[str, Any]], None]]:
+        """Level 1 on_result callback recording the tests of a model"""
+        if not self._journal and not self._stream:
+            return None
+        return lambda test_name, test_result: self._record_test_results(
+            model_name, "level1", {test_name: test_result}
+        )
+
+    def _record_test_results(
+        self, model_name: str, level_key: str, test_results: Dict[str, Any]
+    ) -> None:
+        """Journal and stream tests as they complete, before their model is done"""
+        if not test_results:
+            return
+        if self._journal:
+            self._journal.record(model_name, {level_key: test_results})
+        self._stream_test_results(model_name, level_key, test_results)
+
+    def _stream_test_results(
+        self, model_name: str, level_key: str, test_results: Dict[str, Any]
+    ) -> None:
+        """Emit and alert completed tests during iter_run, once per test"""
+        stream = self._stream
+        if not stream or not test_results:
+            return
+        with stream["lock"]:
+            emitted = stream["emitted"].setdefault(model_name, set())
+            new_results = {
+                test_name: test_result
+                for test_name, test_result in test_results.items()
+                if (level_key, test_name) not in emitted
+            }
+            emitted.update((level_key, test_name) for test_name in new_results)
+            if new_results:
+                pending = stream["pending"].setdefault(
+                    model_name, {"level1": {}, "level2": {}}
+                )
+                pending[level_key].update(new_results)
+                stream["pending_tests"] += len(new_results)
+                if stream["pending_since"] is None:
+                    stream["pending_since"] = time.monotonic()
+
+        for test_name, test_result in new_results.items():
+            stream["emit"](
+                {
+                    "type": "test",
+                    "run_id": stream["run_id"],
+                    "model": model_name,
+                    "level": level_key,
+                    "test": test_name,
+                    "result": test_result,
+                }
+            )
+
+        critical = {
+            test_name: test_result
+            for test_name, test_result in new_results.items()
+            if level_key == "level1"
+            and isinstance(test_result, dict)
+            and self._is_critical_failure(test_result)
+        }
+        if critical:
+            self.alert_manager.send_critical_alerts(
+                {
+                    "run_id": stream["run_id"],
+                    "target": self.target,
+                    "models": {
+                        model_name: {
+                            "has_critical_failure": True,
+                            "level1": critical,
+                            "level2": {},
+                        }
+                    },
+                }
+            )
+        self._flush_stream_if_due()
+
+    def _stream_model_results(
+        self,
+        results: Dict[str, Any],
+        model_name: str,
+        model_results: Dict[str, Any],
+    ) -> None:
+        """Emit and persist the results of a finished model during iter_run"""
+        stream = self._stream
+        # Tests not emitted as they completed (cached, journaled or skipped)
+        for level_key in ("level1", "level2"):
+            self._stream_test_results(
+                model_name, level_key, model_results.get(level_key) or {}
+            )
+        with stream["lock"]:
+            stream["emitted"].pop(model_name, None)
+        stream["emit"](
+            {
+                "type": "model",
+                "run_id": results["run_id"],
+                "model": model_name,
+                "status": model_results.get("status"),
+                "has_critical_failure": model_results.get(
+                    "has_critical_failure", False
+                ),
+            }
+        )
+
+        self._flush_stream_if_due()
+
+        # Only the failed tests are kept, for the summary alert
+        failed = {
+            level_key: {
+                test_name: test_result
+                for test_name, test_result in (
+                    model_results.get(level_key) or {}
+                ).items()
+                if isinstance(test_result, dict)
+                and not test_result.get("passed", True)
+            }
+            for level_key in ("level1", "level2")
+        }
+        if failed["level1"] or failed["level2"]:
+            stream["failed"][model_name] = failed
+        results["models"][model_name] = {
+            key: value
+            for key, value in model_results.items()
+            if key not in ("level1", "level2")
+        }
+
+    def _flush_stream_if_due(self) -> None:
+        """Persist the buffered results once a batch is full or has waited long enough"""
+        stream = self._stream
+        with stream["lock"]:
+            pending_since = stream["pending_since"]
+            due = stream["pending_tests"] >= stream["batch_size"] or (
+                pending_since is not None
+                and time.monotonic() - pending_since >= PERSIST_FLUSH_SECONDS
+            )
+        if due:
+            self._flush_stream()
+
+    def _flush_stream(self) -> None:
+        """Persist the results buffered by iter_run"""
+        stream = self._stream
+        with stream["lock"]:
+            if not stream["pending"]:
+                return
+            batch = {
+                "run_id": stream["run_id"],
+                "target": self.target,
+                "models": stream["pending"],
+            }
+            stream["pending"] = {}
+            stream["pending_tests"] = 0
+            stream["pending_since"] = None
+        try:
+            self.persistence_manager.save_test_results(batch)
+            self.persistence_manager.save_anomalies(batch)
+        except Exception as e:
+            logging.error(f"Failed to persist results: {str(e)}")
+
+    def _finish_stream(self, results: Dict[str, Any]) -> None:
+        """Persist the rest of a streamed run and send its summary alert"""
+        self._flush_stream()
+        try:
+            self.persistence_manager.save_run_summary(results)
+        except Exception as e:
+            logging.error(f"Failed to persist results: {str(e)}")
+        try:
+            self.alert_manager.send_alerts(
+                {
+                    **results,
+                    "total_models": len(results["models"]),
+                    "models": self._stream["failed"],
+                },
+                individual=False,
+            )
+        except Exception as e:
+            logging.error(f"Failed to send alerts: {str(e)}")
+
     def _persist_results(self, results: Dict[str, Any]) -> None:
         """Persist results to database"""
         try:
@@ -3,72 +3,663 @@
 Business rule validation with SQL templates
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
-from jinja2 import BaseLoader, Environment
-
-from qc2plus.core.connection import ConnectionManager
-from qc2plus.level1.macros import SQL_MACROS
+from jinja2 import BaseLoader, Environment, Template
+
+from qc2plus.core.connection import (
+    ConnectionManager,
+    QueryCancelledError,
+    QueryTimeoutError,
+)
+from qc2plus.level1.macros import (
+    APPROXIMATE_UNIQUE_MACRO,
+    DAILY_METRIC_MACRO,
+    FUSED_ROW_CHECKS_MACRO,
+    ROW_PREDICATE_MACROS,
+    SQL_MACROS,
+)
 # from qc2plus.level1.utils import build_sample_clause, get_macro_help
+from qc2plus.level1.utils import build_sample_clause
 from qc2plus.sql.db_functions import DB_FUNCTIONS
 
+# Default relative error tolerated between the approximate distinct count and
+# the row count (HyperLogLog estimates are within ~1-2%)
+APPROXIMATE_DISTINCT_ERROR = 0.02
+
+# Tests evaluated from catalog metadata only, without reading the table
+# (freshness also runs from metadata with `metadata: true`)
+METADATA_TESTS = {"row_count_change", "table_size"}
+
+# Backends whose catalog records no table modification time: freshness with
+# `metadata: true` scans MAX(column_name) there instead
+NO_MODIFICATION_TIME_BACKENDS = {"postgresql", "redshift"}
+
+# Tests counting their failed rows on the whole table even when sampled (the
+# sample only provides their examples)
+FULL_TABLE_COUNT_TESTS = set(ROW_PREDICATE_MACROS) | {"relationship"}
+
+# Tests whose counts can be summed over disjoint row ranges (shard_by)
+SHARDABLE_TESTS = set(ROW_PREDICATE_MACROS) | {"unique", "relationship"}
+
+# Tests returning at most one row of the standard result columns, which can be
+# combined with other tests into a single statement (batch_size on the target)
+BATCHABLE_TESTS = set(ROW_PREDICATE_MACROS) | {
+    "unique",
+    "relationship",
+    "freshness",
+    "accepted_benchmark_values",
+    "statistical_threshold",
+}
+
 
 class Level1Engine:
     """Level 1 quality test engine for business rule validation"""
 
-    def __init__(self, connection_manager: Optional[ConnectionManager] = None):
+    def __init__(
+        self,
+        connection_manager: Optional[ConnectionManager] = None,
+        sql_cache_size: int = 1024,
+        max_workers: int = 8,
+    ):
         self.connection_manager = connection_manager
+
+        # Thread pool shared by the models for intra-model concurrency
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.jinja_env = Environment(loader=BaseLoader())
 
-        # Register SQL macros
-        for macro_name, macro_template in SQL_MACROS.items():
-            self.jinja_env.globals[macro_name] = self._create_macro_function(
-                macro_template
-            )
+        # Compile templates once, they are only rendered afterwards
+        self._templates = {
+            test_type: self.jinja_env.from_string(template_str)
+            for test_type, template_str in SQL_MACROS.items()
+        }
+        self._predicate_templates = {
+            test_type: self.jinja_env.from_string(template_str)
+            for test_type, template_str in ROW_PREDICATE_MACROS.items()
+        }
+        self._fused_template = self.jinja_env.from_string(FUSED_ROW_CHECKS_MACRO)
+        self._approximate_unique_template = self.jinja_env.from_string(
+            APPROXIMATE_UNIQUE_MACRO
+        )
+        self._daily_metric_template = self.jinja_env.from_string(DAILY_METRIC_MACRO)
 
-        from qc2plus.level1.utils import build_sample_clause
+        # Register SQL macros
+        for macro_name, template in self._templates.items():
+            self.jinja_env.globals[macro_name] = self._create_macro_function(template)
 
         self.jinja_env.globals["build_sample_clause"] = build_sample_clause
 
-    def _create_macro_function(self, template_str: str):
-        """Create a Jinja2 macro function from template string"""
+        # LRU memo of rendered SQL
+        self.sql_cache_size = sql_cache_size
+        self._sql_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._sql_cache_lock = threading.Lock()
+        self._sql_cache_hits = 0
+        self._sql_cache_misses = 0
+
+        # Reference columns shared by several relationship tests of the run
+        self._shared_references: set = set()
+
+        # Results of the tests already run in batches, keyed by (model, test)
+        self._batched_results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._batched_results_lock = threading.Lock()
+
+    def _create_macro_function(self, template: Template):
+        """Create a Jinja2 macro function from a compiled template"""
 
         def macro_function(**kwargs):
-            template = self.jinja_env.from_string(template_str)
             return template.render(**kwargs)
 
         return macro_function
 
+    def _render_cached(self, key_parts: List[Any], render: Callable[[], str]) -> str:
+        """Render SQL through the LRU memo, keyed by a stable hash of key_parts"""
+        key = hashlib.sha256(
+            json.dumps(key_parts, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        with self._sql_cache_lock:
+            if key in self._sql_cache:
+                self._sql_cache.move_to_end(key)
+                self._sql_cache_hits += 1
+                return self._sql_cache[key]
+            self._sql_cache_misses += 1
+
+        sql = render()
+
+        if self.sql_cache_size > 0:
+            with self._sql_cache_lock:
+                self._sql_cache[key] = sql
+                self._sql_cache.move_to_end(key)
+                while len(self._sql_cache) > self.sql_cache_size:
+                    self._sql_cache.popitem(last=False)
+
+        return sql
+
+    def prepare_run(self, models: Dict[str, Dict[str, Any]]) -> None:
+        """Prepare run-wide optimizations from the models about to be tested.
+
+        Relationship tests sharing a reference_table/reference_column (in one
+        or several models) are checked against a key-set of that column built
+        once per run. Metadata freshness tests falling back to a scan are
+        reported once here.
+        """
+        references = Counter()
+        db_type = getattr(self.connection_manager, "db_type", None)
+        for model_name, model_config in models.items():
+            qc2plus_tests = model_config.get("qc2plus_tests") or {}
+            for test_config in qc2plus_tests.get("level1") or []:
+                freshness = test_config.get("freshness") or {}
+                if (
+                    freshness.get("metadata")
+                    and db_type in NO_MODIFICATION_TIME_BACKENDS
+                ):
+                    logging.warning(
+                        f"No modification time in the {db_type} catalog: "
+                        f"freshness of {model_name} scans "
+                        f"{freshness.get('column_name')} instead of metadata"
+                    )
+                test_params = test_config.get("relationship") or {}
+                if test_params.get("reference_table") and test_params.get(
+                    "reference_column"
+                ):
+                    references[
+                        (test_params["reference_table"], test_params["reference_column"])
+                    ] += 1
+
+        self._shared_references = {
+            reference for reference, count in references.items() if count > 1
+        }
+
+        with self._batched_results_lock:
+            self._batched_results.clear()
+
+    @staticmethod
+    def get_test_name(test_type: str, test_params: Dict[str, Any]) -> str:
+        """Name under which a test result is reported"""
+        return f"{test_type}_{test_params.get('column_name', 'test')}"
+
+    def is_metadata_test(self, test_type: str, test_params: Dict[str, Any]) -> bool:
+        """Whether a test only reads catalog metadata"""
+        if test_type in METADATA_TESTS:
+            return True
+        if test_type != "freshness" or not test_params.get("metadata"):
+            return False
+        db_type = getattr(self.connection_manager, "db_type", None)
+        return db_type not in NO_MODIFICATION_TIME_BACKENDS
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters of the rendered SQL cache"""
+        with self._sql_cache_lock:
+            return {
+                "hits": self._sql_cache_hits,
+                "misses": self._sql_cache_misses,
+                "size": len(self._sql_cache),
+                "max_size": self.sql_cache_size,
+            }
+
     def run_tests(
         self,
         model_name: str,
         level1_tests: List[Dict[str, Any]],
         model_config: Optional[Dict[str, Any]] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
-        """Run all Level 1 tests for a model"""
+        """Run all Level 1 tests for a model
+
+        on_result(test_name, result) is called as each test completes.
+        """
         results = {}
 
+        # Model sample drawn once and shared by its tests (materialize_sample)
+        if self.connection_manager and model_config and model_config.get(
+            "materialize_sample"
+        ):
+            self._materialize_model_sample(model_name, model_config)
+
+        # Row-level tests evaluated together in a single scan (fused mode)
+        fused_results = {}
+        if self.connection_manager and model_config and model_config.get("fused"):
+            fused_results = self._run_fused_tests(
+                model_name, level1_tests, model_config
+            )
+
+        tests = []
         for test_config in level1_tests:
             for test_type, test_params in test_config.items():
-                test_name = f"{test_type}_{test_params.get('column_name', 'test')}"
+                test_name = self.get_test_name(test_type, test_params)
+                tests.append((test_name, test_type, test_params))
+
+        def run_one(test_name: str, test_type: str, test_params: Dict[str, Any]):
+            if test_name in fused_results:
+                return fused_results[test_name]
+
+            with self._batched_results_lock:
+                batched_result = self._batched_results.pop((model_name, test_name), None)
+            if batched_result is not None:
+                return batched_result
+
+            try:
+                if self.is_metadata_test(test_type, test_params):
+                    return self._run_metadata_test(model_name, test_type, test_params)
+                if test_type == "statistical_threshold" and test_params.get(
+                    "snapshots"
+                ):
+                    return self._run_snapshot_threshold_test(
+                        model_name, test_name, test_params, model_config
+                    )
+                if test_params.get("incremental"):
+                    return self._run_incremental_test(
+                        model_name, test_name, test_type, test_params, model_config
+                    )
+                if test_params.get("shard_by"):
+                    return self._run_sharded_test(
+                        model_name, test_name, test_type, test_params, model_config
+                    )
+                return self._run_single_test(
+                    model_name,
+                    test_type,
+                    test_params,
+                    model_config=model_config,
+                )
+            except Exception as e:
+                logging.error(f"Test {test_name} failed: {str(e)}")
+                return {
+                    "passed": False,
+                    **(
+                        {"status": "cancelled"}
+                        if isinstance(e, QueryCancelledError)
+                        else {}
+                    ),
+                    "error": str(e),
+                    "severity": test_params.get("severity", "medium"),
+                }
+
+        def run_and_report(
+            test_name: str, test_type: str, test_params: Dict[str, Any]
+        ) -> Dict[str, Any]:
+            result = run_one(test_name, test_type, test_params)
+            if on_result:
+                on_result(test_name, result)
+            return result
+
+        # Intra-model concurrency (level1_concurrency on the model)
+        concurrency = int((model_config or {}).get("level1_concurrency", 1) or 1)
+        if self.connection_manager and concurrency > 1 and len(tests) > 1:
+            outcomes = self._run_concurrently(run_and_report, tests, concurrency)
+        else:
+            outcomes = [run_and_report(*test) for test in tests]
+
+        # Results keep the declaration order of the tests
+        for (test_name, _, _), result in zip(tests, outcomes):
+            results[test_name] = result
+
+        return results
+
+    async def arun_test(
+        self,
+        model_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run one Level 1 test from a coroutine, its query awaited with
+        ConnectionManager.aexecute_query.
+
+        Tests needing several queries or stored state (metadata, snapshots,
+        incremental, sharded, approximate unique) run with run_tests in the
+        default thread pool.
+        """
+        test_name = self.get_test_name(test_type, test_params)
+        with self._batched_results_lock:
+            batched_result = self._batched_results.pop((model_name, test_name), None)
+        if batched_result is not None:
+            return batched_result
+
+        if self.is_metadata_test(test_type, test_params) or any(
+            test_params.get(option)
+            for option in ("snapshots", "incremental", "shard_by", "approximate")
+        ):
+            results = await asyncio.to_thread(
+                self.run_tests, model_name, [{test_type: test_params}], model_config
+            )
+            return results[test_name]
+
+        try:
+            # Row counts are cached for the run after the first query
+            source_name, sample_config, total_rows, sample_row_count = (
+                await asyncio.to_thread(
+                    self._resolve_test_inputs,
+                    model_name,
+                    test_type,
+                    test_params,
+                    model_config,
+                )
+            )
+            sql = self.compile_test(
+                test_type,
+                self._with_shared_reference_keys(test_type, test_params),
+                source_name,
+                sample_config=sample_config,
+                total_rows=total_rows,
+                sample_row_count=sample_row_count,
+                count_source=model_name,
+            )
+        except Exception as e:
+            logging.error(f"Test {test_name} failed: {str(e)}")
+            return {
+                "passed": False,
+                **(
+                    {"status": "cancelled"}
+                    if isinstance(e, QueryCancelledError)
+                    else {}
+                ),
+                "error": str(e),
+                "severity": test_params.get("severity", "medium"),
+            }
+        base_result = self._base_result(sql, test_type, test_params)
+
+        try:
+            df = await self.connection_manager.aexecute_query(
+                sql, timeout_seconds=self._resolve_timeout(test_params, model_config)
+            )
+            return self._analyze_test_results(df, base_result, test_type, test_params)
+
+        except (QueryTimeoutError, QueryCancelledError) as e:
+            return self._timeout_result(sql, test_type, test_params, e)
+
+        except Exception as e:
+            return {
+                **base_result,
+                "passed": False,
+                "error": str(e),
+                "severity": test_params.get("severity", "medium"),
+                "message": f"Test execution failed: {str(e)}",
+            }
+
+    def run_batches(self, models: Dict[str, Dict[str, Any]], batch_size: int) -> int:
+        """
+        Run the small tests of several models in batches of `batch_size`
+        queries, one statement per batch.
+
+        Only tests with the same timeout share a batch. The results are kept
+        until run_tests reaches the tests. The tests of a timed-out batch get
+        the `timeout` status, those of a batch failing otherwise are left out
+        and run individually. Returns the number of tests run in batches.
+        """
+        # Prepared tests, grouped by timeout (None: target default)
+        prepared: Dict[Optional[float], List[Tuple[Any, ...]]] = {}
+        for model_name, model_config in models.items():
+            # A materialized sample is only drawn when the model runs
+            if model_config.get("materialize_sample"):
+                continue
+
+            level1_tests = (model_config.get("qc2plus_tests") or {}).get("level1") or []
+            for test_config in level1_tests:
+                for test_type, test_params in test_config.items():
+                    if not self.is_batchable(test_type, test_params, model_config):
+                        continue
+
+                    try:
+                        source_name, sample_config, total_rows, sample_row_count = (
+                            self._resolve_test_inputs(
+                                model_name, test_type, test_params, model_config
+                            )
+                        )
+                        sql = self.compile_test(
+                            test_type,
+                            self._with_shared_reference_keys(test_type, test_params),
+                            source_name,
+                            sample_config=sample_config,
+                            total_rows=total_rows,
+                            sample_row_count=sample_row_count,
+                            count_source=model_name,
+                        )
+                    except Exception as e:
+                        # Reported when the test runs on its own
+                        logging.debug(f"Test {test_type} not batched: {str(e)}")
+                        continue
+                    timeout = self._resolve_timeout(test_params, model_config)
+                    prepared.setdefault(timeout, []).append(
+                        (model_name, test_type, test_params, sql)
+                    )
+
+        batched = 0
+        for timeout, tests in prepared.items():
+            for start in range(0, len(tests), batch_size):
+                batch = tests[start : start + batch_size]
+                queries = {str(index): test[3] for index, test in enumerate(batch)}
 
                 try:
-                    result = self._run_single_test(
-                        model_name,
-                        test_type,
-                        test_params,
-                        model_config=model_config,
+                    frames = self.connection_manager.execute_batch(
+                        queries, timeout_seconds=timeout
                     )
-                    results[test_name] = result
+                except (QueryTimeoutError, QueryCancelledError) as e:
+                    # Running the tests again would hit the same timeout
+                    logging.warning(f"Batch of {len(batch)} tests stopped: {str(e)}")
+                    with self._batched_results_lock:
+                        for model_name, test_type, test_params, sql in batch:
+                            test_name = self.get_test_name(test_type, test_params)
+                            self._batched_results[(model_name, test_name)] = (
+                                self._timeout_result(sql, test_type, test_params, e)
+                            )
+                    batched += len(batch)
+                    continue
                 except Exception as e:
-                    logging.error(f"Test {test_name} failed: {str(e)}")
-                    results[test_name] = {
-                        "passed": False,
-                        "error": str(e),
-                        "severity": test_params.get("severity", "medium"),
+                    logging.warning(
+                        f"Batch of {len(batch)} tests failed, running them "
+                        f"individually: {str(e)}"
+                    )
+                    continue
+
+                with self._batched_results_lock:
+                    for index, (model_name, test_type, test_params, sql) in enumerate(
+                        batch
+                    ):
+                        test_name = self.get_test_name(test_type, test_params)
+                        self._batched_results[(model_name, test_name)] = (
+                            self._analyze_test_results(
+                                frames[str(index)],
+                                self._base_result(sql, test_type, test_params),
+                                test_type,
+                                test_params,
+                            )
+                        )
+                batched += len(batch)
+
+        return batched
+
+    def is_batchable(
+        self,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Dict[str, Any],
+    ) -> bool:
+        """Whether a test can be combined with others into a single statement"""
+        if test_type not in BATCHABLE_TESTS or self.is_metadata_test(
+            test_type, test_params
+        ):
+            return False
+
+        # Tests with their own execution path
+        if (
+            test_params.get("incremental")
+            or test_params.get("shard_by")
+            or (test_type == "unique" and test_params.get("approximate"))
+            or (test_type == "statistical_threshold" and test_params.get("snapshots"))
+        ):
+            return False
+
+        # Row-level tests of a fused model already share a single scan
+        return not (model_config.get("fused") and test_type in ROW_PREDICATE_MACROS)
+
+    def _run_concurrently(
+        self,
+        run_one: Callable[..., Dict[str, Any]],
+        tests: List[Tuple[Any, ...]],
+        concurrency: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run tests on the shared pool with at most `concurrency` in flight.
+
+        The calling thread runs tests too, so a test already running on the
+        pool (a sharded test) spreads its sub-queries over it without waiting
+        for a free worker.
+        """
+        executor = self._get_executor()
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(tests)
+        remaining = iter(enumerate(tests))
+        remaining_lock = threading.Lock()
+
+        def run_remaining() -> None:
+            while True:
+                with remaining_lock:
+                    item = next(remaining, None)
+                if item is None:
+                    return
+                index, test = item
+                outcomes[index] = run_one(*test)
+
+        helpers = [
+            executor.submit(run_remaining)
+            for _ in range(min(concurrency, len(tests)) - 1)
+        ]
+        run_remaining()
+        # Helpers not started yet would find nothing left to run
+        for helper in helpers:
+            helper.cancel()
+        for helper in helpers:
+            if not helper.cancelled():
+                helper.result()
+
+        return outcomes
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool shared by all models of this engine"""
+        with self._executor_lock:
+            if self._executor is None:
+                max_workers = self.max_workers
+                query_cap = getattr(self.connection_manager, "max_concurrent_queries", None)
+                if isinstance(query_cap, int) and query_cap > 0:
+                    max_workers = min(max_workers, query_cap)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="qc2plus-level1"
+                )
+            return self._executor
+
+    def _run_fused_tests(
+        self,
+        model_name: str,
+        level1_tests: List[Dict[str, Any]],
+        model_config: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Run every row-level test of a model with one conditional-aggregate query.
+
+        Only tests sharing the model-level sample configuration are fused, so
+        that they all read the same rows. Returns an empty dict (and lets the
+        caller run the tests one by one) when fusion is not possible.
+        """
+        model_sample = model_config.get("sample")
+        fusable: List[Tuple[str, str, Dict[str, Any]]] = []
+
+        for test_config in level1_tests:
+            for test_type, test_params in test_config.items():
+                if test_type not in ROW_PREDICATE_MACROS:
+                    continue
+                if not test_params.get("column_name"):
+                    continue
+                if test_params.get("incremental") or test_params.get("shard_by"):
+                    continue
+                if self._resolve_sample_config(test_params, model_config) != model_sample:
+                    continue
+                test_name = self.get_test_name(test_type, test_params)
+                fusable.append((test_name, test_type, test_params))
+
+        if len(fusable) < 2:
+            return {}
+
+        source_name, source_sample = self._resolve_test_source(
+            model_name, model_sample, model_config
+        )
+
+        try:
+            sql = self.compile_fused_tests(
+                source_name,
+                [(test_type, test_params) for _, test_type, test_params in fusable],
+                sample_config=source_sample,
+                sample_row_count=self._get_sample_row_count(source_name, source_sample),
+            )
+            df = self.connection_manager.execute_query(
+                sql, timeout_seconds=self._resolve_timeout({}, model_config)
+            )
+        except (QueryTimeoutError, QueryCancelledError) as e:
+            logging.error(f"Fused execution timed out for {model_name}: {str(e)}")
+            return {
+                test_name: self._timeout_result(sql, test_type, test_params, e)
+                for test_name, test_type, test_params in fusable
+            }
+        except Exception as e:
+            logging.warning(
+                f"Fused execution failed for {model_name}, "
+                f"falling back to individual tests: {str(e)}"
+            )
+            return {}
+
+        row = df.iloc[0] if len(df) > 0 else {}
+        total_rows = int(row.get("total_rows", 0) or 0)
+
+        results = {}
+        for index, (test_name, test_type, test_params) in enumerate(fusable):
+            failed_rows = int(row.get(f"failed_rows_{index}", 0) or 0)
+            severity = test_params.get("severity", "medium")
+            base_result = {
+                "query": sql,
+                "explanation": self._get_test_explanation(test_type, test_params),
+                "examples": [],
+                "severity": severity,
+            }
+
+            if failed_rows == 0:
+                results[test_name] = {
+                    **base_result,
+                    "passed": True,
+                    "failed_rows": 0,
+                    "total_rows": total_rows,
+                    "message": "Test passed - no violations found",
+                }
+                continue
+
+            example = row.get(f"example_{index}")
+            results[test_name] = {
+                **base_result,
+                "examples": [
+                    {
+                        "column_name": test_params["column_name"],
+                        "failed_rows": failed_rows,
+                        "total_rows": total_rows,
+                        "invalid_examples": (
+                            f"Invalid examples: {example}"
+                            if example is not None and not pd.isna(example)
+                            else None
+                        ),
                     }
+                ],
+                "passed": False,
+                "failed_rows": failed_rows,
+                "total_rows": total_rows,
+                "message": f"Test failed - {failed_rows} violations found",
+            }
 
         return results
 
@@ -78,21 +669,110 @@ class Level1Engine:
         test_type: str,
         test_params: Dict[str, Any],
         model_config: Optional[Dict[str, Any]] = None,
+        row_filter: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Run a single Level 1 test"""
 
-        # Resolve sampling configuration
-        sample_config = self._resolve_sample_config(test_params, model_config)
+        source_name, sample_config, total_rows, sample_row_count = (
+            self._resolve_test_inputs(
+                model_name, test_type, test_params, model_config, row_filter
+            )
+        )
+
+        # Approximate pre-check: the exact duplicate listing only runs when the
+        # HyperLogLog distinct count suggests duplicates
+        if (
+            self.connection_manager
+            and test_type == "unique"
+            and test_params.get("approximate")
+        ):
+            approximate_result = self._run_approximate_unique_check(
+                source_name,
+                test_params,
+                model_config,
+                sample_config=sample_config,
+                sample_row_count=sample_row_count,
+                row_filter=row_filter,
+            )
+            if approximate_result:
+                return approximate_result
 
         # Generate SQL for the test
         sql = self.compile_test(
             test_type,
-            test_params,
-            model_name,
+            self._with_shared_reference_keys(test_type, test_params),
+            source_name,
             sample_config=sample_config,
+            total_rows=total_rows,
+            sample_row_count=sample_row_count,
+            row_filter=row_filter,
+            count_source=model_name,
         )
-        # Prepare base result with new fields
-        base_result = {
+        base_result = self._base_result(sql, test_type, test_params)
+
+        if not self.connection_manager:
+            # If no connection manager, return compilation result
+            return {
+                **base_result,
+                "passed": True,
+                "sql": sql,
+                "severity": test_params.get("severity", "medium"),
+                "message": "Test compiled successfully (not executed)",
+            }
+
+        # Execute the test
+        try:
+            df = self.connection_manager.execute_query(
+                sql, timeout_seconds=self._resolve_timeout(test_params, model_config)
+            )
+            return self._analyze_test_results(df, base_result, test_type, test_params)
+
+        except (QueryTimeoutError, QueryCancelledError) as e:
+            return self._timeout_result(sql, test_type, test_params, e)
+
+        except Exception as e:
+            return {
+                **base_result,
+                "passed": False,
+                "error": str(e),
+                "severity": test_params.get("severity", "medium"),
+                "message": f"Test execution failed: {str(e)}",
+            }
+
+    def _resolve_test_inputs(
+        self,
+        model_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]],
+        row_filter: Optional[str] = None,
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[int], Optional[int]]:
+        """Resolve the table, sampling and row counts a test is compiled with"""
+
+        # Resolve sampling configuration
+        sample_config = self._resolve_sample_config(test_params, model_config)
+        source_name, sample_config = self._resolve_test_source(
+            model_name, sample_config, model_config
+        )
+
+        # Reuse the run-scoped row count of the model when the whole table is
+        # counted (sampled tests count the whole model too)
+        total_rows = None
+        if (
+            self.connection_manager
+            and not row_filter
+            and (test_type in ROW_PREDICATE_MACROS or test_type in ("unique", "relationship"))
+        ):
+            total_rows = self._get_total_rows(model_name, test_params, model_config)
+
+        sample_row_count = self._get_sample_row_count(source_name, sample_config)
+        return source_name, sample_config, total_rows, sample_row_count
+
+    def _base_result(
+        self, sql: str, test_type: str, test_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Fields shared by all the results of a test"""
+        return {
             "query": sql,  # New field for the executed SQL query
             "explanation": self._get_test_explanation(
                 test_type, test_params
@@ -101,58 +781,705 @@ class Level1Engine:
             "severity": test_params.get("severity", "medium"),
         }
 
-        if not self.connection_manager:
-            # If no connection manager, return compilation result
+    def _analyze_test_results(
+        self,
+        df: pd.DataFrame,
+        base_result: Dict[str, Any],
+        test_type: str,
+        test_params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Build the result of a test from the rows returned by its query"""
+
+        if len(df) == 0:
+            # No results means test passed (no violations found)
             return {
                 **base_result,
                 "passed": True,
-                "sql": sql,
+                "failed_rows": 0,
+                "total_rows": 0,
                 "severity": test_params.get("severity", "medium"),
-                "message": "Test compiled successfully (not executed)",
+                "message": "Test passed - no violations found",
             }
 
-        # Execute the test
+        # Results found means test failed (violations detected)
+        failed_rows = df.iloc[0].get("failed_rows", len(df))
+        total_rows = df.iloc[0].get("total_rows", failed_rows)
+        # New: Extract examples of errors
+        examples = self._extract_examples_from_results(df, test_type, test_params)
+
+        return {
+            **base_result,
+            "examples": df.head(5).to_dict(orient="records"),
+            "passed": False,
+            "failed_rows": int(failed_rows),
+            "total_rows": int(total_rows),
+            "severity": test_params.get("severity", "medium"),
+            "message": f"Test failed - {failed_rows} violations found",
+        }
+
+    def _run_metadata_test(
+        self, model_name: str, test_type: str, test_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run a freshness, row_count_change or table_size test from catalog metadata"""
+
+        base_result = {
+            "query": "",
+            "explanation": self._get_test_explanation(test_type, test_params),
+            "examples": [],
+            "severity": test_params.get("severity", "medium"),
+        }
+
+        if not self.connection_manager:
+            return {
+                **base_result,
+                "passed": True,
+                "message": "Metadata test (not executed)",
+            }
+
+        metadata = dict(self.connection_manager.get_table_metadata(model_name))
+        failures = []
+
+        if test_type == "freshness":
+            if metadata["last_modified"] is None:
+                raise ValueError(
+                    f"Last modification time not available in the "
+                    f"{self.connection_manager.db_type} catalog"
+                )
+            last_modified = metadata["last_modified"]
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.tz_localize("UTC")
+            age = pd.Timestamp.now(tz="UTC") - last_modified
+            max_age = timedelta(days=float(test_params["max_age_days"]))
+            if age > max_age:
+                failures.append(
+                    f"Table last modified {last_modified.isoformat()}, "
+                    f"expected within {test_params['max_age_days']} days"
+                )
+            total_rows = 1
+
+        elif test_type == "row_count_change":
+            row_count = self._require_metadata(metadata, "row_count")
+            previous = self.connection_manager.get_last_test_result(
+                model_name, self.get_test_name(test_type, test_params)
+            )
+            previous_count = (
+                int(previous["total_rows"])
+                if previous and not pd.isna(previous["total_rows"])
+                else None
+            )
+            if previous_count is not None:
+                if previous_count:
+                    change = (row_count - previous_count) / previous_count
+                else:
+                    change = float("inf") if row_count else 0.0
+
+                max_decrease = test_params.get("max_decrease")
+                max_increase = test_params.get("max_increase")
+                if max_decrease is not None and change < -max_decrease:
+                    failures.append(
+                        f"Row count dropped from {previous_count} to {row_count} "
+                        f"(more than {max_decrease:.0%})"
+                    )
+                if max_increase is not None and change > max_increase:
+                    failures.append(
+                        f"Row count grew from {previous_count} to {row_count} "
+                        f"(more than {max_increase:.0%})"
+                    )
+            metadata["previous_row_count"] = previous_count
+            # Stored as total_rows, the baseline of the next run
+            total_rows = row_count
+
+        else:  # table_size
+            bounds = [
+                ("row_count", "min_rows", "max_rows", "rows"),
+                ("size_bytes", "min_bytes", "max_bytes", "bytes"),
+            ]
+            for key, min_param, max_param, unit in bounds:
+                if min_param not in test_params and max_param not in test_params:
+                    continue
+                value = self._require_metadata(metadata, key)
+                if min_param in test_params and value < test_params[min_param]:
+                    failures.append(
+                        f"{value} {unit} is below the minimum of {test_params[min_param]}"
+                    )
+                if max_param in test_params and value > test_params[max_param]:
+                    failures.append(
+                        f"{value} {unit} is above the maximum of {test_params[max_param]}"
+                    )
+            total_rows = metadata["row_count"] or 0
+
+        if metadata["last_modified"] is not None:
+            metadata["last_modified"] = metadata["last_modified"].isoformat()
+
+        return {
+            **base_result,
+            "passed": not failures,
+            "failed_rows": 1 if failures else 0,
+            "total_rows": total_rows,
+            "message": (
+                f"Test failed - {'; '.join(failures)}"
+                if failures
+                else "Test passed - catalog metadata within bounds"
+            ),
+            "metadata": metadata,
+        }
+
+    def _require_metadata(self, metadata: Dict[str, Any], key: str) -> Any:
+        """Get a catalog metadata value, failing when the backend lacks it"""
+        if metadata[key] is None:
+            raise ValueError(
+                f"{key} not available in the {self.connection_manager.db_type} catalog"
+            )
+        return metadata[key]
+
+    def _run_approximate_unique_check(
+        self,
+        model_name: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]],
+        sample_config: Optional[Dict[str, Any]] = None,
+        sample_row_count: Optional[int] = None,
+        row_filter: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compare the approximate distinct count of a column to its non-null row
+        count. Returns a passed result when they agree within the error bound
+        (`approximate_error`), or None when the exact test must run: suspected
+        duplicates, no approximate distinct count on the backend, or a failed
+        pre-check.
+        """
+        sql = self.compile_approximate_unique(
+            model_name,
+            test_params,
+            sample_config=sample_config,
+            sample_row_count=sample_row_count,
+            row_filter=row_filter,
+        )
+        if sql is None:
+            return None
+
         try:
-            df = self.connection_manager.execute_query(sql)
+            df = self.connection_manager.execute_query(
+                sql, timeout_seconds=self._resolve_timeout(test_params, model_config)
+            )
+        except (QueryTimeoutError, QueryCancelledError) as e:
+            return self._timeout_result(sql, "unique", test_params, e)
+        except Exception as e:
+            logging.warning(
+                f"Approximate unique check failed on {model_name}, "
+                f"running the exact test: {str(e)}"
+            )
+            return None
 
-            # Analyze results
-            if len(df) == 0:
-                # No results means test passed (no violations found)
-                return {
-                    **base_result,
-                    "passed": True,
-                    "failed_rows": 0,
-                    "total_rows": 0,
-                    "severity": test_params.get("severity", "medium"),
-                    "message": "Test passed - no violations found",
-                }
-            else:
-                # Results found means test failed (violations detected)
-                failed_rows = df.iloc[0].get("failed_rows", len(df))
-                total_rows = df.iloc[0].get("total_rows", failed_rows)
-                # New: Extract examples of errors
-                examples = self._extract_examples_from_results(
-                    df, test_type, test_params
+        if len(df) == 0:
+            return None
+
+        non_null_rows = int(df.iloc[0]["non_null_rows"] or 0)
+        approx_distinct = int(df.iloc[0]["approx_distinct"] or 0)
+        error_bound = float(
+            test_params.get("approximate_error", APPROXIMATE_DISTINCT_ERROR)
+        )
+
+        if approx_distinct < non_null_rows * (1 - error_bound):
+            return None
+
+        return {
+            "query": sql,
+            "explanation": self._get_test_explanation("unique", test_params),
+            "examples": [],
+            "passed": True,
+            "failed_rows": 0,
+            "total_rows": int(df.iloc[0]["total_rows"] or 0),
+            "severity": test_params.get("severity", "medium"),
+            "message": (
+                f"Test passed - approximate distinct count within "
+                f"{error_bound:.1%} of the row count"
+            ),
+            "approximate": {
+                "approx_distinct": approx_distinct,
+                "non_null_rows": non_null_rows,
+                "error_bound": error_bound,
+            },
+        }
+
+    def _run_snapshot_threshold_test(
+        self,
+        model_name: str,
+        test_name: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run a statistical_threshold test against persisted daily snapshots.
+
+        The daily values of the past `window_days` are read from
+        quality_metric_snapshots. Only the days missing there and the current
+        day are computed from the model, and the completed days are stored
+        for the next runs. Snapshots are invalidated when the metric, column
+        or sampling changes.
+        """
+        sample_config = self._resolve_sample_config(test_params, model_config)
+        window_days = int(test_params.get("window_days") or 30)
+        today = date.today()
+        window_start = today - timedelta(days=window_days)
+
+        config_hash = hashlib.sha256(
+            json.dumps(
+                [test_params.get("column_name"), test_params.get("metric"), sample_config],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+        # Stored daily values of the window, for the current configuration
+        history = {}
+        snapshots = pd.DataFrame()
+        if self.connection_manager:
+            try:
+                snapshots = self.connection_manager.get_metric_snapshots(
+                    model_name, test_name, window_start
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Metric snapshots unavailable for {test_name}, "
+                    f"computing the full window: {str(e)}"
                 )
+            for row in snapshots.itertuples():
+                if row.config_hash == config_hash:
+                    history[pd.Timestamp(row.metric_date).date()] = (
+                        None if pd.isna(row.metric_value) else float(row.metric_value)
+                    )
 
-                return {
-                    **base_result,
-                    "examples": df.head(5).to_dict(orient="records"),
-                    "passed": False,
-                    "failed_rows": int(failed_rows),
-                    "total_rows": int(total_rows),
-                    "severity": test_params.get("severity", "medium"),
-                    "message": f"Test failed - {failed_rows} violations found",
-                }
+        window = [window_start + timedelta(days=i) for i in range(window_days)]
+        missing_days = [day for day in window if day not in history]
+        start_date = missing_days[0] if missing_days else today
+
+        sql = self.compile_daily_metric(
+            model_name, test_params, start_date, today, sample_config=sample_config
+        )
+        base_result = {
+            "query": sql,
+            "explanation": self._get_test_explanation(
+                "statistical_threshold", test_params
+            ),
+            "examples": [],
+            "severity": test_params.get("severity", "medium"),
+        }
+
+        if not self.connection_manager:
+            return {
+                **base_result,
+                "passed": True,
+                "message": "Test compiled successfully (not executed)",
+            }
 
+        try:
+            df = self.connection_manager.execute_query(
+                sql, timeout_seconds=self._resolve_timeout(test_params, model_config)
+            )
+        except (QueryTimeoutError, QueryCancelledError) as e:
+            return self._timeout_result(sql, "statistical_threshold", test_params, e)
+
+        computed = {
+            pd.Timestamp(row.metric_date).date(): (
+                None if pd.isna(row.metric_value) else float(row.metric_value)
+            )
+            for row in df.itertuples()
+        }
+
+        # Completed days are stored, days without rows as NULL so that they
+        # are not scanned again (like the full query, they are not averaged)
+        new_snapshots = [(day, computed.get(day)) for day in missing_days]
+        try:
+            self.connection_manager.save_metric_snapshots(
+                model_name, test_name, config_hash, new_snapshots
+            )
         except Exception as e:
+            logging.warning(f"Could not save metric snapshots of {test_name}: {str(e)}")
+        history.update(new_snapshots)
+
+        # A count over no rows is 0, other aggregates are NULL
+        counts_rows = not test_params.get("column_name") or test_params.get(
+            "metric"
+        ) not in ("avg", "sum", "min", "max")
+        current_metric = computed.get(today, 0.0 if counts_rows else None)
+
+        values = pd.Series(
+            [value for day, value in history.items() if day in window], dtype=float
+        ).dropna()
+        avg_metric = values.mean() if len(values) else None
+        stddev_metric = values.std() if len(values) > 1 else None
+
+        threshold_value = float(test_params["threshold_value"])
+        if test_params.get("threshold_type") == "absolute":
+            threshold = threshold_value
+            exceeded = current_metric is not None and current_metric > threshold
+        else:
+            margin = threshold_value * (stddev_metric or 0.0)
+            threshold = avg_metric + margin if avg_metric is not None else None
+            exceeded = (
+                current_metric is not None
+                and avg_metric is not None
+                and abs(current_metric - avg_metric) > margin
+            )
+
+        snapshot_info = {
+            "history_days": int(len(values)),
+            "computed_from": start_date.isoformat(),
+        }
+        if not exceeded:
             return {
                 **base_result,
-                "passed": False,
-                "error": str(e),
+                "passed": True,
+                "failed_rows": 0,
+                "total_rows": 1,
+                "message": "Test passed - no violations found",
+                "snapshots": snapshot_info,
+            }
+
+        return {
+            **base_result,
+            "passed": False,
+            "failed_rows": 1,
+            "total_rows": 1,
+            "message": (
+                f"Statistical threshold exceeded: current={current_metric:.2f}, "
+                f"threshold={threshold:.2f}, historical_avg={avg_metric or 0:.2f}"
+            ),
+            "snapshots": snapshot_info,
+        }
+
+    def _run_sharded_test(
+        self,
+        model_name: str,
+        test_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Split a test into `shard_by.shards` sub-queries on disjoint row ranges,
+        run them concurrently and sum their counts.
+
+        Row-level and relationship tests are split on ranges of the
+        `shard_by.column` (a date or numeric column); unique tests on a hash of
+        the tested column, so that the duplicates of a value are in one shard.
+        """
+        shard_config = test_params["shard_by"]
+        if isinstance(shard_config, str):
+            shard_config = {"column": shard_config}
+        params = {key: value for key, value in test_params.items() if key != "shard_by"}
+
+        if (
+            not self.connection_manager
+            or test_type not in SHARDABLE_TESTS
+            or self._resolve_sample_config(test_params, model_config)
+        ):
+            logging.warning(
+                f"Test {test_name} on {model_name} cannot be sharded "
+                "(additive or unique test on the full table required), running it whole"
+            )
+            return self._run_single_test(model_name, test_type, params, model_config)
+
+        shard_filters = self._build_shard_filters(
+            model_name, test_type, params, shard_config
+        )
+        if len(shard_filters) < 2:
+            return self._run_single_test(model_name, test_type, params, model_config)
+
+        # On the shared pool, within its query cap
+        shard_results = self._run_concurrently(
+            lambda row_filter: self._run_single_test(
+                model_name, test_type, params, model_config, row_filter=row_filter
+            ),
+            [(row_filter,) for row_filter in shard_filters],
+            min(len(shard_filters), self.max_workers),
+        )
+
+        # A shard that timed out or failed makes the whole test fail the same way
+        for shard_result in shard_results:
+            if shard_result.get("status") == "timeout" or shard_result.get("error"):
+                return shard_result
+
+        failed_rows = sum(int(result.get("failed_rows", 0)) for result in shard_results)
+        base_result = {
+            **self._base_result(
+                ";\n".join(result["query"] for result in shard_results),
+                test_type,
+                test_params,
+            ),
+            "shards": len(shard_filters),
+        }
+        if not failed_rows:
+            return {
+                **base_result,
+                "passed": True,
+                "failed_rows": 0,
+                "total_rows": 0,
+                "message": "Test passed - no violations found",
+            }
+
+        # Passing shards return no row, hence no row count
+        total_rows = self._get_total_rows(model_name, params, model_config)
+        if total_rows is None:
+            total_rows = sum(int(result.get("total_rows", 0)) for result in shard_results)
+
+        examples = [
+            example for result in shard_results for example in result.get("examples", [])
+        ]
+        return {
+            **base_result,
+            "examples": examples[:5],
+            "passed": False,
+            "failed_rows": failed_rows,
+            "total_rows": int(total_rows),
+            "message": f"Test failed - {failed_rows} violations found",
+        }
+
+    def _build_shard_filters(
+        self,
+        model_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        shard_config: Dict[str, Any],
+    ) -> List[str]:
+        """Build the row filters of the shards of a test (together, all the rows)"""
+        shards = int(shard_config.get("shards", 4))
+        db_type = self.connection_manager.db_type
+        db_funcs = DB_FUNCTIONS.get(db_type, DB_FUNCTIONS["postgresql"])
+
+        if test_type == "unique":
+            key = db_funcs["hash_int"](test_params["column_name"])
+            return [f"ABS(MOD({key}, {shards})) = {shard}" for shard in range(shards)]
+
+        column = shard_config.get("column")
+        if not column:
+            raise ValueError(f"shard_by of a {test_type} test requires a 'column'")
+
+        schema = self.connection_manager.config.get("schema", "public")
+        bounds = self.connection_manager.execute_query(
+            f"SELECT MIN({column}) AS min_value, MAX({column}) AS max_value "
+            f"FROM {schema}.{model_name}"
+        )
+        min_value, max_value = bounds.iloc[0]["min_value"], bounds.iloc[0]["max_value"]
+        if pd.isna(min_value) or pd.isna(max_value) or min_value == max_value:
+            return []
+
+        boundaries = []
+        for shard in range(1, shards):
+            if isinstance(min_value, (datetime, date, pd.Timestamp)):
+                low, high = pd.Timestamp(min_value), pd.Timestamp(max_value)
+                boundary = low + (high - low) * shard / shards
+                # Whole days compare cleanly with DATE columns
+                if low == low.normalize() and high == high.normalize():
+                    boundary = f"'{boundary.normalize().date().isoformat()}'"
+                else:
+                    boundary = f"'{boundary.strftime('%Y-%m-%d %H:%M:%S')}'"
+            elif pd.api.types.is_integer(min_value) and pd.api.types.is_integer(max_value):
+                boundary = str(
+                    int(min_value) + (int(max_value) - int(min_value)) * shard // shards
+                )
+            elif pd.api.types.is_number(min_value):
+                boundary = repr(
+                    float(min_value) + (float(max_value) - float(min_value)) * shard / shards
+                )
+            else:
+                raise ValueError(
+                    f"shard_by column {column} must be a date or numeric column"
+                )
+            if boundary not in boundaries:
+                boundaries.append(boundary)
+
+        # Open-ended first and last shards: rows outside the bounds read above
+        # (inserted since) and NULLs are still checked
+        filters = []
+        for index, boundary in enumerate(boundaries):
+            lower = f"{column} >= {boundaries[index - 1]} AND " if index else ""
+            filters.append(f"{lower}{column} < {boundary}")
+        if boundaries:
+            filters.append(f"({column} >= {boundaries[-1]} OR {column} IS NULL)")
+        return filters
+
+    def _run_incremental_test(
+        self,
+        model_name: str,
+        test_name: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run an additive test on the rows above its stored high-water mark.
+
+        The counts of the new rows are added to the stored counts. A full scan
+        is done when there is no usable state, when the test configuration or
+        watermark column changed, and every `full_refresh_days` days.
+        """
+        incremental = test_params["incremental"]
+        if isinstance(incremental, str):
+            incremental = {"column": incremental}
+        column = incremental["column"]
+
+        if (
+            not self.connection_manager
+            or test_type not in ROW_PREDICATE_MACROS
+            or self._resolve_sample_config(test_params, model_config)
+        ):
+            logging.warning(
+                f"Test {test_name} on {model_name} cannot run incrementally "
+                "(additive test on the full table required), running a full scan"
+            )
+            return self._run_single_test(
+                model_name, test_type, test_params, model_config=model_config
+            )
+
+        config_hash = hashlib.sha256(
+            json.dumps([test_type, test_params], sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        try:
+            state = self.connection_manager.get_incremental_state(model_name, test_name)
+        except Exception as e:
+            logging.warning(
+                f"Could not read incremental state of {test_name}: {str(e)}"
+            )
+            state = None
+
+        now = datetime.now()
+        full_refresh_days = incremental.get("full_refresh_days", 7)
+        full_refresh = (
+            state is None
+            or state["high_water_mark"] is None
+            or state["watermark_column"] != column
+            or state["config_hash"] != config_hash
+            or self._is_refresh_due(state["last_full_refresh"], full_refresh_days, now)
+        )
+        previous_mark = None if full_refresh else state["high_water_mark"]
+
+        # New high-water mark and number of rows to scan, bounded before the
+        # test so that rows arriving meanwhile are left to the next run
+        schema = self.connection_manager.config.get("schema", "public")
+        where_clause = (
+            f"WHERE {column} > {self._sql_literal(previous_mark)}"
+            if previous_mark is not None
+            else ""
+        )
+        df = self.connection_manager.execute_query(
+            f"SELECT MAX({column}) AS high_water_mark, COUNT(*) AS new_rows "
+            f"FROM {schema}.{model_name} {where_clause}",
+            timeout_seconds=self._resolve_timeout(test_params, model_config),
+        )
+        new_mark = df.iloc[0]["high_water_mark"] if len(df) > 0 else None
+        new_mark = None if pd.isna(new_mark) else self._json_value(new_mark)
+        new_rows = int(df.iloc[0]["new_rows"]) if len(df) > 0 else 0
+
+        if full_refresh:
+            row_filter = (
+                f"({column} <= {self._sql_literal(new_mark)} OR {column} IS NULL)"
+                if new_mark is not None
+                else None
+            )
+            result = self._run_single_test(
+                model_name, test_type, test_params, model_config, row_filter=row_filter
+            )
+        elif new_rows == 0:
+            # Nothing new: the stored result still holds
+            result = {
+                "query": "",
+                "explanation": self._get_test_explanation(test_type, test_params),
+                "examples": [],
                 "severity": test_params.get("severity", "medium"),
-                "message": f"Test execution failed: {str(e)}",
+                "failed_rows": 0,
             }
+        else:
+            row_filter = (
+                f"{column} > {self._sql_literal(previous_mark)} "
+                f"AND {column} <= {self._sql_literal(new_mark)}"
+            )
+            result = self._run_single_test(
+                model_name, test_type, test_params, model_config, row_filter=row_filter
+            )
+
+        if "error" in result:
+            # The stored state is kept for the next run
+            return result
+
+        new_failed = int(result.get("failed_rows", 0) or 0)
+        failed_rows = new_failed + (0 if full_refresh else int(state["failed_rows"]))
+        total_rows = new_rows + (0 if full_refresh else int(state["total_rows"]))
+
+        try:
+            self.connection_manager.save_incremental_state(
+                model_name,
+                test_name,
+                {
+                    "watermark_column": column,
+                    "high_water_mark": (
+                        new_mark if new_mark is not None else previous_mark
+                    ),
+                    "config_hash": config_hash,
+                    "failed_rows": failed_rows,
+                    "total_rows": total_rows,
+                    "last_full_refresh": (
+                        now if full_refresh else state["last_full_refresh"]
+                    ),
+                },
+            )
+        except Exception as e:
+            logging.warning(
+                f"Could not save incremental state of {test_name}: {str(e)}"
+            )
+
+        if failed_rows > 0:
+            message = (
+                f"Test failed - {failed_rows} violations found "
+                f"({new_failed} in {new_rows} scanned rows)"
+            )
+        else:
+            message = "Test passed - no violations found"
+
+        return {
+            **result,
+            "passed": failed_rows == 0,
+            "failed_rows": failed_rows,
+            "total_rows": total_rows,
+            "message": message,
+            "incremental": {
+                "full_refresh": full_refresh,
+                "high_water_mark": new_mark,
+                "scanned_rows": new_rows,
+            },
+        }
+
+    @staticmethod
+    def _is_refresh_due(
+        last_full_refresh: Any, full_refresh_days: float, now: datetime
+    ) -> bool:
+        """Check whether the periodic full refresh of an incremental test is due"""
+        if last_full_refresh is None or pd.isna(last_full_refresh):
+            return True
+        last_full_refresh = pd.Timestamp(last_full_refresh)
+        if last_full_refresh.tzinfo is not None:
+            last_full_refresh = last_full_refresh.tz_convert(None)
+        return now - last_full_refresh >= timedelta(days=full_refresh_days)
+
+    @staticmethod
+    def _json_value(value: Any) -> Any:
+        """Convert a high-water mark read from the database to a JSON value"""
+        if isinstance(value, str):
+            return value
+        if pd.api.types.is_integer(value):
+            return int(value)
+        if pd.api.types.is_float(value):
+            return float(value)
+        return str(value)  # timestamps and dates
+
+    @staticmethod
+    def _sql_literal(value: Any) -> str:
+        """Render a high-water mark as a SQL literal"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        escaped = str(value).replace("'", "''")
+        return f"'{escaped}'"
 
     def compile_test(
         self,
@@ -160,12 +1487,171 @@ class Level1Engine:
         test_params: Dict[str, Any],
         model_name: str,
         sample_config: Optional[Dict[str, Any]] = None,
+        total_rows: Optional[int] = None,
+        sample_row_count: Optional[int] = None,
+        row_filter: Optional[str] = None,
+        count_source: Optional[str] = None,
     ) -> str:
-        """Compile a test to SQL"""
+        """Compile a test to SQL
+
+        failed_rows and total_rows are counted on count_source (default
+        model_name), the model a sampled or materialized sample source is
+        drawn from.
+        """
 
         if test_type not in SQL_MACROS:
             raise ValueError(f"Unknown test type: {test_type}")
 
+        context = self._build_context(
+            test_params,
+            model_name,
+            sample_config,
+            total_rows=total_rows,
+            sample_row_count=sample_row_count,
+            row_filter=row_filter,
+            count_source=count_source,
+        )
+
+        # Rendu du SQL
+        key_parts = [
+            test_type,
+            test_params,
+            context["db_type"],
+            context["schema"],
+            sample_config,
+            model_name,
+            total_rows,
+            sample_row_count,
+            row_filter,
+            count_source,
+        ]
+        return self._render_cached(
+            key_parts, lambda: self._templates[test_type].render(**context)
+        )
+
+    def compile_approximate_unique(
+        self,
+        model_name: str,
+        test_params: Dict[str, Any],
+        sample_config: Optional[Dict[str, Any]] = None,
+        sample_row_count: Optional[int] = None,
+        row_filter: Optional[str] = None,
+    ) -> Optional[str]:
+        """Compile the approximate unique pre-check, None without backend support"""
+
+        context = self._build_context(
+            test_params,
+            model_name,
+            sample_config,
+            sample_row_count=sample_row_count,
+            row_filter=row_filter,
+        )
+        if "approx_count_distinct" not in context["db_functions"]:
+            return None
+
+        key_parts = [
+            "approximate_unique",
+            test_params,
+            context["db_type"],
+            context["schema"],
+            sample_config,
+            model_name,
+            sample_row_count,
+            row_filter,
+        ]
+        return self._render_cached(
+            key_parts, lambda: self._approximate_unique_template.render(**context)
+        )
+
+    def compile_daily_metric(
+        self,
+        model_name: str,
+        test_params: Dict[str, Any],
+        start_date: date,
+        end_date: date,
+        sample_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Compile the daily values of a statistical_threshold metric over a date range"""
+
+        context = self._build_context(test_params, model_name, sample_config)
+        context.update(
+            start_date=start_date.isoformat(), end_date=end_date.isoformat()
+        )
+
+        key_parts = [
+            "daily_metric",
+            test_params,
+            context["db_type"],
+            context["schema"],
+            sample_config,
+            model_name,
+            context["start_date"],
+            context["end_date"],
+        ]
+        return self._render_cached(
+            key_parts, lambda: self._daily_metric_template.render(**context)
+        )
+
+    def compile_fused_tests(
+        self,
+        model_name: str,
+        tests: List[Tuple[str, Dict[str, Any]]],
+        sample_config: Optional[Dict[str, Any]] = None,
+        sample_row_count: Optional[int] = None,
+    ) -> str:
+        """Compile several row-level tests into a single conditional-aggregate query"""
+
+        for test_type, _ in tests:
+            if test_type not in ROW_PREDICATE_MACROS:
+                raise ValueError(f"Test type {test_type} cannot be fused")
+
+        context = self._build_context(
+            {}, model_name, sample_config, sample_row_count=sample_row_count
+        )
+
+        def render() -> str:
+            checks = []
+            for test_type, test_params in tests:
+                test_context = self._build_context(
+                    test_params,
+                    model_name,
+                    sample_config,
+                    sample_row_count=sample_row_count,
+                )
+                predicate = self._predicate_templates[test_type].render(
+                    **test_context
+                )
+                checks.append(
+                    {
+                        "column_name": test_params["column_name"],
+                        "predicate": predicate.strip(),
+                    }
+                )
+            return self._fused_template.render(checks=checks, **context)
+
+        key_parts = [
+            "fused",
+            tests,
+            context["db_type"],
+            context["schema"],
+            sample_config,
+            model_name,
+            sample_row_count,
+        ]
+        return self._render_cached(key_parts, render)
+
+    def _build_context(
+        self,
+        test_params: Dict[str, Any],
+        model_name: str,
+        sample_config: Optional[Dict[str, Any]] = None,
+        total_rows: Optional[int] = None,
+        sample_row_count: Optional[int] = None,
+        row_filter: Optional[str] = None,
+        count_source: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the Jinja rendering context for a test"""
+
         # Déterminer le type de base de données
         db_type = (
             self.connection_manager.db_type if self.connection_manager else "postgresql"
@@ -185,17 +1671,18 @@ class Level1Engine:
             "sample_config": sample_config,
             "db_functions": db_functions,
             "db_type": db_type,
+            "total_rows": total_rows,
+            "sample_row_count": sample_row_count,
+            "row_filter": row_filter,
+            "count_source": count_source,
             **test_params,
         }
 
-        # Rendu du SQL
-        template = self.jinja_env.from_string(SQL_MACROS[test_type])
-        sql = template.render(**context)
-        return sql
+        return context
 
     def get_available_tests(self) -> List[str]:
         """Get list of available test types"""
-        return list(SQL_MACROS.keys())
+        return list(SQL_MACROS.keys()) + sorted(METADATA_TESTS)
 
     def get_test_documentation(self, test_type: str) -> Dict[str, Any]:
         """Get documentation for a specific test type"""
@@ -205,6 +1692,8 @@ class Level1Engine:
                 "description": "Tests that a column contains only unique values",
                 "parameters": {
                     "column_name": "Column to test for uniqueness",
+                    "approximate": "Pre-check with an approximate distinct count (optional)",
+                    "approximate_error": "Tolerated relative error (default: 0.02)",
                     "severity": "Test severity (critical, high, medium, low)",
                 },
                 "example": {
@@ -290,6 +1779,37 @@ class Level1Engine:
                     }
                 },
             },
+            "row_count_change": {
+                "description": "Tests the row count change since the previous run from catalog metadata",
+                "parameters": {
+                    "max_decrease": "Maximum relative decrease (0.0-1.0)",
+                    "max_increase": "Maximum relative increase",
+                    "severity": "Test severity (critical, high, medium, low)",
+                },
+                "example": {
+                    "row_count_change": {
+                        "max_decrease": 0.1,
+                        "max_increase": 0.5,
+                        "severity": "high",
+                    }
+                },
+            },
+            "table_size": {
+                "description": "Tests the table row count and size bounds from catalog metadata",
+                "parameters": {
+                    "min_rows": "Minimum row count",
+                    "max_rows": "Maximum row count",
+                    "min_bytes": "Minimum size in bytes",
+                    "max_bytes": "Maximum size in bytes",
+                    "severity": "Test severity (critical, high, medium, low)",
+                },
+                "example": {
+                    "table_size": {
+                        "min_rows": 1000,
+                        "severity": "critical",
+                    }
+                },
+            },
             "accepted_benchmark_values": {
                 "description": "Tests that column values match benchmark distribution percentages",
                 "parameters": {
@@ -368,6 +1888,17 @@ class Level1Engine:
                     "Test statistical_threshold requires 'threshold_value' parameter"
                 )
 
+        elif test_type == "row_count_change":
+            if "max_decrease" not in test_params and "max_increase" not in test_params:
+                issues.append(
+                    "Test row_count_change requires 'max_decrease' or 'max_increase'"
+                )
+
+        elif test_type == "table_size":
+            bounds = ["min_rows", "max_rows", "min_bytes", "max_bytes"]
+            if not any(bound in test_params for bound in bounds):
+                issues.append(f"Test table_size requires one of {bounds}")
+
         elif test_type == "accepted_benchmark_values":
             required_params = [
                 "column_name",
@@ -417,6 +1948,8 @@ class Level1Engine:
             "statistical_threshold": f"Verifies that metric '{test_params.get('metric','N/A')}' respects statistical thresholds based on the last {test_params.get('window_days',30)} days of historical data.",
             "accepted_benchmark_values": f"Verifies that the distribution of values in '{test_params.get('column_name','N/A')}' matches expected reference percentages with a tolerance of {test_params.get('threshold',0) * 100}%.",
             "freshness": f"Verifies that data in column '{test_params.get('column_name','N/A')}' is not too old (more than {test_params.get('max_age_days','N/A')} days).",
+            "row_count_change": f"Verifies from catalog metadata that the row count did not drop by more than {test_params.get('max_decrease','N/A')} or grow by more than {test_params.get('max_increase','N/A')} (fractions) since the previous run.",
+            "table_size": "Verifies from catalog metadata that the table row count and size stay within the configured bounds.",
         }
 
         return explanations.get(
@@ -495,6 +2028,175 @@ class Level1Engine:
 
         return examples
 
+    def _get_total_rows(
+        self,
+        model_name: str,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]],
+    ) -> Optional[int]:
+        """Get the model row count from the connection's table stats cache"""
+
+        approximate = test_params.get(
+            "approximate_row_count",
+            (model_config or {}).get("approximate_row_count", False),
+        )
+
+        try:
+            return int(
+                self.connection_manager.get_row_count(
+                    model_name, approximate=approximate
+                )
+            )
+        except Exception as e:
+            logging.warning(
+                f"Could not get cached row count for {model_name}: {str(e)}"
+            )
+            return None
+
+    def _with_shared_reference_keys(
+        self, test_type: str, test_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Point a relationship test at the run's key-set of its reference column"""
+
+        if test_type != "relationship" or not self.connection_manager:
+            return test_params
+
+        reference = (
+            test_params.get("reference_table"),
+            test_params.get("reference_column"),
+        )
+        if reference not in self._shared_references:
+            return test_params
+
+        try:
+            keys_table = self.connection_manager.get_reference_key_set(*reference)
+        except Exception as e:
+            logging.warning(
+                f"Could not build the key-set of {reference[0]}.{reference[1]}, "
+                f"joining the reference table instead: {str(e)}"
+            )
+            self._shared_references.discard(reference)
+            return test_params
+
+        return {**test_params, "reference_keys_table": keys_table}
+
+    def _materialize_model_sample(
+        self, model_name: str, model_config: Dict[str, Any]
+    ) -> None:
+        """Materialize the model-level sample once per run"""
+
+        model_sample = model_config.get("sample")
+        if not model_sample or self.connection_manager.get_materialized_sample(
+            model_name
+        ):
+            return
+
+        try:
+            sample_clause = build_sample_clause(
+                model_sample,
+                self.connection_manager.config.get("schema", "public"),
+                model_name,
+                self.connection_manager.db_type,
+                self._get_sample_row_count(model_name, model_sample),
+            )
+            self.connection_manager.materialize_sample(model_name, sample_clause)
+        except Exception as e:
+            logging.warning(
+                f"Could not materialize the sample of {model_name}, "
+                f"sampling in each test instead: {str(e)}"
+            )
+
+    def _resolve_test_source(
+        self,
+        model_name: str,
+        sample_config: Optional[Dict[str, Any]],
+        model_config: Optional[Dict[str, Any]],
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Table read by a test and the sampling still to apply on it.
+
+        Tests using the model-level sample read the materialized sample table
+        when there is one, without further sampling.
+        """
+        if (
+            self.connection_manager
+            and sample_config
+            and model_config
+            and model_config.get("materialize_sample")
+            and sample_config == model_config.get("sample")
+        ):
+            sample_table = self.connection_manager.get_materialized_sample(model_name)
+            if sample_table:
+                return sample_table, None
+
+        return model_name, sample_config
+
+    def _get_sample_row_count(
+        self, model_name: str, sample_config: Optional[Dict[str, Any]]
+    ) -> Optional[int]:
+        """Row count used to turn a sample `size` into a native sampling rate"""
+
+        if (
+            not self.connection_manager
+            or not sample_config
+            or "size" not in sample_config
+            or "percentage" in sample_config
+            or "partitioned_by" in sample_config
+            or sample_config.get("method") not in ("random", "block", "hash")
+        ):
+            # A partition sample is sized on the partition rows, not the table
+            return None
+
+        try:
+            return int(
+                self.connection_manager.get_row_count(model_name, approximate=True)
+            )
+        except Exception as e:
+            logging.warning(f"Could not get row count for {model_name}: {str(e)}")
+            return None
+
+    def _resolve_timeout(
+        self,
+        test_params: Dict[str, Any],
+        model_config: Optional[Dict[str, Any]],
+    ) -> Optional[float]:
+        """Resolve the query timeout of a test (test > model > target default)"""
+
+        if test_params.get("timeout_seconds") is not None:
+            return test_params["timeout_seconds"]
+
+        if model_config and model_config.get("timeout_seconds") is not None:
+            return model_config["timeout_seconds"]
+
+        # None lets the connection manager apply the target default
+        return None
+
+    def _timeout_result(
+        self,
+        sql: str,
+        test_type: str,
+        test_params: Dict[str, Any],
+        error: Exception,
+    ) -> Dict[str, Any]:
+        """
+        Build the result of a test whose query was cancelled on the server by
+        its timeout or by fail-fast
+        """
+        cancelled = isinstance(error, QueryCancelledError)
+        return {
+            "query": sql,
+            "explanation": self._get_test_explanation(test_type, test_params),
+            "examples": [],
+            "passed": False,
+            "status": "cancelled" if cancelled else "timeout",
+            "error": str(error),
+            "severity": test_params.get("severity", "medium"),
+            "message": (
+                f"Test cancelled: {str(error)}"
+                if cancelled
+                else f"Test timed out: {str(error)}"
+            ),
+        }
+
     def _resolve_sample_config(
         self,
         test_config: Dict[str, Any],
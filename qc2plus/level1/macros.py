@@ -10,11 +10,151 @@ using DB_FUNCTIONS abstractions.
 
 from qc2plus.level1.utils import build_sample_clause
 
+# Violation predicates of the row-level tests. A row violates the test when
+# the predicate is true. They are shared by the per-test macros below and by
+# the fused mode, which evaluates them together as conditional aggregates over
+# a single scan of the model.
+ROW_PREDICATE_MACROS = {
+    "not_null": """{{ column_name }} IS NULL""",
+    "email_format": """
+        {{ column_name }} IS NOT NULL
+        AND {{ db_functions.regex_not_match(column_name, db_functions.email_regex()) }}
+    """,
+    "accepted_values": """
+        {{ column_name }} IS NOT NULL
+        AND {{ column_name }} NOT IN (
+            {% for value in accepted_values %}
+                '{{ value }}'{% if not loop.last %},{% endif %}
+            {% endfor %}
+        )
+    """,
+    "range_check": """
+        {% macro safe_val(val) -%}
+            {% if val is string and not val.isdigit() %}
+                '{{ val }}'
+            {% else %}
+                {{ val }}
+            {% endif %}
+        {%- endmacro %}
+        {{ column_name }} IS NOT NULL
+        AND (
+            {% if min_value is defined %}
+                {{ column_name }} < {{ safe_val(min_value) }}
+            {% endif %}
+            {% if min_value is defined and max_value is defined %}
+                OR
+            {% endif %}
+            {% if max_value is defined %}
+                {{ column_name }} > {{ safe_val(max_value) }}
+            {% endif %}
+        )
+    """,
+    "future_date": """
+        {{ column_name }} IS NOT NULL
+        AND {{ db_functions.date_cast(column_name) }} > {{ db_functions.current_date() }}
+    """,
+}
+
+# Tables read by a test: table_ref (sampled) for the examples, count_ref (the
+# whole model, or only its rows matching row_filter) for the counts. Without
+# sampling they are the same table.
+TABLE_REFS = """
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
+        {% set count_ref = build_sample_clause(none, schema, count_source or model_name, db_type, none, row_filter) %}
+"""
+
+# Body of the row_count CTE. When the engine already knows the row count of
+# the model (run-scoped table stats cache), it is inlined instead of counted.
+ROW_COUNT_CTE_BODY = """
+            {% if total_rows is not none %}
+            SELECT {{ total_rows }} AS total_rows
+            {% else %}
+            SELECT COUNT(*) AS total_rows FROM {{ count_ref }}
+            {% endif %}
+        """
+
+
+def _row_level_macro(
+    description: str,
+    test_type: str,
+    message: str,
+    examples_label: str,
+    example_column: str = "{{ column_name }}",
+    example_agg: str = "column_name",
+) -> str:
+    """
+    Build the template of a row-level test from its violation predicate.
+
+    The violating rows and the row count are each computed once, in their own
+    CTE, instead of re-evaluating the predicate for the examples, the
+    failed_rows count and the HAVING clause. With sampling, the examples come
+    from the sample and the counts from the whole table.
+    """
+    predicate = ROW_PREDICATE_MACROS[test_type].strip()
+    return (
+        """
+        -- Test: """
+        + description
+        + """
+"""
+        + TABLE_REFS
+        + """
+        WITH violations AS (
+            SELECT {{ column_name }}
+            FROM {{ table_ref }}
+            WHERE """
+        + predicate
+        + """
+        ),
+        violation_count AS (
+            {% if count_ref == table_ref %}
+            SELECT COUNT(*) AS failed_rows FROM violations
+            {% else %}
+            SELECT COUNT(*) AS failed_rows
+            FROM {{ count_ref }}
+            WHERE """
+        + predicate
+        + """
+            {% endif %}
+        ),
+        row_count AS ("""
+        + ROW_COUNT_CTE_BODY
+        + """),
+        examples AS (
+            SELECT """
+        + example_column
+        + """
+            FROM violations
+            {{ db_functions.limit(10) }}
+        )
+        SELECT
+            '{{ column_name }}' AS column_name,
+            violation_count.failed_rows,
+            row_count.total_rows,
+            '"""
+        + message
+        + """' AS message,
+            CONCAT('"""
+        + examples_label
+        + """: ', {{ db_functions.string_agg("""
+        + example_agg
+        + """) }}) AS invalid_examples
+        FROM violation_count
+        CROSS JOIN row_count
+        -- The sample may hold none of the violations of the table
+        LEFT JOIN examples ON 1 = 1
+        WHERE violation_count.failed_rows > 0
+        GROUP BY violation_count.failed_rows, row_count.total_rows
+    """
+    )
+
+
 SQL_MACROS = {
     "unique": """
         -- Test: Unique constraint on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
+"""
+    + TABLE_REFS
+    + """
 
         WITH duplicates AS (
             SELECT {{ column_name }}, COUNT(*) AS cnt
@@ -23,6 +163,12 @@ SQL_MACROS = {
             GROUP BY {{ column_name }}
             HAVING COUNT(*) > 1
         ),
+        violation_count AS (
+            SELECT COUNT(*) AS failed_rows FROM duplicates
+        ),
+        row_count AS ("""
+        + ROW_COUNT_CTE_BODY
+        + """),
         limited_duplicates AS (
             SELECT {{ column_name }}
             FROM duplicates
@@ -31,241 +177,97 @@ SQL_MACROS = {
         )
         SELECT
             '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*) FROM duplicates) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
+            violation_count.failed_rows,
+            row_count.total_rows,
             'Duplicate values found in {{ column_name }}' AS message,
             {{ db_functions.string_agg(column_name) }} AS invalid_examples
         FROM limited_duplicates
-        HAVING (SELECT COUNT(*) FROM duplicates) > 0
-    """,
-    "not_null": """
-        -- Test: Not null constraint on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
-
-        WITH null_positions AS (
-            SELECT ROW_NUMBER() OVER() AS row_pos
-            FROM {{ table_ref }}
-            WHERE {{ column_name }} IS NULL
-            {{ db_functions.limit(10) }}
-        )
-        SELECT
-            '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }} WHERE {{ column_name }} IS NULL) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Null values found in {{ column_name }}' AS message,
-            CONCAT('Row positions: ', {{ db_functions.string_agg('row_pos') }}) AS invalid_examples
-        FROM null_positions
-        HAVING (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }} WHERE {{ column_name }} IS NULL) > 0
-    """,
-    "email_format": """
-        -- Test: Email format validation on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
-        {% set regex_pattern = db_functions.email_regex() %}
-
-
-        WITH invalid_emails AS (
-            SELECT {{ column_name }}
-            FROM {{ table_ref }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ db_functions.regex_not_match(column_name, regex_pattern)}}
-            {{ db_functions.limit(10) }}
-        )
-        SELECT
-            '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ db_functions.regex_not_match(column_name, regex_pattern) }}) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Invalid email format found in {{ column_name }}' AS message,
-            CONCAT('Invalid examples: ', {{ db_functions.string_agg(column_name) }}) AS invalid_examples
-        FROM invalid_emails
-        HAVING (SELECT COUNT(*)
-                FROM {{ schema }}.{{ model_name }}
-                WHERE {{ column_name }} IS NOT NULL
-                AND {{ db_functions.regex_not_match(column_name, regex_pattern ) }}) > 0
+        CROSS JOIN violation_count
+        CROSS JOIN row_count
+        GROUP BY violation_count.failed_rows, row_count.total_rows
     """,
+    "not_null": _row_level_macro(
+        "Not null constraint on {{ column_name }}",
+        "not_null",
+        "Null values found in {{ column_name }}",
+        "Row positions",
+        example_column="ROW_NUMBER() OVER() AS row_pos",
+        example_agg="'row_pos'",
+    ),
+    "email_format": _row_level_macro(
+        "Email format validation on {{ column_name }}",
+        "email_format",
+        "Invalid email format found in {{ column_name }}",
+        "Invalid examples",
+    ),
     "relationship": """
         -- Test: Foreign key constraint {{ column_name }} -> {{ reference_table }}.{{ reference_column }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
-
-        WITH orphan_keys AS (
+"""
+    + TABLE_REFS
+    + """
+        {% macro orphans_of(source) %}
             SELECT table_ref.{{ column_name }}
-            FROM {{ table_ref }} AS table_ref
-            LEFT JOIN {{ schema }}.{{ reference_table }} ref
+            -- A sampled table_ref already carries its own alias
+            FROM (SELECT {{ column_name }} FROM {{ source }}) AS table_ref
+            LEFT JOIN {{ schema }}.{{ reference_keys_table or reference_table }} ref
                 ON table_ref.{{ column_name }} = ref.{{ reference_column }}
             WHERE table_ref.{{ column_name }} IS NOT NULL
             AND ref.{{ reference_column }} IS NULL
-            {{ db_functions.limit(10) }}
-        )
-        SELECT
-            '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }} m
-            LEFT JOIN {{ schema }}.{{ reference_table }} r
-                ON m.{{ column_name }} = r.{{ reference_column }}
-            WHERE m.{{ column_name }} IS NOT NULL
-            AND r.{{ reference_column }} IS NULL) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Foreign key violations found in {{ column_name }}' AS message,
-            CONCAT('Orphan keys: ', {{ db_functions.string_agg('orphan_keys.' + column_name) }}) AS invalid_examples
-        FROM orphan_keys
-        HAVING (
-            SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }} m
-            LEFT JOIN {{ schema }}.{{ reference_table }} r
-                ON m.{{ column_name }} = r.{{ reference_column }}
-            WHERE m.{{ column_name }} IS NOT NULL
-            AND r.{{ reference_column }} IS NULL
-        ) > 0
-    """,
-    "future_date": """
-        -- Test: Future date validation on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
-
-        WITH future_dates AS (
-            SELECT {{ column_name }}
-            FROM {{ table_ref }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ db_functions.date_cast(column_name) }} > {{ db_functions.current_date() }}
-            {{ db_functions.limit(10) }}
-        )
-        SELECT
-            '{{ column_name }}' AS column_name,
-            (
-            SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ db_functions.date_cast(column_name) }} > {{ db_functions.current_date() }}
-
-        ) AS failed_rows,
-
-
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Future dates found in {{ column_name }}' AS message,
-            CONCAT('Invalid future values: ', {{ db_functions.string_agg(column_name) }}) AS invalid_examples
-
-        FROM future_dates
-        HAVING (
-            SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND  {{ db_functions.date_cast(column_name) }} > {{ db_functions.current_date() }}
-            )> 0
-    """,
-    "accepted_values": """
-        -- Test: Accepted values constraint on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
-
-        WITH invalid_values AS (
-            SELECT {{ column_name }}
-            FROM {{ table_ref }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ column_name }} NOT IN (
-                {% for value in accepted_values %}
-                    '{{ value }}'{% if not loop.last %},{% endif %}
-                {% endfor %}
-            )
-            {{ db_functions.limit(10) }}
-        )
-        SELECT
-            '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND {{ column_name }} NOT IN (
-                {% for value in accepted_values %}
-                    '{{ value }}'{% if not loop.last %},{% endif %}
-                {% endfor %}
-            )) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Invalid values found in {{ column_name }}' AS message,
-            CONCAT('Invalid examples: ', {{ db_functions.string_agg(column_name) }}) AS invalid_examples
-        FROM invalid_values
-        HAVING (SELECT COUNT(*)
-                FROM {{ schema }}.{{ model_name }}
-                WHERE {{ column_name }} IS NOT NULL
-                AND {{ column_name }} NOT IN (
-                    {% for value in accepted_values %}
-                        '{{ value }}'{% if not loop.last %},{% endif %}
-                    {% endfor %}
-                )) > 0
-    """,
-    "range_check": """
-        -- Test: Range check on {{ column_name }}
-
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
+        {% endmacro %}
 
-        {# Helper : ajoute des quotes si min/max sont des dates ou strings #}
-        {% macro safe_val(val) -%}
-            {% if val is string and not val.isdigit() %}
-                '{{ val }}'
+        WITH orphans AS (
+            {{ orphans_of(table_ref) }}
+        ),
+        violation_count AS (
+            {% if count_ref == table_ref %}
+            SELECT COUNT(*) AS failed_rows FROM orphans
             {% else %}
-                {{ val }}
+            SELECT COUNT(*) AS failed_rows FROM ({{ orphans_of(count_ref) }}) AS all_orphans
             {% endif %}
-        {%- endmacro %}
-
-        WITH out_of_range AS (
+        ),
+        row_count AS ("""
+        + ROW_COUNT_CTE_BODY
+        + """),
+        orphan_keys AS (
             SELECT {{ column_name }}
-            FROM {{ table_ref }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND (
-                {% if min_value is defined %}
-                    {{ column_name }} < {{ safe_val(min_value) }}
-                {% endif %}
-                {% if min_value is defined and max_value is defined %}
-                    OR
-                {% endif %}
-                {% if max_value is defined %}
-                    {{ column_name }} > {{ safe_val(max_value) }}
-                {% endif %}
-            )
+            FROM orphans
             {{ db_functions.limit(10) }}
         )
         SELECT
             '{{ column_name }}' AS column_name,
-            (SELECT COUNT(*)
-            FROM {{ schema }}.{{ model_name }}
-            WHERE {{ column_name }} IS NOT NULL
-            AND (
-                {% if min_value is defined %}
-                    {{ column_name }} < {{ safe_val(min_value) }}
-                {% endif %}
-                {% if min_value is defined and max_value is defined %}
-                    OR
-                {% endif %}
-                {% if max_value is defined %}
-                    {{ column_name }} > {{ safe_val(max_value) }}
-                {% endif %}
-            )) AS failed_rows,
-            (SELECT COUNT(*) FROM {{ schema }}.{{ model_name }}) AS total_rows,
-            'Values outside allowed range in {{ column_name }}' AS message,
-            CONCAT('Out-of-range examples: ', {{ db_functions.string_agg(column_name) }}) AS invalid_examples
-        FROM out_of_range
-        HAVING (SELECT COUNT(*)
-                FROM {{ schema }}.{{ model_name }}
-                WHERE {{ column_name }} IS NOT NULL
-                AND (
-                    {% if min_value is defined %}
-                        {{ column_name }} < {{ safe_val(min_value) }}
-                    {% endif %}
-                    {% if min_value is defined and max_value is defined %}
-                        OR
-                    {% endif %}
-                    {% if max_value is defined %}
-                        {{ column_name }} > {{ safe_val(max_value) }}
-                    {% endif %}
-                )) > 0
+            violation_count.failed_rows,
+            row_count.total_rows,
+            'Foreign key violations found in {{ column_name }}' AS message,
+            CONCAT('Orphan keys: ', {{ db_functions.string_agg('orphan_keys.' + column_name) }}) AS invalid_examples
+        FROM violation_count
+        CROSS JOIN row_count
+        -- The sample may hold none of the orphans of the table
+        LEFT JOIN orphan_keys ON 1 = 1
+        WHERE violation_count.failed_rows > 0
+        GROUP BY violation_count.failed_rows, row_count.total_rows
     """,
+    "future_date": _row_level_macro(
+        "Future date validation on {{ column_name }}",
+        "future_date",
+        "Future dates found in {{ column_name }}",
+        "Invalid future values",
+    ),
+    "accepted_values": _row_level_macro(
+        "Accepted values constraint on {{ column_name }}",
+        "accepted_values",
+        "Invalid values found in {{ column_name }}",
+        "Invalid examples",
+    ),
+    "range_check": _row_level_macro(
+        "Range check on {{ column_name }}",
+        "range_check",
+        "Values outside allowed range in {{ column_name }}",
+        "Out-of-range examples",
+    ),
     "freshness": """
     -- Test: Data freshness check
 
-    {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
+    {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
     {% set max_date_expr = 'MAX(' ~ column_name ~ ')' %}
 
     WITH freshness_check AS (
@@ -292,7 +294,7 @@ SQL_MACROS = {
     "accepted_benchmark_values": """
         -- Test: Benchmark values distribution validation on {{ column_name }}
 
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
         {% set expected_case %}
                 CASE
                     {% for value, expected_pct in benchmark_values.items() %}
@@ -354,7 +356,11 @@ SQL_MACROS = {
         SELECT
             '{{ column_name }}' AS column_name,
             (SELECT total_violations FROM violation_count) AS failed_rows,
+            {% if approximate and db_functions.approx_count_distinct is defined %}
+            (SELECT {{ db_functions.approx_count_distinct(column_name) }} FROM {{ schema }}.{{ model_name }}) AS total_rows,
+            {% else %}
             (SELECT COUNT(DISTINCT {{ column_name }}) FROM {{ schema }}.{{ model_name }}) AS total_rows,
+            {% endif %}
             'Benchmark violations found in distribution' AS message,
             CONCAT('Invalid distributions: ', {{ db_functions.string_agg('violation_detail') }}) AS invalid_examples
         FROM violations
@@ -363,7 +369,7 @@ SQL_MACROS = {
     "statistical_threshold": """
         -- Test: Statistical threshold for {{ metric }} on {{ column_name or 'table' }}
 
-        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type) %}
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
 
         WITH daily_metrics AS (
             SELECT
@@ -466,3 +472,58 @@ SQL_MACROS = {
         {{ custom_sql }}
     """,
 }
+
+FUSED_ROW_CHECKS_MACRO = """
+        -- Test: Fused row-level checks on {{ model_name }}
+
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
+
+        SELECT
+            COUNT(*) AS total_rows
+            {% for check in checks %}
+            , SUM(CASE WHEN {{ check.predicate }} THEN 1 ELSE 0 END) AS failed_rows_{{ loop.index0 }}
+            , MIN(CASE WHEN {{ check.predicate }} THEN {{ db_functions.cast_text(check.column_name) }} END) AS example_{{ loop.index0 }}
+            {% endfor %}
+        FROM {{ table_ref }}
+"""
+
+# Approximate uniqueness pre-check (approximate: true on unique tests). The
+# HyperLogLog distinct count is compared to the non-null row count; only when
+# they differ by more than the error bound is the exact duplicate listing run.
+APPROXIMATE_UNIQUE_MACRO = """
+        -- Test: Approximate unique check on {{ column_name }}
+
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
+
+        SELECT
+            COUNT({{ column_name }}) AS non_null_rows,
+            {{ db_functions.approx_count_distinct(column_name) }} AS approx_distinct,
+            COUNT(*) AS total_rows
+        FROM {{ table_ref }}
+"""
+
+# Daily values of a statistical_threshold metric over a date range, used with
+# `snapshots: true`: only the days missing from quality_metric_snapshots (and
+# the current day) are computed from the model.
+DAILY_METRIC_MACRO = """
+        -- Test: Daily {{ metric }} of {{ column_name or 'table' }} from {{ start_date }} to {{ end_date }}
+
+        {% set table_ref = build_sample_clause(sample_config, schema, model_name, db_type, sample_row_count, row_filter) %}
+
+        SELECT
+            {{ db_functions.date_cast('created_at') }} AS metric_date,
+            {% if column_name %}
+                {% if metric in ('avg', 'sum', 'min', 'max') %}
+                    {{ metric | upper }}({{ column_name }}) AS metric_value
+                {% else %}
+                    COUNT({{ column_name }}) AS metric_value
+                {% endif %}
+            {% else %}
+                COUNT(*) AS metric_value
+            {% endif %}
+        FROM {{ table_ref }}
+        WHERE {{ db_functions.date_cast('created_at') }} BETWEEN
+            {{ db_functions.date_cast("'" ~ start_date ~ "'") }}
+            AND {{ db_functions.date_cast("'" ~ end_date ~ "'") }}
+        GROUP BY {{ db_functions.date_cast('created_at') }}
+"""
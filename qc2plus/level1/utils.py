@@ -3,6 +3,7 @@
 Jinja2 templates for business rule validation tests
 """
 
+import math
 from typing import Any, Dict, Optional
 
 from qc2plus.sql.db_functions import DB_FUNCTIONS
@@ -72,120 +73,189 @@ def get_macro_help(macro_name: str) -> str:
     return help_text.get(macro_name, "No help available for this macro.")
 
 
+# Bernoulli/block samples are drawn larger than a requested `size` and then
+# cut with LIMIT: by SIZE_OVERSAMPLING, and for small sizes by enough for the
+# expected row count to exceed `size` by SIZE_MARGIN_STDDEVS standard
+# deviations, so that the sample is rarely smaller than asked
+SIZE_OVERSAMPLING = 1.2
+SIZE_MARGIN_STDDEVS = 4
+
+# Sampling methods rendered with the database's native table sampling
+TABLESAMPLE_METHODS = {
+    "random": "BERNOULLI",  # row-level sampling
+    "block": "SYSTEM",  # block-level sampling, cheapest but clustered
+}
+
+
+def _build_partition_filter(
+    sample_config: Dict[str, Any], base_table: str, db_funcs: Dict[str, Any]
+) -> Optional[str]:
+    """Build the WHERE condition selecting the configured partitions"""
+    if "partitioned_by" not in sample_config:
+        return None
+
+    partition_column = sample_config["partitioned_by"]
+    strategy = sample_config.get("partition_strategy", "latest")
+
+    if strategy == "latest":
+        count = sample_config.get("partition_count", 1)
+        offset = count - 1
+        limit_offset_clause = db_funcs["limit_offset"](1, offset)
+        return f"""
+                {partition_column} >= (
+                    SELECT DISTINCT {partition_column}
+                    FROM {base_table}
+                    ORDER BY {partition_column} DESC
+                    {limit_offset_clause}
+                )
+            """
+
+    elif strategy == "range":
+        start_date = sample_config.get("partition_start")
+        end_date = sample_config.get("partition_end")
+        if start_date and end_date:
+            return f"{partition_column} BETWEEN '{start_date}' AND '{end_date}'"
+
+    elif strategy == "list":
+        partition_list = sample_config.get("partition_list", [])
+        if partition_list:
+            partitions_str = "', '".join(str(p) for p in partition_list)
+            return f"{partition_column} IN ('{partitions_str}')"
+
+    return None
+
+
+def _resolve_sample_fraction(
+    sample_config: Dict[str, Any], row_count: Optional[int]
+) -> Optional[float]:
+    """Fraction of rows to sample (0-1), None when it cannot be determined"""
+    if "percentage" in sample_config:
+        return float(sample_config["percentage"])
+
+    if "size" in sample_config and row_count:
+        size = sample_config["size"]
+        # Smallest expected count m with m - z * sqrt(m) >= size (binomial count)
+        margin = SIZE_MARGIN_STDDEVS / 2
+        expected = max(
+            size * SIZE_OVERSAMPLING, (margin + math.sqrt(margin**2 + size)) ** 2
+        )
+        return min(1.0, expected / row_count)
+
+    return None
+
+
 # Sampling with partition support (multi-database compatible)
 def build_sample_clause(
     sample_config: Optional[Dict[str, Any]],
     schema: str,
     model_name: str,
     db_type: str = "postgresql",
+    row_count: Optional[int] = None,
+    row_filter: Optional[str] = None,
 ) -> str:
     """
     Build SQL sampling clause with integrated partition support.
     Compatible with PostgreSQL, BigQuery, Snowflake, and Redshift.
+
+    Methods:
+    - random: row-level sampling (TABLESAMPLE BERNOULLI on PostgreSQL,
+      SAMPLE BERNOULLI on Snowflake, TABLESAMPLE SYSTEM on BigQuery)
+    - block: block-level sampling (TABLESAMPLE SYSTEM / SAMPLE SYSTEM)
+    - hash: deterministic sampling on a hash of `key`, stable across runs
+
+    `percentage` is a fraction between 0 and 1. A `size` (number of rows) is
+    converted to a fraction with `row_count` (the table row count) when it is
+    known. When the rows are filtered (partition or `row_filter`), the table
+    row count does not apply: exactly `size` filtered rows are taken, in a
+    random order (or in the order of the key hash for `hash`).
+
+    `row_filter` is an extra SQL condition restricting the rows read (used by
+    incremental tests).
     """
-    if not sample_config:
+    if not sample_config and not row_filter:
         return f"{schema}.{model_name}"
 
+    sample_config = sample_config or {}
     base_table = f"{schema}.{model_name}"
     db_funcs = DB_FUNCTIONS.get(db_type, DB_FUNCTIONS["postgresql"])
-    random_func = db_funcs["random_func"]()
-
-    partition_filter = None
-    if "partitioned_by" in sample_config:
-        partition_column = sample_config["partitioned_by"]
-        strategy = sample_config.get("partition_strategy", "latest")
-
-        if strategy == "latest":
-            count = sample_config.get("partition_count", 1)
-            offset = count - 1
-            limit_offset_clause = db_funcs["limit_offset"](1, offset)
-            partition_filter = f"""
-                {partition_column} >= (
-                    SELECT DISTINCT {partition_column}
-                    FROM {base_table}
-                    ORDER BY {partition_column} DESC
-                    {limit_offset_clause}
-                )
-            """
-
-        elif strategy == "range":
-            start_date = sample_config.get("partition_start")
-            end_date = sample_config.get("partition_end")
-            if start_date and end_date:
-                partition_filter = (
-                    f"{partition_column} BETWEEN '{start_date}' AND '{end_date}'"
-                )
-
-        elif strategy == "list":
-            partition_list = sample_config.get("partition_list", [])
-            if partition_list:
-                partitions_str = "', '".join(str(p) for p in partition_list)
-                partition_filter = f"{partition_column} IN ('{partitions_str}')"
 
+    partition_filter = _build_partition_filter(sample_config, base_table, db_funcs)
+    filters = [f for f in (partition_filter, row_filter) if f]
     method = sample_config.get("method")
 
-    # Random sampling + partition
-    if partition_filter and method == "random":
-        if "percentage" in sample_config:
-            pct = sample_config["percentage"]
-
-            # ✅ BigQuery : use RAND() < pct instead of TABLESAMPLE
-            if db_type == "bigquery":
+    if method in ("random", "block", "hash"):
+        fraction = _resolve_sample_fraction(
+            sample_config, None if filters else row_count
+        )
+        size = sample_config.get("size")
+        from_clause = base_table
+        conditions = list(filters)
+
+        if method == "hash":
+            key = sample_config.get("key")
+            if not key:
+                raise ValueError("Hash sampling requires a 'key' column")
+            if fraction is None and size and conditions:
+                # Deterministic: the same filtered rows are selected every run
                 return f"""(
-                    SELECT *
-                    FROM {base_table}
-                    WHERE {partition_filter}
-                    AND RAND() < {pct}
-                ) AS sampled_data"""
-
-            # Default for other DBs
-            return f"""(
                 SELECT * FROM {base_table}
-                WHERE {partition_filter}
-                ORDER BY {random_func}
-                {db_funcs["limit"](f"(SELECT CAST(COUNT(*) * {pct} AS INT) FROM {base_table} WHERE {partition_filter})")}
+                WHERE {' AND '.join(conditions)}
+                ORDER BY {db_funcs['hash_int'](key)}
+                {db_funcs["limit"](size)}
             ) AS sampled_data"""
-
-        elif "size" in sample_config:
-            size = sample_config["size"]
-            return f"""(
+            if fraction is None:
+                raise ValueError(
+                    "Hash sampling requires 'percentage' (or 'size' with a known row count)"
+                )
+            # Rows whose key hashes below the threshold are always selected
+            # (at least one bucket, so that a tiny fraction is never empty)
+            threshold = max(1, round(fraction * 1000))
+            conditions.append(
+                f"ABS(MOD({db_funcs['hash_int'](key)}, 1000)) < {threshold}"
+            )
+
+        elif fraction is None:
+            # Row-count sample without table statistics
+            if not size:
+                pass
+            elif db_type == "snowflake" and method == "random" and not conditions:
+                from_clause = f"{base_table} SAMPLE ROW ({size} ROWS)"
+                size = None
+            else:
+                where_clause = (
+                    f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                )
+                return f"""(
                 SELECT * FROM {base_table}
-                WHERE {partition_filter}
-                ORDER BY {random_func}
+                {where_clause}
+                ORDER BY {db_funcs["random_func"]()}
                 {db_funcs["limit"](size)}
             ) AS sampled_data"""
 
-    # Random sampling without partition
-    elif method == "random":
-        if "percentage" in sample_config:
-            pct = sample_config["percentage"]
-
-            if db_type == "bigquery":
-                return f"""(
-                    SELECT *
-                    FROM {base_table}
-                    WHERE RAND() < {pct}
-                ) AS sampled_data"""
+        elif "tablesample" in db_funcs:
+            percent = f"{min(fraction, 1.0) * 100:.6f}"
+            from_clause = (
+                f"{base_table} "
+                f"{db_funcs['tablesample'](TABLESAMPLE_METHODS[method], percent)}"
+            )
 
-            return f"""(
-                SELECT * FROM {base_table}
-                ORDER BY {random_func}
-                {db_funcs["limit"](f"(SELECT CAST(COUNT(*) * {pct} AS INT) FROM {base_table})")}
-            ) AS sampled_data"""
+        else:
+            # No native sampling (Redshift): single filtered scan, no sort
+            conditions.append(f"{db_funcs['random_func']()} < {fraction}")
 
-        elif "size" in sample_config:
-            size = sample_config["size"]
-            return f"""(
-                SELECT * FROM {base_table}
-                ORDER BY {random_func}
-                {db_funcs["limit"](size)}
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = db_funcs["limit"](size) if size else ""
+        return f"""(
+                SELECT * FROM {from_clause}
+                {where_clause}
+                {limit_clause}
             ) AS sampled_data"""
 
-    # Partition only
-    elif partition_filter:
+    # Partition (or row filter) only
+    elif filters:
         return f"""(
             SELECT * FROM {base_table}
-            WHERE {partition_filter}
+            WHERE {' AND '.join(filters)}
         ) AS partitioned_data"""
 
     # Default: full table
@@ -25,6 +25,53 @@ class CorrelationAnalyzer:
 
     def analyze(self, model_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """Perform correlation analysis"""
+        try:
+            data = self.fetch_data(model_name, config)
+        except Exception as e:
+            return self._analysis_failed(model_name, e)
+
+        return self.compute(model_name, config, data)
+
+    def fetch_data(
+        self, model_name: str, config: Dict[str, Any]
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Run the data queries of the analysis (I/O step of `analyze`): the
+        sampled rows and, with a date_column, the weekly sums.
+        """
+        variables = config.get("variables", [])
+        date_column = config.get("date_column", None)
+
+        # Validate configuration
+        if len(variables) < 2:
+            raise ValueError("At least 2 variables required for correlation analysis")
+
+        data = self._get_correlation_data(
+            model_name,
+            variables,
+            date_column,
+            config.get("window_days", None),  # for temporal correlation analysis
+            # used for calculating correlation with no time windows
+            config.get("sample_size", 10000),
+        )
+
+        weekly_data = None
+        if date_column and not data.empty:
+            try:
+                weekly_data = self._get_weekly_data(model_name, variables, date_column)
+            except Exception as e:
+                # Don't fail the entire analysis for temporal issues
+                logging.warning(f"Temporal correlation analysis failed: {str(e)}")
+
+        return {"data": data, "weekly_data": weekly_data}
+
+    def compute(
+        self,
+        model_name: str,
+        config: Dict[str, Any],
+        fetched: Dict[str, Optional[pd.DataFrame]],
+    ) -> Dict[str, Any]:
+        """Analyze the fetched data (CPU step of `analyze`, no database access)"""
 
         try:
             # Extract configuration
@@ -32,30 +79,11 @@ class CorrelationAnalyzer:
             expected_correlation = config.get("expected_correlation")
             threshold = config.get("threshold", 0.2)
             correlation_type = config.get("correlation_type", "pearson")
-            date_column = config.get("date_column", None)
-            window_days = config.get(
-                "window_days", None
-            )  # for temporal correlation analysis
-            sample_size = config.get(
-                "sample_size", 10000
-            )  # used for calculating correlation with no time windows
             warnings.filterwarnings(
                 "ignore", category=RuntimeWarning
             )  # Suppress warnings from correlation calculations
-            # Validate configuration
-            if len(variables) < 2:
-                raise ValueError(
-                    "At least 2 variables required for correlation analysis"
-                )
-
-            # Get data
-            data = self._get_correlation_data(
-                model_name,
-                variables,
-                date_column,
-                window_days,
-                sample_size,
-            )
+            data = fetched["data"]
+            weekly_data = fetched["weekly_data"]
 
             if data.empty:
                 return {
@@ -81,11 +109,10 @@ class CorrelationAnalyzer:
                 "anomalies_count": 0,
                 "anomalies": [],
             }
-            if date_column:
+            if weekly_data is not None:
                 temporal_results = self._detect_temporal_correlation_changes(
-                    model_name,
+                    weekly_data,
                     variables,
-                    date_column,
                     correlation_type,
                 )
 
@@ -108,13 +135,30 @@ class CorrelationAnalyzer:
             }
 
         except Exception as e:
-            logging.error(f"Correlation analysis failed for {model_name}: {str(e)}")
-            return {
-                "passed": False,
-                "error": str(e),
-                "anomalies_count": 1,
-                "message": f"Correlation analysis failed: {str(e)}",
-            }
+            return self._analysis_failed(model_name, e)
+
+    @staticmethod
+    def _analysis_failed(model_name: str, error: Exception) -> Dict[str, Any]:
+        """Result of an analysis that raised an error"""
+        logging.error(f"Correlation analysis failed for {model_name}: {str(error)}")
+        return {
+            "passed": False,
+            "error": str(error),
+            "anomalies_count": 1,
+            "message": f"Correlation analysis failed: {str(error)}",
+        }
+
+    def compile_queries(self, model_name: str, config: Dict[str, Any]) -> List[str]:
+        """Compile the data query of the analysis without running it"""
+        return [
+            self._build_correlation_query(
+                model_name,
+                config.get("variables", []),
+                config.get("date_column", None),
+                config.get("window_days", None),
+                config.get("sample_size", 10000),
+            )
+        ]
 
     def _get_correlation_data(
         self,
@@ -125,6 +169,20 @@ class CorrelationAnalyzer:
         sample_size: int,
     ) -> pd.DataFrame:
         """Get data for correlation analysis"""
+        query = self._build_correlation_query(
+            model_name, variables, date_column, window_days, sample_size
+        )
+        return self.connection_manager.execute_query(query)
+
+    def _build_correlation_query(
+        self,
+        model_name: str,
+        variables: List[str],
+        date_column: str,
+        window_days: int,
+        sample_size: int,
+    ) -> str:
+        """Build the query of the correlation analysis data"""
 
         schema = self.connection_manager.config.get("schema", "public")
         db_type = self.connection_manager.db_type
@@ -166,7 +224,7 @@ class CorrelationAnalyzer:
             elif db_type in ("mysql", "bigquery"):
                 query = query.replace("LIMIT", "ORDER BY RAND() LIMIT")
 
-        return self.connection_manager.execute_query(query)
+        return query
 
     def _perform_correlation_analysis(
         self,
@@ -286,11 +344,33 @@ class CorrelationAnalyzer:
 
         return results
 
+    def _get_weekly_data(
+        self, model_name: str, variables: List[str], date_column: str
+    ) -> pd.DataFrame:
+        """Get historical correlation data (weekly windows over last 3 months)"""
+        schema = self.connection_manager.config.get("schema", "public")
+        db_type = self.connection_manager.db_type
+        funcs = DB_LEVEL2_FUNCTIONS.get(db_type, DB_LEVEL2_FUNCTIONS["postgresql"])
+
+        query = f"""
+            WITH weekly_data AS (
+                SELECT 
+                    {funcs['date_trunc_week'](date_column)} AS week_start,
+                    {', '.join([f'SUM({var}) AS {var}' for var in variables])}
+                FROM {schema}.{model_name}
+                WHERE CAST({date_column} AS DATE) >= {funcs['date_sub'](funcs['current_date'](), 90)}
+                GROUP BY {funcs['date_trunc_week'](date_column)}
+                ORDER BY week_start
+            )
+            SELECT * FROM weekly_data
+            WHERE week_start IS NOT NULL
+        """
+        return self.connection_manager.execute_query(query)
+
     def _detect_temporal_correlation_changes(
         self,
-        model_name: str,
+        historical_data: pd.DataFrame,
         variables: List[str],
-        date_column: str,
         correlation_type: str,
     ) -> Dict[str, Any]:
         """Detect changes in correlation over time"""
@@ -303,27 +383,6 @@ class CorrelationAnalyzer:
         }
 
         try:
-            # Get historical correlation data (weekly windows over last 3
-            # months)
-            schema = self.connection_manager.config.get("schema", "public")
-            db_type = self.connection_manager.db_type
-            funcs = DB_LEVEL2_FUNCTIONS.get(db_type, DB_LEVEL2_FUNCTIONS["postgresql"])
-
-            query = f"""
-                WITH weekly_data AS (
-                    SELECT 
-                        {funcs['date_trunc_week'](date_column)} AS week_start,
-                        {', '.join([f'SUM({var}) AS {var}' for var in variables])}
-                    FROM {schema}.{model_name}
-                    WHERE CAST({date_column} AS DATE) >= {funcs['date_sub'](funcs['current_date'](), 90)}
-                    GROUP BY {funcs['date_trunc_week'](date_column)}
-                    ORDER BY week_start
-                )
-                SELECT * FROM weekly_data
-                WHERE week_start IS NOT NULL
-            """
-
-            historical_data = self.connection_manager.execute_query(query)
 
             if len(historical_data) < 4:  # Need at least 4 weeks for trend analysis
                 return results
@@ -193,6 +193,26 @@ class DistributionAnalyzer:
                 "message": f"Distribution analysis failed: {str(e)}",
             }
 
+    def compile_queries(self, model_name: str, config: Dict[str, Any]) -> List[str]:
+        """Compile the data queries of the analysis without running them"""
+        date_column = config.get("date_column", None)
+        segments = config.get("segments", [])
+        if date_column is None or not segments:
+            return []
+
+        return [
+            self._build_segmented_query(
+                model_name,
+                segments,
+                config.get("metrics", ["count"]),
+                date_column,
+                config.get("reference_period", 30),
+                config.get("comparison_period", 7),
+                period_type,
+            )
+            for period_type in ("reference", "comparison")
+        ]
+
     def _get_segmented_data(
         self,
         model_name: str,
@@ -204,6 +224,31 @@ class DistributionAnalyzer:
         period_type: str,
     ) -> pd.DataFrame:
         """Get segmented data for specified period"""
+        query = self._build_segmented_query(
+            model_name,
+            segments,
+            metrics,
+            date_column,
+            reference_period,
+            comparison_period,
+            period_type,
+        )
+
+        logging.debug(f"Segmented data of {model_name} for the {period_type} period")
+
+        return self.connection_manager.execute_query(query)
+
+    def _build_segmented_query(
+        self,
+        model_name: str,
+        segments: List[str],
+        metrics: List[str],
+        date_column: str,
+        reference_period: int,
+        comparison_period: int,
+        period_type: str,
+    ) -> str:
+        """Build the query of the segmented data for specified period"""
 
         schema = self.connection_manager.config.get("schema", "public")
         db_type = self.connection_manager.db_type
@@ -254,10 +299,9 @@ class DistributionAnalyzer:
             ORDER BY {', '.join(segments)}
         """
 
-        print(f"\n[DEBUG] Period type: {period_type}")
-        print(f"[DEBUG] Date condition used for {period_type}: {date_condition}\n")
+        logging.debug(f"Date condition used for {period_type}: {date_condition}")
 
-        return self.connection_manager.execute_query(query)
+        return query
 
     def _detect_segment_anomalies(
         self,
@@ -26,10 +26,30 @@ class TemporalAnalyzer:
 
     def analyze(self, model_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """Perform temporal analysis"""
+        try:
+            data = self.fetch_data(model_name, config)
+        except Exception as e:
+            return self._analysis_failed(model_name, e)
+
+        return self.compute(model_name, config, data)
+
+    def fetch_data(self, model_name: str, config: Dict[str, Any]) -> pd.DataFrame:
+        """Run the data query of the analysis (I/O step of `analyze`)"""
+        return self._get_temporal_data(
+            model_name,
+            config.get("date_column", "created_at"),
+            config.get("metrics", ["count"]),
+            config.get("window_days", 90),
+            config.get("frequency", "daily"),
+        )
+
+    def compute(
+        self, model_name: str, config: Dict[str, Any], data: pd.DataFrame
+    ) -> Dict[str, Any]:
+        """Analyze the fetched data (CPU step of `analyze`, no database access)"""
 
         try:
             # Extract configuration
-            date_column = config.get("date_column", "created_at")
             metrics = config.get("metrics", ["count"])
             seasonality_check = config.get("seasonality_check", True)
             trend_check = config.get("trend_check", True)
@@ -37,15 +57,6 @@ class TemporalAnalyzer:
             window_days = config.get("window_days", 90)
             frequency = config.get("frequency", "daily")  # daily, weekly, monthly
 
-            # Get temporal data
-            data = self._get_temporal_data(
-                model_name,
-                date_column,
-                metrics,
-                window_days,
-                frequency,
-            )
-
             if data.empty or len(data) < 7:
 
                 return {
@@ -96,13 +107,30 @@ class TemporalAnalyzer:
             }
 
         except Exception as e:
-            logging.error(f"Temporal analysis failed for {model_name}: {str(e)}")
-            return {
-                "passed": False,
-                "error": str(e),
-                "anomalies_count": 1,
-                "message": f"Temporal analysis failed: {str(e)}",
-            }
+            return self._analysis_failed(model_name, e)
+
+    @staticmethod
+    def _analysis_failed(model_name: str, error: Exception) -> Dict[str, Any]:
+        """Result of an analysis that raised an error"""
+        logging.error(f"Temporal analysis failed for {model_name}: {str(error)}")
+        return {
+            "passed": False,
+            "error": str(error),
+            "anomalies_count": 1,
+            "message": f"Temporal analysis failed: {str(error)}",
+        }
+
+    def compile_queries(self, model_name: str, config: Dict[str, Any]) -> List[str]:
+        """Compile the data query of the analysis without running it"""
+        return [
+            self._build_temporal_query(
+                model_name,
+                config.get("date_column", "created_at"),
+                config.get("metrics", ["count"]),
+                config.get("window_days", 90),
+                config.get("frequency", "daily"),
+            )
+        ]
 
     def _get_temporal_data(
         self,
@@ -113,6 +141,20 @@ class TemporalAnalyzer:
         frequency: str,
     ) -> pd.DataFrame:
         """Get temporal data aggregated by specified frequency"""
+        query = self._build_temporal_query(
+            model_name, date_column, metrics, window_days, frequency
+        )
+        return self.connection_manager.execute_query(query)
+
+    def _build_temporal_query(
+        self,
+        model_name: str,
+        date_column: str,
+        metrics: List[str],
+        window_days: int,
+        frequency: str,
+    ) -> str:
+        """Build the query of the temporal data"""
 
         schema = self.connection_manager.config.get("schema", "public")
         db_type = self.connection_manager.db_type
@@ -172,7 +214,7 @@ class TemporalAnalyzer:
             ORDER BY period_date
         """
 
-        return self.connection_manager.execute_query(query)
+        return query
 
     def _analyze_metric(
         self,
@@ -0,0 +1,39 @@
+"""
+2QC+ Level 2 Worker Processes
+Runs the CPU-bound step of Level 2 analyses in a process pool
+"""
+
+from typing import Any, Dict
+
+from qc2plus.level2.correlation import CorrelationAnalyzer
+from qc2plus.level2.temporal import TemporalAnalyzer
+
+# Analyzers whose computation is worth moving out of the I/O threads
+PROCESS_POOL_ANALYZERS = {
+    "correlation": CorrelationAnalyzer,
+    "temporal": TemporalAnalyzer,
+}
+
+
+def warm_up() -> None:
+    """Process pool initializer: import the analysis libraries once per worker"""
+    import scipy.signal  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    import statsmodels.tsa.seasonal  # noqa: F401
+    import statsmodels.tsa.stattools  # noqa: F401
+
+
+def compute_analysis(
+    analyzer_name: str, model_name: str, config: Dict[str, Any], data: Any
+) -> Dict[str, Any]:
+    """Analyze data fetched in the parent process (no database access)"""
+    analyzer = PROCESS_POOL_ANALYZERS[analyzer_name](connection_manager=None)
+    return analyzer.compute(model_name, config, data)
+
+
+def analysis_failed(
+    analyzer_name: str, model_name: str, error: Exception
+) -> Dict[str, Any]:
+    """Result of a pooled analysis that failed, shaped like the one of analyze()"""
+    return PROCESS_POOL_ANALYZERS[analyzer_name]._analysis_failed(model_name, error)
@@ -156,10 +156,13 @@ class PersistenceManager:
                             "test_type": self._extract_test_type(test_name),
                             "level": "Level 1",
                             "severity": test_result.get("severity", "medium"),
-                            "status": (
-                                "passed"
-                                if test_result.get("passed", False)
-                                else "failed"
+                            "status": test_result.get(
+                                "status",
+                                (
+                                    "passed"
+                                    if test_result.get("passed", False)
+                                    else "failed"
+                                ),
                             ),
                             "message": test_result.get("message", ""),
                             "failed_rows": test_result.get("failed_rows", 0),
@@ -189,10 +192,13 @@ class PersistenceManager:
                             "test_type": analyzer_name,
                             "level": "Level 2",
                             "severity": "medium",  # Level 2 anomalies are typically medium
-                            "status": (
-                                "passed"
-                                if analyzer_result.get("passed", False)
-                                else "failed"
+                            "status": analyzer_result.get(
+                                "status",
+                                (
+                                    "passed"
+                                    if analyzer_result.get("passed", False)
+                                    else "failed"
+                                ),
                             ),
                             "message": analyzer_result.get("message", ""),
                             "failed_rows": analyzer_result.get("anomalies_count", 0),
@@ -297,6 +303,9 @@ class PersistenceManager:
             "statistical_threshold": "statistical_threshold",
             "accepted_values": "accepted_values",
             "range_check": "range_check",
+            "freshness": "freshness",
+            "row_count_change": "row_count_change",
+            "table_size": "table_size",
         }
 
         for test_type, type_name in test_types.items():
@@ -1,6 +1,6 @@
 """
 2QC+ Database-Specific SQL Functions
-Provides lambda templates for PostgreSQL, BigQuery, Snowflake, and Redshift.
+Provides lambda templates for PostgreSQL, BigQuery, Snowflake, Redshift and DuckDB.
 """
 
 DB_FUNCTIONS = {
@@ -20,6 +20,8 @@ DB_FUNCTIONS = {
             f"CAST(ROUND(CAST({actual} AS NUMERIC), 1) AS VARCHAR), '% vs ', CAST({expected} AS VARCHAR), '% expected)'"
         ),
         "email_regex": lambda: r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$",
+        "tablesample": lambda method, percent: f"TABLESAMPLE {method} ({percent})",
+        "hash_int": lambda col: f"CAST(hashtext(CAST({col} AS TEXT)) AS BIGINT)",
     },
     "bigquery": {
         "string_agg": lambda col: f"STRING_AGG(CAST({col} AS STRING), ', ')",
@@ -37,6 +39,9 @@ DB_FUNCTIONS = {
             f"CAST(ROUND({actual}, 1) AS STRING), '% vs ', CAST({expected} AS STRING), '% expected)'"
         ),
         "email_regex": lambda: r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}$",
+        "tablesample": lambda method, percent: f"TABLESAMPLE SYSTEM ({percent} PERCENT)",
+        "hash_int": lambda col: f"FARM_FINGERPRINT(CAST({col} AS STRING))",
+        "approx_count_distinct": lambda col: f"APPROX_COUNT_DISTINCT({col})",
     },
     "snowflake": {
         "string_agg": lambda col: f"LISTAGG({col}, ', ')",
@@ -49,6 +54,9 @@ DB_FUNCTIONS = {
         "regex_not_match": lambda col, pattern: f"NOT REGEXP_LIKE({col}, '{pattern}')",
         "date_sub": lambda date_col, days: f"DATEADD(day, -{days}, {date_col})",
         "date_cast": lambda col: f"CAST({col} AS DATE)",
+        "tablesample": lambda method, percent: f"SAMPLE {method} ({percent})",
+        "hash_int": lambda col: f"HASH({col})",
+        "approx_count_distinct": lambda col: f"APPROX_COUNT_DISTINCT({col})",
     },
     "redshift": {
         "string_agg": lambda col: f"LISTAGG({col}, ', ')",
@@ -61,6 +69,28 @@ DB_FUNCTIONS = {
         "regex_not_match": lambda col, pattern: f"NOT ({col} ~ '{pattern}')",
         "date_sub": lambda date_col, days: f"{date_col} - INTERVAL '{days} days'",
         "date_cast": lambda col: f"CAST({col} AS DATE)",
+        "hash_int": lambda col: f"FNV_HASH({col})",
+        "approx_count_distinct": lambda col: f"APPROXIMATE COUNT(DISTINCT {col})",
+    },
+    "duckdb": {
+        "string_agg": lambda col: f"STRING_AGG(CAST({col} AS VARCHAR), ', ')",
+        "cast_text": lambda col: f"CAST({col} AS VARCHAR)",
+        "limit": lambda n: f"LIMIT {n}",
+        "limit_offset": lambda limit, offset: f"LIMIT {limit} OFFSET {offset}",
+        "current_date": lambda: "CURRENT_DATE",
+        "random_func": lambda: "RANDOM()",
+        "coalesce": lambda a, b: f"COALESCE({a}, {b})",
+        "regex_not_match": lambda col, pattern: f"NOT regexp_matches({col}, '{pattern}')",
+        "date_sub": lambda date_col, days: f"{date_col} - INTERVAL '{days} days'",
+        "date_cast": lambda col: f"CAST({col} AS DATE)",
+        "float_cast": lambda col: f"CAST({col} AS DOUBLE)",
+        "format_percentage_diff": lambda actual, expected: (
+            f"CAST(ROUND({actual}, 1) AS VARCHAR), '% vs ', CAST({expected} AS VARCHAR), '% expected)'"
+        ),
+        "email_regex": lambda: r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$",
+        "tablesample": lambda method, percent: f"TABLESAMPLE {method} ({percent}%)",
+        "hash_int": lambda col: f"hash({col})",
+        "approx_count_distinct": lambda col: f"approx_count_distinct({col})",
     },
 }
 
@@ -94,4 +124,16 @@ DB_LEVEL2_FUNCTIONS = {
         "date_trunc_month": lambda col: f"DATE_TRUNC('MONTH', {col})",
         "cast_date": lambda col: f"CAST({col} AS DATE)",
     },
+    "duckdb": {
+        "current_date": lambda: "CURRENT_DATE",
+        "date_sub": lambda date_col, days: f"{date_col} - INTERVAL '{days} days'",
+        "date_trunc_day": lambda col: f"DATE_TRUNC('day', {col})",
+        "date_trunc_week": lambda col: f"DATE_TRUNC('week', {col})",
+        "date_trunc_month": lambda col: f"DATE_TRUNC('month', {col})",
+        "cast_date": lambda col: f"CAST({col} AS DATE)",
+        "float_cast": lambda col: f"CAST({col} AS DOUBLE)",
+        "format_percentage_diff": lambda actual, expected: (
+            f"CAST(ROUND({actual}, 1) AS VARCHAR), '% vs ', CAST({expected} AS VARCHAR), '% expected)'"
+        ),
+    },
 }
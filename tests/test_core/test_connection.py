@@ -0,0 +1,411 @@
+# tests/test_core/test_connection.py
+"""
+Tests pour qc2plus.core.connection
+"""
+
+import asyncio
+import time
+import threading
+
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from qc2plus.core.connection import ConnectionManager
+
+
+@pytest.fixture
+def connection_manager():
+    """ConnectionManager PostgreSQL sans création réelle des engines"""
+    profiles = {
+        'test': {
+            'outputs': {
+                'dev': {
+                    'type': 'postgresql',
+                    'host': 'localhost',
+                    'port': 5432,
+                    'user': 'user',
+                    'password': 'password',
+                    'dbname': 'db',
+                    'schema': 'public',
+                }
+            }
+        }
+    }
+    with patch.object(ConnectionManager, '_create_engines'):
+        yield ConnectionManager(profiles, 'dev')
+
+
+class TestTableStatsCache:
+
+    def test_row_count_is_cached_per_run(self, connection_manager):
+        """Le COUNT(*) d'une table n'est exécuté qu'une fois par run"""
+        with patch.object(
+            connection_manager, 'execute_query',
+            return_value=pd.DataFrame([{'row_count': 42}])
+        ) as execute_query:
+            assert connection_manager.get_row_count('customers') == 42
+            assert connection_manager.get_row_count('customers') == 42
+            assert execute_query.call_count == 1
+
+            connection_manager.clear_table_stats()
+            connection_manager.get_row_count('customers')
+            assert execute_query.call_count == 2
+
+    def test_approximate_row_count_from_catalog(self, connection_manager):
+        """Le mode approximatif lit pg_class.reltuples"""
+        with patch.object(
+            connection_manager, 'execute_query',
+            return_value=pd.DataFrame([{'row_count': 1000.0}])
+        ) as execute_query:
+            assert connection_manager.get_row_count('customers', approximate=True) == 1000
+            assert 'pg_class' in execute_query.call_args[0][0]
+
+            # An exact count is still required when asked for
+            connection_manager.get_row_count('customers')
+            assert 'COUNT(*)' in execute_query.call_args[0][0]
+
+    def test_approximate_falls_back_to_exact_count(self, connection_manager):
+        """Sans statistiques catalogue (reltuples = -1), un COUNT(*) exact est exécuté"""
+        with patch.object(
+            connection_manager, 'execute_query',
+            side_effect=[pd.DataFrame([{'row_count': -1}]), pd.DataFrame([{'row_count': 7}])]
+        ):
+            assert connection_manager.get_row_count('customers', approximate=True) == 7
+
+
+class TestQueryConcurrencyCap:
+
+    def test_max_concurrent_queries_from_target(self, connection_manager):
+        """Sans configuration, le nombre de requêtes simultanées n'est pas limité"""
+        assert connection_manager.max_concurrent_queries is None
+
+    def test_max_concurrent_queries_configured(self):
+        """max_concurrent_queries crée un sémaphore par target"""
+        profiles = {'test': {'outputs': {'dev': {
+            'type': 'postgresql', 'max_concurrent_queries': 4,
+        }}}}
+        with patch.object(ConnectionManager, '_create_engines'):
+            manager = ConnectionManager(profiles, 'dev')
+
+        assert manager.max_concurrent_queries == 4
+        assert manager._query_slots is not None
+
+
+class TestQueryTimeout:
+
+    @pytest.mark.parametrize('message', [
+        'canceling statement due to statement timeout',
+        '000630 (57014): Statement reached its statement or warehouse timeout of 10 second(s) and was canceled.',
+        'Job execution was cancelled: Job timed out after 5 sec',
+    ])
+    def test_backend_timeout_errors_are_detected(self, message):
+        """Les erreurs de timeout de chaque backend sont reconnues"""
+        assert ConnectionManager._is_timeout_error(Exception(message))
+
+    def test_other_errors_are_not_timeouts(self):
+        """Une annulation manuelle ou une erreur SQL n'est pas un timeout"""
+        assert not ConnectionManager._is_timeout_error(
+            Exception('canceling statement due to user request')
+        )
+        assert not ConnectionManager._is_timeout_error(Exception('syntax error'))
+
+
+class TestAsyncQueries:
+
+    def test_polled_job_cancelled_on_timeout_and_fail_fast(self, connection_manager):
+        """Un job interrogé en asynchrone est annulé sur le serveur au timeout et au fail-fast"""
+        from qc2plus.core.connection import QueryCancelledError, QueryTimeoutError
+
+        cancelled = []
+        with pytest.raises(QueryTimeoutError):
+            asyncio.run(connection_manager._apoll_job(
+                lambda: True, lambda: cancelled.append('timeout'), 0.3
+            ))
+
+        connection_manager._cancel_event.set()
+        with pytest.raises(QueryCancelledError):
+            asyncio.run(connection_manager._apoll_job(
+                lambda: True, lambda: cancelled.append('fail-fast'), None
+            ))
+        assert cancelled == ['timeout', 'fail-fast']
+
+
+class TestQueryCostEstimate:
+
+    def test_postgresql_explain_cost(self, connection_manager):
+        """Le coût total est lu dans la première ligne de l'EXPLAIN"""
+        plan = pd.DataFrame(
+            [{'QUERY PLAN': 'Aggregate  (cost=1520.00..1520.01 rows=1 width=8)'}]
+        )
+        with patch.object(
+            connection_manager, 'execute_query', return_value=plan
+        ) as execute_query:
+            estimate = connection_manager.estimate_query_cost('SELECT COUNT(*) FROM t')
+
+        assert estimate == {'bytes': None, 'cost': 1520.01}
+        assert execute_query.call_args[0][0] == 'EXPLAIN SELECT COUNT(*) FROM t'
+
+
+class TestTableMetadata:
+
+    def test_postgresql_metadata_from_stats(self, connection_manager):
+        """Les métadonnées viennent de pg_stat_user_tables, sans lire la table"""
+        stats = pd.DataFrame(
+            [{'row_count': 1200, 'size_bytes': 81920, 'last_modified': None}]
+        )
+        with patch.object(
+            connection_manager, 'execute_query', return_value=stats
+        ) as execute_query:
+            metadata = connection_manager.get_table_metadata('orders')
+
+        assert metadata == {'row_count': 1200, 'size_bytes': 81920, 'last_modified': None}
+        assert 'pg_stat_user_tables' in execute_query.call_args[0][0]
+        assert 'FROM public.orders' not in execute_query.call_args[0][0]
+
+
+class TestMaterializedSamples:
+
+    def test_materialize_and_drop_sample(self, connection_manager):
+        """La table d'échantillon est créée puis supprimée en fin de run"""
+        with patch.object(connection_manager, 'execute_sql') as execute_sql:
+            table_name = connection_manager.materialize_sample(
+                'customers', 'public.customers TABLESAMPLE BERNOULLI (10.000000)'
+            )
+
+            assert table_name.startswith('qc2plus_sample_customers_')
+            assert connection_manager.get_materialized_sample('customers') == table_name
+            create_sql = execute_sql.call_args[0][0]
+            assert create_sql.startswith(f'CREATE TABLE public.{table_name} AS SELECT *')
+            assert execute_sql.call_args.kwargs['use_data_source'] is True
+
+            connection_manager.drop_run_tables()
+
+            assert execute_sql.call_args[0][0] == f'DROP TABLE IF EXISTS public.{table_name}'
+            assert connection_manager.get_materialized_sample('customers') is None
+
+
+class TestDuckDBSource:
+
+    @pytest.fixture
+    def parquet_profiles(self, tmp_path):
+        """Profil 'parquet' pointant sur un répertoire de fichiers locaux"""
+        duckdb = pytest.importorskip('duckdb')
+        pytest.importorskip('duckdb_engine')
+
+        conn = duckdb.connect()
+        conn.execute(f"""
+            COPY (SELECT * FROM (VALUES (1, 'a@b.com'), (2, NULL), (3, 'bad-email'))
+                  t(customer_id, email))
+            TO '{tmp_path / 'customers.parquet'}' (FORMAT PARQUET)
+        """)
+        conn.close()
+        (tmp_path / 'countries.csv').write_text('id,name\n10,France\n11,Spain\n')
+
+        return {
+            'test': {
+                'outputs': {
+                    'local': {
+                        'type': 'parquet',
+                        'directory': str(tmp_path),
+                        'schema': 'staging',
+                    }
+                }
+            }
+        }
+
+    def test_level1_tests_on_local_files(self, parquet_profiles):
+        """Les tests Level 1 s'exécutent en local sur des fichiers Parquet et CSV"""
+        from qc2plus.level1.engine import Level1Engine
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            assert connection_manager.db_type == 'duckdb'
+            assert connection_manager.get_row_count('countries') == 2
+
+            results = Level1Engine(connection_manager).run_tests('customers', [
+                {'not_null': {'column_name': 'email'}},
+                {'email_format': {'column_name': 'email'}},
+                {'unique': {'column_name': 'customer_id'}},
+            ])
+
+        assert results['not_null_email']['failed_rows'] == 1
+        assert results['not_null_email']['total_rows'] == 3
+        assert results['email_format_email']['failed_rows'] == 1
+        assert results['unique_customer_id']['passed'] is True
+
+    def test_query_timeout_interrupts_duckdb(self, parquet_profiles):
+        """Le timeout interrompt la requête DuckDB en cours"""
+        from qc2plus.core.connection import QueryTimeoutError
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            with pytest.raises(QueryTimeoutError):
+                connection_manager.execute_query(
+                    'SELECT COUNT(*) FROM range(100000000000) a', timeout_seconds=0.2
+                )
+            # The pooled connection is still usable afterwards
+            assert len(connection_manager.execute_query('SELECT 1 AS x')) == 1
+
+    def test_fail_fast_cancels_running_queries(self, parquet_profiles):
+        """L'annulation interrompt la requête en cours et bloque les suivantes"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from qc2plus.core.connection import QueryCancelledError
+        from qc2plus.level1.engine import Level1Engine
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(
+                    connection_manager.execute_query,
+                    'SELECT COUNT(*) FROM range(100000000000) a',
+                )
+                while not connection_manager._running_queries:
+                    time.sleep(0.01)
+                start = time.time()
+                assert connection_manager.cancel_running_queries() == 1
+                with pytest.raises(QueryCancelledError):
+                    future.result()
+            assert time.time() - start < 5
+
+            results = Level1Engine(connection_manager).run_tests(
+                'customers', [{'not_null': {'column_name': 'email'}}]
+            )
+            assert results['not_null_email']['status'] == 'cancelled'
+
+            connection_manager.reset_cancellation()
+            assert len(connection_manager.execute_query('SELECT 1 AS x')) == 1
+
+    def test_batched_tests_match_individual_runs(self, parquet_profiles):
+        """Les tests regroupés en un seul UNION ALL donnent les mêmes résultats"""
+        from qc2plus.level1.engine import Level1Engine
+
+        models = {
+            'customers': {'qc2plus_tests': {'level1': [
+                {'not_null': {'column_name': 'email'}},
+                {'email_format': {'column_name': 'email'}},
+                {'unique': {'column_name': 'customer_id'}},
+                {'accepted_values': {'column_name': 'email', 'accepted_values': ['a@b.com']}},
+            ]}},
+            'countries': {'qc2plus_tests': {'level1': [
+                {'range_check': {'column_name': 'id', 'min_value': 11}},
+            ]}},
+        }
+        compared = ('passed', 'failed_rows', 'total_rows')
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            engine = Level1Engine(connection_manager)
+            expected = {
+                name: engine.run_tests(name, config['qc2plus_tests']['level1'])
+                for name, config in models.items()
+            }
+
+            engine.prepare_run(models)
+            with patch.object(
+                connection_manager, 'execute_query', wraps=connection_manager.execute_query
+            ) as execute_query:
+                assert engine.run_batches(models, batch_size=3) == 5
+                assert execute_query.call_count == 2
+
+                results = {
+                    name: engine.run_tests(name, config['qc2plus_tests']['level1'])
+                    for name, config in models.items()
+                }
+                assert execute_query.call_count == 2
+
+        for name, model_results in expected.items():
+            for test_name, result in model_results.items():
+                batched = results[name][test_name]
+                assert {k: batched[k] for k in compared} == {k: result[k] for k in compared}
+
+    def test_batches_grouped_by_timeout_and_timeouts_not_rerun(self, parquet_profiles):
+        """Seuls les tests de même timeout partagent un lot ; un lot expiré n'est pas relancé"""
+        from qc2plus.core.connection import QueryTimeoutError
+        from qc2plus.level1.engine import Level1Engine
+
+        models = {
+            'customers': {'qc2plus_tests': {'level1': [
+                {'not_null': {'column_name': 'email'}},
+                {'email_format': {'column_name': 'email', 'timeout_seconds': 5}},
+                {'unique': {'column_name': 'customer_id', 'timeout_seconds': 5}},
+                {'accepted_values': {
+                    'column_name': 'email', 'accepted_values': ['a@b.com'], 'timeout_seconds': 10,
+                }},
+            ]}},
+        }
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            engine = Level1Engine(connection_manager)
+            execute_batch = connection_manager.execute_batch
+            timeouts = []
+
+            def _execute_batch(queries, timeout_seconds=None):
+                timeouts.append((timeout_seconds, len(queries)))
+                if timeout_seconds == 5:
+                    raise QueryTimeoutError('canceling statement due to statement timeout')
+                return execute_batch(queries, timeout_seconds=timeout_seconds)
+
+            engine.prepare_run(models)
+            with patch.object(connection_manager, 'execute_batch', side_effect=_execute_batch):
+                assert engine.run_batches(models, batch_size=10) == 4
+            assert sorted(timeouts, key=str) == [(10, 1), (5, 2), (None, 1)]
+
+            with patch.object(
+                connection_manager, 'execute_query', wraps=connection_manager.execute_query
+            ) as execute_query:
+                results = engine.run_tests('customers', models['customers']['qc2plus_tests']['level1'])
+                assert execute_query.call_count == 0
+
+        assert results['email_format_email']['status'] == 'timeout'
+        assert results['unique_customer_id']['status'] == 'timeout'
+        assert results['not_null_email']['failed_rows'] == 1
+        assert 'status' not in results['accepted_values_email']
+
+    def test_sharded_tests_match_whole_runs(self, parquet_profiles):
+        """Les tests découpés en shards donnent les mêmes comptes que le test entier"""
+        from qc2plus.level1.engine import Level1Engine
+
+        tests = [
+            {'not_null': {'column_name': 'email'}},
+            {'email_format': {'column_name': 'email'}},
+            {'unique': {'column_name': 'customer_id'}},
+        ]
+        sharded_tests = [
+            {test_type: {**params, 'shard_by': {'column': 'customer_id', 'shards': 3}}}
+            for test in tests
+            for test_type, params in test.items()
+        ]
+
+        with ConnectionManager(parquet_profiles, 'local') as connection_manager:
+            connection_manager.execute_sql(
+                "CREATE TABLE staging.orders AS "
+                "SELECT range AS order_id, range % 7 AS customer_id, "
+                "CASE WHEN range % 5 = 0 THEN NULL ELSE 'x' || range END AS email, "
+                "DATE '2024-01-01' + CAST(range % 30 AS INTEGER) AS created_at "
+                "FROM range(200)",
+                use_data_source=True,
+            )
+            engine = Level1Engine(connection_manager, max_workers=2)
+            expected = engine.run_tests('orders', tests)
+
+            # Tests and their shards share the pool of the engine
+            threads = set()
+            run_single_test = engine._run_single_test
+
+            def _run_single_test(*args, **kwargs):
+                threads.add(threading.current_thread().name.split('_')[0])
+                return run_single_test(*args, **kwargs)
+
+            with patch.object(engine, '_run_single_test', side_effect=_run_single_test):
+                results = engine.run_tests(
+                    'orders', sharded_tests, model_config={'level1_concurrency': 3}
+                )
+            assert threads <= {'MainThread', 'qc2plus-level1'}
+            by_date = engine.run_tests('orders', [{'not_null': {
+                'column_name': 'email', 'shard_by': {'column': 'created_at', 'shards': 4},
+            }}])
+
+        for test_name, result in expected.items():
+            assert results[test_name]['shards'] == 3
+            for key in ('passed', 'failed_rows', 'total_rows'):
+                assert results[test_name][key] == result[key]
+        assert by_date['not_null_email']['failed_rows'] == expected['not_null_email']['failed_rows']
+        assert "created_at < '2024-01-08'" in by_date['not_null_email']['query']
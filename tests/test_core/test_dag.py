@@ -0,0 +1,38 @@
+# tests/test_core/test_dag.py
+"""
+Tests pour qc2plus.core.dag (graphe des dépendances entre modèles)
+"""
+
+import pytest
+
+from qc2plus.core.dag import ModelGraph
+
+
+def _model(depends_on=None, tests=1):
+    return {
+        "depends_on": depends_on,
+        "qc2plus_tests": {"level1": [{"not_null": {"column_name": "id"}}] * tests},
+    }
+
+
+class TestModelGraph:
+
+    def test_order_and_critical_path(self):
+        """Les modèles suivent leurs dépendances, pondérés par la chaîne la plus lourde"""
+        graph = ModelGraph({
+            "customers": _model(tests=2),
+            "products": _model(),
+            "orders": _model(["customers", "products", "not_selected"], tests=3),
+            "revenue": _model(["orders"]),
+        })
+
+        order = graph.order
+        assert order.index("customers") < order.index("orders") < order.index("revenue")
+        assert graph.dependencies["orders"] == {"customers", "products"}
+        assert graph.weights == {"revenue": 1, "orders": 4, "customers": 6, "products": 5}
+        assert graph.descendants("customers") == {"orders", "revenue"}
+
+    def test_cycle_raises(self):
+        """Une dépendance circulaire est refusée avant l'exécution"""
+        with pytest.raises(ValueError, match="a, b"):
+            ModelGraph({"a": _model(["b"]), "b": _model(["a"]), "c": _model()})
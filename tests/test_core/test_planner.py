@@ -0,0 +1,115 @@
+# tests/test_core/test_planner.py
+"""
+Tests pour qc2plus.core.planner (estimation du coût et budget par run)
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from qc2plus.core.planner import QueryPlanner
+from qc2plus.level1.engine import Level1Engine
+
+
+def _entry(test, cost, level="level1", sampled=False):
+    return {
+        "model": "orders",
+        "level": level,
+        "test": test,
+        "sampled": sampled,
+        "samplable": level == "level1" and not sampled,
+        "queries": [],
+        "bytes": None,
+        "cost": cost,
+        "error": None,
+    }
+
+
+@pytest.fixture
+def planner(mock_connection_manager):
+    return QueryPlanner(
+        mock_connection_manager, Level1Engine(mock_connection_manager), {}
+    )
+
+
+class TestQueryPlanner:
+
+    def test_plan_ranks_tests_by_cost(self, planner, mock_connection_manager):
+        """Chaque test est compilé puis estimé, le plus coûteux en premier"""
+        mock_connection_manager.estimate_query_cost.side_effect = [
+            {"bytes": None, "cost": 10.0},
+            {"bytes": None, "cost": 500.0},
+        ]
+        models = {
+            "orders": {
+                "qc2plus_tests": {
+                    "level1": [
+                        {"not_null": {"column_name": "id"}},
+                        {"unique": {"column_name": "id"}},
+                    ]
+                }
+            }
+        }
+
+        entries = planner.plan(models, level="1")
+
+        assert [entry["test"] for entry in entries] == ["unique_id", "not_null_id"]
+        assert entries[0]["cost"] == 500.0
+        assert "public.orders" in entries[0]["queries"][0]
+
+    def test_budget_skips_most_expensive_tests(self, planner):
+        """Les tests sont admis du moins coûteux au plus coûteux"""
+        entries = [
+            _entry("unique_id", 600.0),
+            _entry("not_null_id", 100.0),
+            _entry("correlation", 300.0, level="level2"),
+            _entry("email_format_email", None),
+        ]
+
+        decisions = planner.apply_budget(entries, max_cost=500)
+
+        assert decisions == {("orders", "level1", "unique_id"): {"action": "skip", "cost": 600.0}}
+
+    def test_budget_samples_over_budget_test(self, planner):
+        """En mode sample, le test hors budget est échantillonné sur le budget restant"""
+        entries = [_entry("not_null_id", 100.0), _entry("unique_id", 800.0)]
+
+        decisions = planner.apply_budget(entries, max_cost=500, action="sample")
+
+        assert decisions[("orders", "level1", "unique_id")] == {
+            "action": "sample",
+            "fraction": 0.5,
+            "cost": 800.0,
+        }
+
+    def test_budget_skips_already_sampled_test(self, planner):
+        """Un test déjà échantillonné n'est pas rééchantillonné"""
+        entries = [_entry("unique_id", 800.0, sampled=True)]
+
+        decisions = planner.apply_budget(entries, max_cost=500, action="sample")
+
+        assert decisions[("orders", "level1", "unique_id")]["action"] == "skip"
+
+    @pytest.mark.parametrize("db_type, unique_action", [("postgresql", "sample"), ("redshift", "skip")])
+    def test_only_tests_cheaper_on_a_sample_are_sampled(
+        self, planner, mock_connection_manager, db_type, unique_action
+    ):
+        """Seuls les tests qu'un échantillon rend moins coûteux sont échantillonnés (pas sur Redshift)"""
+        mock_connection_manager.db_type = db_type
+        mock_connection_manager.estimate_query_cost.return_value = {"bytes": None, "cost": 800.0}
+        models = {"orders": {"qc2plus_tests": {"level1": [
+            {"not_null": {"column_name": "id"}},
+            {"relationship": {
+                "column_name": "id", "reference_table": "customers", "reference_column": "id",
+            }},
+            {"unique": {"column_name": "id"}},
+        ]}}}
+
+        entries = planner.plan(models, level="1")
+        decisions = planner.apply_budget(entries, max_cost=500, action="sample")
+
+        assert {key[2]: decision["action"] for key, decision in decisions.items()} == {
+            "not_null_id": "skip",
+            "relationship_id": "skip",
+            "unique_id": unique_action,
+        }
@@ -0,0 +1,595 @@
+# tests/test_core/test_runner.py
+"""
+Tests pour qc2plus.core.runner (cache des résultats, ordonnancement des modèles et des tests,
+résultats en flux, exécution asyncio)
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+import yaml
+
+from qc2plus.core.dag import ModelGraph
+from qc2plus.core.project import QC2PlusProject
+from qc2plus.core.runner import QC2PlusRunner
+
+
+def _write_customers(path, rows):
+    import duckdb
+
+    values = ", ".join(f"({customer_id}, {email})" for customer_id, email in rows)
+    conn = duckdb.connect()
+    conn.execute(f"""
+        COPY (SELECT *, DATE '2024-01-01' AS created_at
+              FROM (VALUES {values}) t(customer_id, email))
+        TO '{path}' (FORMAT PARQUET)
+    """)
+    conn.close()
+
+
+@pytest.fixture
+def cached_runner(tmp_path):
+    """Projet DuckDB dont le modèle customers utilise le cache de résultats"""
+    pytest.importorskip('duckdb')
+    pytest.importorskip('duckdb_engine')
+
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    _write_customers(data_dir / 'customers.parquet', [(1, "'a@b.com'"), (2, 'NULL')])
+
+    project_dir = tmp_path / 'project'
+    (project_dir / 'models').mkdir(parents=True)
+    (project_dir / 'profiles.yml').write_text(yaml.dump({
+        'test': {
+            'outputs': {
+                'local': {'type': 'parquet', 'directory': str(data_dir), 'schema': 'staging'}
+            }
+        }
+    }))
+    (project_dir / 'models' / 'customers.yml').write_text(yaml.dump({
+        'models': [{
+            'name': 'customers',
+            'result_cache': {'max_age_hours': 24, 'fingerprint_column': 'customer_id'},
+            'qc2plus_tests': {
+                'level1': [
+                    {'not_null': {'column_name': 'email'}},
+                    {'future_date': {'column_name': 'created_at'}},
+                ]
+            },
+        }]
+    }))
+
+    runner = QC2PlusRunner(
+        QC2PlusProject(str(project_dir)), 'local', profiles_dir=str(project_dir)
+    )
+    yield runner, data_dir
+    runner.connection_manager.close()
+
+
+@pytest.fixture
+def mocked_runner(tmp_path, monkeypatch):
+    """Runner construit par son constructeur, sur un gestionnaire de connexion mocké"""
+    project_dir = tmp_path / 'mocked_project'
+    (project_dir / 'models').mkdir(parents=True)
+    (project_dir / 'profiles.yml').write_text(yaml.dump({
+        'test': {'outputs': {'dev': {'type': 'postgresql', 'schema': 'public'}}}
+    }))
+    connection_manager = Mock(
+        db_type='postgresql',
+        max_concurrent_per_table=None,
+        batch_size=None,
+        run_cancelled=False,
+    )
+    monkeypatch.setattr(
+        'qc2plus.core.runner.ConnectionManager', Mock(return_value=connection_manager)
+    )
+    return QC2PlusRunner(
+        QC2PlusProject(str(project_dir)), 'dev', profiles_dir=str(project_dir)
+    )
+
+
+def _empty_results(**summary):
+    return {"total_tests": 0, "passed_tests": 0, "failed_tests": 0,
+            "critical_failures": 0, "models": {}, **summary}
+
+
+class TestResultCache:
+
+    def test_unchanged_table_reuses_results(self, cached_runner, monkeypatch):
+        """Une table inchangée réutilise les résultats précédents, sauf les tests liés à la date"""
+        runner, _ = cached_runner
+        first = runner.run(level='1')
+        assert 'cached' not in first['models']['customers']['level1']['not_null_email']
+
+        calls = []
+        run_tests = runner.level1_engine.run_tests
+        monkeypatch.setattr(
+            runner.level1_engine,
+            'run_tests',
+            lambda model, tests, **kwargs: calls.append(tests) or run_tests(model, tests, **kwargs),
+        )
+        second = runner.run(level='1')
+
+        level1 = second['models']['customers']['level1']
+        assert level1['not_null_email']['cached'] is True
+        assert level1['not_null_email']['failed_rows'] == 1
+        assert 'cached' not in level1['future_date_created_at']
+        assert calls == [[{'future_date': {'column_name': 'created_at'}}]]
+        assert second['failed_tests'] == first['failed_tests'] == 1
+
+    def test_cached_results_persisted_as_cached(self, cached_runner, monkeypatch):
+        """Les résultats réutilisés du cache sont enregistrés avec le statut 'cached'"""
+        runner, _ = cached_runner
+        runner.run(level='1')
+
+        persisted = []
+        monkeypatch.setattr(
+            runner.persistence_manager, '_batch_insert_test_results', persisted.extend
+        )
+        monkeypatch.setattr(runner.persistence_manager, 'save_run_summary', lambda results: None)
+        runner.run(level='1')
+
+        statuses = {record['test_name']: record['status'] for record in persisted}
+        assert statuses == {'not_null_email': 'cached', 'future_date_created_at': 'passed'}
+
+    def test_changed_table_or_expired_cache_reruns(self, cached_runner, monkeypatch):
+        """Un changement des données ou un cache trop ancien relance tous les tests"""
+        runner, data_dir = cached_runner
+        runner.run(level='1')
+
+        _write_customers(
+            data_dir / 'customers.parquet',
+            [(1, "'a@b.com'"), (2, "'c@d.com'"), (3, "'e@f.com'")],
+        )
+        changed = runner.run(level='1')['models']['customers']['level1']
+        assert 'cached' not in changed['not_null_email']
+        assert changed['not_null_email']['passed'] is True
+
+        get_cached_results = runner.connection_manager.get_cached_results
+
+        def _two_days_old(*args):
+            entry = get_cached_results(*args)
+            return {**entry, 'cached_at': entry['cached_at'] - pd.Timedelta(days=2)}
+
+        monkeypatch.setattr(runner.connection_manager, 'get_cached_results', _two_days_old)
+        expired = runner.run(level='1')['models']['customers']['level1']
+        assert 'cached' not in expired['not_null_email']
+
+
+class TestDagScheduler:
+
+    @pytest.mark.parametrize("threads", [1, 4])
+    def test_downstream_models_skipped_after_critical_failure(self, mocked_runner, threads):
+        """Les modèles en aval d'un échec critique ne sont pas testés"""
+        models = {
+            "customers": {"qc2plus_tests": {}},
+            "products": {"qc2plus_tests": {}},
+            "orders": {"depends_on": ["customers", "products"], "qc2plus_tests": {}},
+            "revenue": {"depends_on": ["orders"], "qc2plus_tests": {}},
+            "stock": {"depends_on": ["products"], "qc2plus_tests": {}},
+        }
+        tested = []
+
+        def _test_model(model_name, model_config, level):
+            tested.append(model_name)
+            return {
+                "status": "success",
+                "has_critical_failure": model_name == "customers",
+                "level1": {},
+                "level2": {},
+            }
+
+        mocked_runner._test_model = _test_model
+        results = mocked_runner._run_dag(
+            models, ModelGraph(models), "all", False, threads, _empty_results()
+        )
+
+        assert sorted(tested) == ["customers", "products", "stock"]
+        assert results["models"]["orders"]["status"] == "skipped"
+        assert results["models"]["revenue"]["status"] == "skipped"
+        assert "customers" in results["models"]["revenue"]["message"]
+
+    @pytest.mark.parametrize("threads", [1, 4])
+    def test_skipped_models_never_run_their_batches(self, cached_runner, monkeypatch, threads):
+        """Les lots d'un modèle sont exécutés avec lui : un modèle sauté n'interroge pas la base"""
+        runner, data_dir = cached_runner
+        _write_customers(data_dir / 'orders.parquet', [(1, "'a@b.com'")])
+        critical = {'column_name': 'email', 'severity': 'critical'}
+        runner.project.get_models = lambda: {
+            'customers': {'qc2plus_tests': {'level1': [
+                {'not_null': critical}, {'email_format': {'column_name': 'email'}},
+            ]}},
+            'orders': {'depends_on': ['customers'], 'qc2plus_tests': {'level1': [
+                {'not_null': critical}, {'unique': {'column_name': 'customer_id'}},
+            ]}},
+        }
+        runner.connection_manager.batch_size = 10
+
+        batches = []
+        execute_batch = runner.connection_manager.execute_batch
+
+        def _execute_batch(queries, timeout_seconds=None):
+            batches.append(list(queries.values()))
+            return execute_batch(queries, timeout_seconds=timeout_seconds)
+
+        monkeypatch.setattr(runner.connection_manager, 'execute_batch', _execute_batch)
+        results = runner.run(level='1', threads=threads)
+
+        assert len(batches) == 1 and all('orders' not in sql for sql in batches[0])
+        assert results['models']['customers']['level1']['not_null_email']['failed_rows'] == 1
+        assert results['models']['orders']['status'] == 'skipped'
+
+
+class TestTestQueue:
+
+    def test_tests_of_all_models_share_one_queue(self, mocked_runner):
+        """Chaque test est une tâche, limitée par table, regroupée ensuite par modèle"""
+        models = {
+            "orders": {"qc2plus_tests": {
+                "level1": [{"not_null": {"column_name": f"col{i}"}} for i in range(6)],
+                "level2": {"temporal_analysis": {"date_column": "created_at"}},
+            }},
+            "customers": {"qc2plus_tests": {
+                "level1": [{"unique": {"column_name": "id", "severity": "critical"}}],
+            }},
+        }
+        lock = threading.Lock()
+        running = {"orders": 0, "customers": 0}
+        peak = {"orders": 0, "customers": 0}
+
+        def _run_tests(model_name, level1_tests, model_config=None, on_result=None):
+            with lock:
+                running[model_name] += 1
+                peak[model_name] = max(peak[model_name], running[model_name])
+            time.sleep(0.05)
+            with lock:
+                running[model_name] -= 1
+            test_type, test_params = next(iter(level1_tests[0].items()))
+            return {
+                f"{test_type}_{test_params['column_name']}": {
+                    "passed": model_name == "orders",
+                    "severity": test_params.get("severity", "medium"),
+                }
+            }
+
+        runner = mocked_runner
+        runner.connection_manager.max_concurrent_per_table = 2
+        runner.level1_engine.run_tests = _run_tests
+        runner._run_level2_tests = lambda model_name, config: {
+            "temporal": {"passed": True, "anomalies_count": 0}
+        }
+
+        results = runner._run_test_queue(models, "all", False, 4, _empty_results())
+
+        assert peak["orders"] == 2
+        assert list(results["models"]["orders"]["level1"]) == [
+            f"not_null_col{i}" for i in range(6)
+        ]
+        assert results["models"]["orders"]["level2"]["temporal"]["passed"] is True
+        assert results["models"]["customers"]["has_critical_failure"] is True
+        assert results["total_tests"] == 8
+        assert results["critical_failures"] == 1
+
+    def test_fail_fast_on_first_failed_task_keeps_every_model(self, mocked_runner):
+        """Fail-fast s'arrête au premier test critique et garde tous les modèles, tests restants annulés"""
+        models = {
+            "orders": {"qc2plus_tests": {"level1": [
+                {"unique": {"column_name": "id", "severity": "critical"}},
+            ] + [{"not_null": {"column_name": f"col{i}"}} for i in range(3)]}},
+            "customers": {"qc2plus_tests": {"level1": [
+                {"not_null": {"column_name": f"col{i}"}} for i in range(10)
+            ]}},
+        }
+
+        def _run_tests(model_name, level1_tests, model_config=None, on_result=None):
+            test_type, test_params = next(iter(level1_tests[0].items()))
+            if test_type == "not_null":
+                time.sleep(0.1)
+            return {
+                f"{test_type}_{test_params['column_name']}": {
+                    "passed": test_type != "unique",
+                    "severity": test_params.get("severity", "medium"),
+                }
+            }
+
+        runner = mocked_runner
+        runner.level1_engine.run_tests = _run_tests
+
+        results = runner._run_test_queue(
+            models, "1", True, 2, _empty_results(status="success")
+        )
+
+        assert results["status"] == "critical_failure"
+        runner.connection_manager.cancel_running_queries.assert_called_once()
+        assert sorted(results["models"]) == ["customers", "orders"]
+        orders = results["models"]["orders"]
+        assert orders["has_critical_failure"] is True
+        assert [result.get("status") for result in orders["level1"].values()] == [
+            None, "cancelled", "cancelled", "cancelled"
+        ]
+        customers = results["models"]["customers"]["level1"]
+        assert len(customers) == 10
+        assert sum(result.get("status") == "cancelled" for result in customers.values()) == 9
+        assert results["total_tests"] == 2
+        assert results["critical_failures"] == 1
+
+
+class TestIterRun:
+
+    def test_results_streamed_persisted_in_batches_and_alerted(self, cached_runner, monkeypatch):
+        """Les résultats arrivent au fil de l'eau, sont persistés par lots et les échecs critiques alertés aussitôt"""
+        runner, _ = cached_runner
+        models = {
+            f"model_{i}": {"qc2plus_tests": {"level1": [{"not_null": {"column_name": "id"}}]}}
+            for i in range(5)
+        }
+        monkeypatch.setattr(runner, "_select_models", lambda names: models)
+        monkeypatch.setattr(runner, "_test_model", lambda name, config, level: {
+            "status": "success",
+            "has_critical_failure": name == "model_1",
+            "level1": {"not_null_id": {
+                "passed": name != "model_1",
+                "severity": "critical",
+                "message": "1 null",
+            }},
+            "level2": {},
+        })
+        calls = []
+        monkeypatch.setattr(
+            runner.persistence_manager, "save_test_results",
+            lambda results: calls.append(("batch", sorted(results["models"]))),
+        )
+        monkeypatch.setattr(
+            runner.persistence_manager, "save_run_summary",
+            lambda results: calls.append(("run", len(results["models"]))),
+        )
+        monkeypatch.setattr(
+            runner.alert_manager, "send_critical_alerts",
+            lambda results: calls.append(("critical", sorted(results["models"]))),
+        )
+        monkeypatch.setattr(
+            runner.alert_manager, "send_alerts",
+            lambda results, individual=True: calls.append(("summary", sorted(results["models"]))),
+        )
+
+        events = list(runner.iter_run(level="1", persist_batch_size=2))
+
+        tests = [event for event in events if event["type"] == "test"]
+        assert [event["model"] for event in tests] == [f"model_{i}" for i in range(5)]
+        assert calls == [
+            ("critical", ["model_1"]),
+            ("batch", ["model_0", "model_1"]),
+            ("batch", ["model_2", "model_3"]),
+            ("batch", ["model_4"]),
+            ("run", 5),
+            ("summary", ["model_1"]),
+        ]
+
+        summary = events[-1]
+        assert summary["type"] == "run"
+        assert summary["total_tests"] == 5
+        assert summary["critical_failures"] == 1
+        assert "level1" not in summary["models"]["model_0"]
+
+    @pytest.mark.parametrize("run_options", [{}, {"granularity": "test", "threads": 2}])
+    def test_test_events_and_alerts_before_model_is_done(self, cached_runner, monkeypatch, run_options):
+        """Un test terminé est émis et alerté sans attendre les autres tests de son modèle"""
+        runner, _ = cached_runner
+        monkeypatch.setattr(runner, "_select_models", lambda names: {"customers": {
+            "qc2plus_tests": {"level1": [
+                {"not_null": {"column_name": "email", "severity": "critical"}},
+                {"future_date": {"column_name": "created_at"}},
+            ]},
+        }})
+        monkeypatch.setattr(runner.persistence_manager, "save_test_results", lambda results: None)
+        monkeypatch.setattr(runner.persistence_manager, "save_run_summary", lambda results: None)
+        monkeypatch.setattr(runner.alert_manager, "send_alerts", lambda results, individual=True: None)
+        alerted = []
+        monkeypatch.setattr(
+            runner.alert_manager, "send_critical_alerts",
+            lambda results: alerted.extend(results["models"]["customers"]["level1"]),
+        )
+
+        # future_date attend que not_null_email ait été reçu par le consommateur
+        received = threading.Event()
+        seen_before_second_test = []
+        run_single_test = runner.level1_engine._run_single_test
+
+        def _run_single_test(model_name, test_type, test_params, **kwargs):
+            if test_type == "future_date":
+                seen_before_second_test.append(received.wait(timeout=5))
+                seen_before_second_test.append(list(alerted))
+            return run_single_test(model_name, test_type, test_params, **kwargs)
+
+        monkeypatch.setattr(runner.level1_engine, "_run_single_test", _run_single_test)
+
+        events = []
+        for event in runner.iter_run(level="1", **run_options):
+            events.append(event)
+            if event.get("test") == "not_null_email":
+                received.set()
+
+        assert seen_before_second_test == [True, ["not_null_email"]]
+        assert alerted == ["not_null_email"]
+        assert [(event["type"], event.get("test")) for event in events] == [
+            ("test", "not_null_email"),
+            ("test", "future_date_created_at"),
+            ("model", None),
+            ("run", None),
+        ]
+
+    @pytest.mark.parametrize("flush_seconds, persisted_early", [
+        (30, [["email_format_email", "not_null_email"]]),
+        (0, [["not_null_email"], ["email_format_email"]]),
+    ])
+    def test_tests_persisted_before_model_is_done(
+        self, cached_runner, monkeypatch, flush_seconds, persisted_early
+    ):
+        """Les tests sont persistés par lots pleins (ou trop anciens) sans attendre la fin du modèle"""
+        runner, _ = cached_runner
+        monkeypatch.setattr("qc2plus.core.runner.PERSIST_FLUSH_SECONDS", flush_seconds)
+        monkeypatch.setattr(runner, "_select_models", lambda names: {"customers": {
+            "qc2plus_tests": {"level1": [
+                {"not_null": {"column_name": "email"}},
+                {"email_format": {"column_name": "email"}},
+                {"future_date": {"column_name": "created_at"}},
+            ]},
+        }})
+        persisted = []
+        monkeypatch.setattr(
+            runner.persistence_manager, "save_test_results",
+            lambda results: persisted.append(sorted(results["models"]["customers"]["level1"])),
+        )
+        monkeypatch.setattr(runner.persistence_manager, "save_run_summary", lambda results: None)
+        monkeypatch.setattr(runner.alert_manager, "send_alerts", lambda results, individual=True: None)
+
+        persisted_before_last_test = []
+        run_single_test = runner.level1_engine._run_single_test
+
+        def _run_single_test(model_name, test_type, test_params, **kwargs):
+            if test_type == "future_date":
+                persisted_before_last_test.extend(persisted)
+            return run_single_test(model_name, test_type, test_params, **kwargs)
+
+        monkeypatch.setattr(runner.level1_engine, "_run_single_test", _run_single_test)
+        list(runner.iter_run(level="1", persist_batch_size=2))
+
+        assert persisted_before_last_test == persisted_early
+        assert persisted == persisted_early + [["future_date_created_at"]]
+
+
+class TestArun:
+
+    def test_arun_runs_tests_on_asyncio(self, cached_runner):
+        """arun produit les mêmes résultats que run"""
+        runner, _ = cached_runner
+        results = asyncio.run(runner.arun(level='1'))
+
+        level1 = results['models']['customers']['level1']
+        assert list(level1) == ['not_null_email', 'future_date_created_at']
+        assert level1['not_null_email']['failed_rows'] == 1
+        assert level1['future_date_created_at']['passed'] is True
+        assert results['total_tests'] == 2
+        assert results['failed_tests'] == 1
+
+    def test_fail_fast_cancels_other_coroutines(self, mocked_runner):
+        """Un échec critique annule les tests en cours des autres modèles"""
+        models = {
+            "orders": {"qc2plus_tests": {
+                "level1": [{"unique": {"column_name": "id", "severity": "critical"}}],
+            }},
+            "customers": {"qc2plus_tests": {
+                "level1": [{"not_null": {"column_name": f"col{i}"}} for i in range(50)],
+            }},
+        }
+
+        async def arun_test(model_name, test_type, test_params, model_config=None):
+            if model_name == "orders":
+                await asyncio.sleep(0.1)
+                return {"passed": False, "severity": "critical"}
+            await asyncio.sleep(30)
+            return {"passed": True}
+
+        runner = mocked_runner
+        runner.level1_engine.arun_test = arun_test
+
+        start = time.time()
+        results = asyncio.run(
+            runner._arun_models(models, None, "1", True, 1000, _empty_results())
+        )
+
+        assert time.time() - start < 5
+        runner.connection_manager.cancel_running_queries.assert_called_once()
+        customers = results["models"]["customers"]["level1"]
+        assert len(customers) == 50
+        assert {result["status"] for result in customers.values()} == {"cancelled"}
+        assert results["critical_failures"] == 1
+        assert results["total_tests"] == 1
+
+
+class TestResume:
+
+    @pytest.mark.parametrize("journal", ["database", "file"])
+    def test_resume_runs_only_tests_not_journaled(self, cached_runner, monkeypatch, tmp_path, journal):
+        """Une reprise n'exécute que les tests non journalisés et fusionne les résultats"""
+        runner, _ = cached_runner
+        if journal == "file":
+            runner.journal_dir = tmp_path / 'journal'
+
+        run_tests = runner.level1_engine.run_tests
+        run_single_test = runner.level1_engine._run_single_test
+
+        def _connection_lost(model, test_type, params, **kwargs):
+            if test_type == 'future_date':
+                raise ConnectionError('connection lost')
+            return run_single_test(model, test_type, params, **kwargs)
+
+        def _crash(results):
+            crashed.append(results['run_id'])
+            raise RuntimeError('process killed')
+
+        crashed = []
+        monkeypatch.setattr(runner.level1_engine, '_run_single_test', _connection_lost)
+        monkeypatch.setattr(runner, '_finish_run', _crash)
+        with pytest.raises(RuntimeError):
+            runner.run(level='1')
+        monkeypatch.undo()
+        if journal == "file":
+            runner.journal_dir = tmp_path / 'journal'
+            assert (tmp_path / 'journal' / f'{crashed[0]}.jsonl').exists()
+
+        calls = []
+        monkeypatch.setattr(
+            runner.level1_engine,
+            'run_tests',
+            lambda model, tests, **kwargs: calls.append(tests) or run_tests(model, tests, **kwargs),
+        )
+        results = runner.run(level='1', resume=crashed[0])
+
+        assert calls == [[{'future_date': {'column_name': 'created_at'}}]]
+        assert results['run_id'] == crashed[0]
+        level1 = results['models']['customers']['level1']
+        assert level1['not_null_email']['failed_rows'] == 1
+        assert level1['future_date_created_at']['passed'] is True
+        assert results['total_tests'] == 2
+        assert results['failed_tests'] == 1
+
+    def test_tests_journaled_before_their_model_is_done(self, cached_runner, monkeypatch, tmp_path):
+        """Un arrêt brutal au milieu d'un modèle garde les tests déjà terminés"""
+        runner, _ = cached_runner
+        runner.journal_dir = tmp_path / 'journal'
+
+        class _Killed(BaseException):
+            pass
+
+        run_single_test = runner.level1_engine._run_single_test
+        run_ids = []
+
+        def _killed(model, test_type, params, **kwargs):
+            if test_type == 'future_date':
+                run_ids.extend(path.stem for path in runner.journal_dir.glob('*.jsonl'))
+                raise _Killed()
+            return run_single_test(model, test_type, params, **kwargs)
+
+        monkeypatch.setattr(runner.level1_engine, '_run_single_test', _killed)
+        with pytest.raises(_Killed):
+            runner.run(level='1')
+        monkeypatch.undo()
+        runner.journal_dir = tmp_path / 'journal'
+
+        calls = []
+        run_tests = runner.level1_engine.run_tests
+        monkeypatch.setattr(
+            runner.level1_engine,
+            'run_tests',
+            lambda model, tests, **kwargs: calls.append(tests) or run_tests(model, tests, **kwargs),
+        )
+        results = runner.run(level='1', resume=run_ids[0])
+
+        assert calls == [[{'future_date': {'column_name': 'created_at'}}]]
+        assert results['models']['customers']['level1']['not_null_email']['failed_rows'] == 1
+        assert results['total_tests'] == 2
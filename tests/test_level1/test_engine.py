@@ -3,7 +3,11 @@
 Tests pour qc2plus.level1.engine
 """
 
+import threading
+import time
+
 import pytest
+import pandas as pd
 from qc2plus.level1.engine import Level1Engine
 
 
@@ -68,3 +72,346 @@ class TestLevel1Engine:
         assert results['unique_customer_id']['passed'] == True
 
 
+
+    def test_compile_fused_tests(self):
+        """Test compilation d'une requête fusionnée pour les tests ligne à ligne"""
+        engine = Level1Engine()
+
+        sql = engine.compile_fused_tests(
+            'customers',
+            [
+                ('not_null', {'column_name': 'email'}),
+                ('accepted_values', {'column_name': 'status', 'accepted_values': ['active', 'inactive']}),
+            ]
+        )
+
+        assert sql.count('public.customers') == 1
+        assert 'failed_rows_0' in sql
+        assert 'failed_rows_1' in sql
+        assert "'inactive'" in sql
+
+    def test_run_tests_fused(self, mock_connection_manager):
+        """Test exécution fusionnée : une seule requête pour les tests ligne à ligne"""
+        mock_connection_manager.execute_query.return_value = pd.DataFrame([{
+            'total_rows': 100,
+            'failed_rows_0': 0, 'example_0': None,
+            'failed_rows_1': 3, 'example_1': 'unknown',
+        }])
+        engine = Level1Engine(mock_connection_manager)
+
+        test_configs = [
+            {'not_null': {'column_name': 'email', 'severity': 'critical'}},
+            {'accepted_values': {'column_name': 'status', 'accepted_values': ['active']}},
+            {'unique': {'column_name': 'customer_id'}},
+        ]
+
+        results = engine.run_tests('customers', test_configs, model_config={'fused': True})
+
+        # 1 fused query + 1 query for the unique test
+        assert mock_connection_manager.execute_query.call_count == 2
+        assert list(results) == ['not_null_email', 'accepted_values_status', 'unique_customer_id']
+        assert results['not_null_email']['passed'] is True
+        assert results['not_null_email']['total_rows'] == 100
+        assert results['accepted_values_status']['passed'] is False
+        assert results['accepted_values_status']['failed_rows'] == 3
+
+    def test_rendered_sql_is_memoized(self):
+        """Test cache LRU du SQL rendu et compteurs hits/misses"""
+        engine = Level1Engine(sql_cache_size=2)
+        params = {'column_name': 'customer_id', 'severity': 'critical'}
+
+        first = engine.compile_test('unique', params, 'customers')
+        second = engine.compile_test('unique', dict(params), 'customers')
+
+        assert first == second
+        assert engine.get_cache_stats()['hits'] == 1
+        assert engine.get_cache_stats()['misses'] == 1
+
+        # Different parameters are rendered separately
+        engine.compile_test('unique', params, 'orders')
+        engine.compile_test('not_null', params, 'customers')
+        stats = engine.get_cache_stats()
+        assert stats['misses'] == 3
+        assert stats['size'] == 2  # least recently used entry evicted
+
+    def test_run_tests_concurrently_keeps_order(self, mock_connection_manager):
+        """Test exécution concurrente intra-modèle : ordre et limite respectés"""
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'max_in_flight': 0}
+
+        def slow_query(sql, *args, **kwargs):
+            with lock:
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            time.sleep(0.05)
+            with lock:
+                state['in_flight'] -= 1
+            return pd.DataFrame()
+
+        mock_connection_manager.execute_query.side_effect = slow_query
+        mock_connection_manager.max_concurrent_queries = None
+        engine = Level1Engine(mock_connection_manager)
+
+        test_configs = [
+            {'not_null': {'column_name': f'col_{i}'}} for i in range(6)
+        ]
+
+        results = engine.run_tests(
+            'customers', test_configs, model_config={'level1_concurrency': 3}
+        )
+
+        assert list(results) == [f'not_null_col_{i}' for i in range(6)]
+        assert all(result['passed'] for result in results.values())
+        assert 1 < state['max_in_flight'] <= 3
+
+    def test_run_tests_timeout(self, mock_connection_manager):
+        """Test timeout : le test est marqué 'timeout' et le timeout du test est prioritaire"""
+        from qc2plus.core.connection import QueryTimeoutError
+
+        mock_connection_manager.execute_query.side_effect = QueryTimeoutError(
+            'Query exceeded timeout of 5s'
+        )
+        engine = Level1Engine(mock_connection_manager)
+
+        results = engine.run_tests(
+            'orders',
+            [{'relationship': {
+                'column_name': 'customer_id', 'reference_table': 'customers',
+                'reference_column': 'id', 'timeout_seconds': 5,
+            }}],
+            model_config={'timeout_seconds': 60},
+        )
+
+        result = results['relationship_customer_id']
+        assert result['passed'] is False
+        assert result['status'] == 'timeout'
+        assert mock_connection_manager.execute_query.call_args.kwargs['timeout_seconds'] == 5
+
+    def test_run_tests_materialized_sample(self, mock_connection_manager):
+        """Test échantillon matérialisé : tiré une fois et lu par tous les tests"""
+        samples = {}
+
+        def materialize_sample(model_name, sample_clause):
+            samples[model_name] = 'qc2plus_sample_customers_1234abcd'
+            return samples[model_name]
+
+        mock_connection_manager.materialize_sample.side_effect = materialize_sample
+        mock_connection_manager.get_materialized_sample.side_effect = samples.get
+        mock_connection_manager.get_row_count.return_value = 100
+        engine = Level1Engine(mock_connection_manager)
+
+        results = engine.run_tests(
+            'customers',
+            [
+                {'not_null': {'column_name': 'email'}},
+                {'unique': {'column_name': 'customer_id'}},
+            ],
+            model_config={
+                'sample': {'method': 'random', 'percentage': 0.1},
+                'materialize_sample': True,
+            },
+        )
+
+        assert mock_connection_manager.materialize_sample.call_count == 1
+        sample_clause = mock_connection_manager.materialize_sample.call_args[0][1]
+        assert 'TABLESAMPLE BERNOULLI' in sample_clause
+
+        for result in results.values():
+            assert 'public.qc2plus_sample_customers_1234abcd' in result['query']
+            assert 'TABLESAMPLE' not in result['query']
+
+    def test_run_tests_incremental(self, mock_connection_manager):
+        """Test incrémental : seules les nouvelles lignes sont lues et les comptes cumulés"""
+        from datetime import datetime
+
+        test_params = {'column_name': 'email', 'incremental': {'column': 'id'}}
+        engine = Level1Engine(mock_connection_manager)
+        saved = {}
+
+        mock_connection_manager.get_incremental_state.side_effect = (
+            lambda model, test: saved.get((model, test))
+        )
+        mock_connection_manager.save_incremental_state.side_effect = (
+            lambda model, test, state: saved.__setitem__((model, test), state)
+        )
+
+        # First run: full scan of 100 rows, 2 violations
+        mock_connection_manager.execute_query.side_effect = [
+            pd.DataFrame([{'high_water_mark': 100, 'new_rows': 100}]),
+            pd.DataFrame([{'failed_rows': 2, 'total_rows': 100}]),
+        ]
+        result = engine.run_tests('customers', [{'not_null': test_params}])['not_null_email']
+        assert result['incremental']['full_refresh'] is True
+        assert result['failed_rows'] == 2
+        assert saved[('customers', 'not_null_email')]['high_water_mark'] == 100
+
+        # Second run: 10 new rows above the high-water mark, 1 violation
+        mock_connection_manager.execute_query.side_effect = [
+            pd.DataFrame([{'high_water_mark': 110, 'new_rows': 10}]),
+            pd.DataFrame([{'failed_rows': 1, 'total_rows': 10}]),
+        ]
+        result = engine.run_tests('customers', [{'not_null': test_params}])['not_null_email']
+        watermark_sql = mock_connection_manager.execute_query.call_args_list[-2][0][0]
+        assert 'WHERE id > 100' in watermark_sql
+        assert 'id > 100 AND id <= 110' in result['query']
+        assert result['incremental']['full_refresh'] is False
+        assert result['failed_rows'] == 3
+        assert result['total_rows'] == 110
+        assert result['passed'] is False
+
+        # Periodic full refresh once the state is too old
+        saved[('customers', 'not_null_email')]['last_full_refresh'] = datetime(2000, 1, 1)
+        mock_connection_manager.execute_query.side_effect = [
+            pd.DataFrame([{'high_water_mark': 120, 'new_rows': 120}]),
+            pd.DataFrame(),
+        ]
+        result = engine.run_tests('customers', [{'not_null': test_params}])['not_null_email']
+        assert result['incremental']['full_refresh'] is True
+        assert result['passed'] is True
+        assert result['total_rows'] == 120
+
+    def test_relationship_tests_share_reference_key_set(self, mock_connection_manager):
+        """Test relations partagées : un seul ensemble de clés pour la même référence"""
+        mock_connection_manager.get_reference_key_set.return_value = 'qc2plus_keys_customers_id_1234abcd'
+        engine = Level1Engine(mock_connection_manager)
+
+        relationship = lambda column: {'relationship': {
+            'column_name': column, 'reference_table': 'customers', 'reference_column': 'id',
+        }}
+        models = {
+            'orders': {'qc2plus_tests': {'level1': [relationship('customer_id')]}},
+            'invoices': {'qc2plus_tests': {'level1': [
+                relationship('customer_id'), relationship('payer_id'),
+            ]}},
+            'products': {'qc2plus_tests': {'level1': [{'relationship': {
+                'column_name': 'brand_id', 'reference_table': 'brands', 'reference_column': 'id',
+            }}]}},
+        }
+        engine.prepare_run(models)
+
+        results = {
+            name: engine.run_tests(name, config['qc2plus_tests']['level1'])
+            for name, config in models.items()
+        }
+
+        assert list(results['invoices']) == ['relationship_customer_id', 'relationship_payer_id']
+        for model in ('orders', 'invoices'):
+            for result in results[model].values():
+                assert 'public.qc2plus_keys_customers_id_1234abcd' in result['query']
+        # A reference used by a single test keeps the plain join
+        assert 'public.brands' in results['products']['relationship_brand_id']['query']
+        mock_connection_manager.get_reference_key_set.assert_called_with('customers', 'id')
+
+    @pytest.mark.parametrize('approx_distinct, exact_run', [(995, False), (900, True)])
+    def test_run_tests_approximate_unique(self, mock_connection_manager, approx_distinct, exact_run):
+        """Test unique approximatif : la liste exacte des doublons n'est lancée qu'en cas de doute"""
+        mock_connection_manager.db_type = 'snowflake'
+        mock_connection_manager.get_row_count.return_value = 1000
+        mock_connection_manager.execute_query.side_effect = [
+            pd.DataFrame([{'non_null_rows': 1000, 'approx_distinct': approx_distinct, 'total_rows': 1000}]),
+            pd.DataFrame(),
+        ]
+        engine = Level1Engine(mock_connection_manager)
+
+        results = engine.run_tests(
+            'events', [{'unique': {'column_name': 'event_id', 'approximate': True}}]
+        )
+
+        result = results['unique_event_id']
+        assert result['passed'] is True
+        first_query = mock_connection_manager.execute_query.call_args_list[0][0][0]
+        assert 'APPROX_COUNT_DISTINCT(event_id)' in first_query
+        assert mock_connection_manager.execute_query.call_count == (2 if exact_run else 1)
+        assert ('approximate' in result) is not exact_run
+
+    def test_run_tests_metadata_only(self, mock_connection_manager):
+        """Tests de métadonnées : aucune requête sur les données de la table"""
+        mock_connection_manager.get_table_metadata.return_value = {
+            'row_count': 700,
+            'size_bytes': 5 * 1024**2,
+            'last_modified': pd.Timestamp.now(tz='UTC') - pd.Timedelta(hours=30),
+        }
+        mock_connection_manager.get_last_test_result.return_value = {'total_rows': 1000}
+        mock_connection_manager.db_type = 'snowflake'
+        engine = Level1Engine(mock_connection_manager)
+
+        results = engine.run_tests('events', [
+            {'freshness': {'column_name': 'updated_at', 'max_age_days': 1, 'metadata': True}},
+            {'row_count_change': {'max_decrease': 0.2}},
+            {'table_size': {'min_rows': 500, 'max_bytes': 10 * 1024**2}},
+        ])
+
+        mock_connection_manager.execute_query.assert_not_called()
+        assert results['freshness_updated_at']['passed'] is False
+        assert results['row_count_change_test']['passed'] is False
+        assert results['row_count_change_test']['total_rows'] == 700
+        assert 'dropped from 1000 to 700' in results['row_count_change_test']['message']
+        assert results['table_size_test']['passed'] is True
+        mock_connection_manager.get_last_test_result.assert_called_with(
+            'events', 'row_count_change_test'
+        )
+
+    @pytest.mark.parametrize('db_type', ['postgresql', 'redshift'])
+    def test_metadata_freshness_scans_without_modification_time(
+        self, mock_connection_manager, caplog, db_type
+    ):
+        """Sans date de modification dans le catalogue, freshness metadata lit MAX(column_name)"""
+        mock_connection_manager.db_type = db_type
+        mock_connection_manager.execute_query.return_value = pd.DataFrame([{
+            'failed_rows': 1, 'total_rows': 1, 'examples': None,
+        }])
+        engine = Level1Engine(mock_connection_manager)
+        tests = [{'freshness': {'column_name': 'updated_at', 'max_age_days': 1, 'metadata': True}}]
+
+        engine.prepare_run({'events': {'qc2plus_tests': {'level1': tests}}})
+        result = engine.run_tests('events', tests)['freshness_updated_at']
+
+        mock_connection_manager.get_table_metadata.assert_not_called()
+        assert 'MAX(updated_at)' in mock_connection_manager.execute_query.call_args[0][0]
+        assert 'error' not in result
+        assert result['passed'] is False
+        assert f'No modification time in the {db_type} catalog' in caplog.text
+
+    def test_run_tests_statistical_threshold_snapshots(self, mock_connection_manager):
+        """Snapshots : seuls les jours absents de l'historique et le jour courant sont lus"""
+        from datetime import date, timedelta
+
+        today = date.today()
+        config_hash = {}
+
+        def get_metric_snapshots(model_name, test_name, since):
+            # 28 days already stored, yesterday is missing
+            return pd.DataFrame([
+                {'metric_date': today - timedelta(days=i),
+                 'metric_value': 100.0 + i % 2, 'config_hash': config_hash.get('value')}
+                for i in range(2, 31)
+            ])
+
+        def save_metric_snapshots(model_name, test_name, hash_value, snapshots):
+            config_hash['value'] = hash_value
+            config_hash['saved'] = snapshots
+
+        mock_connection_manager.get_metric_snapshots.side_effect = get_metric_snapshots
+        mock_connection_manager.save_metric_snapshots.side_effect = save_metric_snapshots
+        mock_connection_manager.execute_query.return_value = pd.DataFrame([
+            {'metric_date': today - timedelta(days=1), 'metric_value': 101.0},
+            {'metric_date': today, 'metric_value': 500.0},
+        ])
+        engine = Level1Engine(mock_connection_manager)
+        tests = [{'statistical_threshold': {
+            'metric': 'count', 'threshold_type': 'relative', 'threshold_value': 2.0,
+            'window_days': 30, 'snapshots': True,
+        }}]
+
+        # First run: no snapshot matches the configuration, the window is computed
+        engine.run_tests('orders', tests)
+        assert len(config_hash['saved']) == 30
+
+        result = engine.run_tests('orders', tests)['statistical_threshold_test']
+
+        query = mock_connection_manager.execute_query.call_args[0][0]
+        assert f"'{today - timedelta(days=1)}'" in query
+        assert config_hash['saved'] == [(today - timedelta(days=1), 101.0)]
+        assert result['passed'] is False
+        assert result['snapshots']['history_days'] == 30
+        assert 'current=500.00' in result['message']
@@ -0,0 +1,175 @@
+# tests/test_level1/test_macros.py
+"""
+Tests de non-régression pour qc2plus.level1.macros
+
+Les macros sont exécutées sur une base DuckDB en mémoire et leurs résultats
+comparés aux valeurs produites par les versions précédentes des templates.
+"""
+
+import pytest
+
+from qc2plus.level1.engine import Level1Engine
+
+duckdb = pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def duckdb_conn():
+    """Base DuckDB en mémoire avec un jeu de données contenant des violations"""
+    conn = duckdb.connect()
+    conn.execute("CREATE SCHEMA public")
+    conn.execute("""
+        CREATE TABLE public.customers AS SELECT * FROM (VALUES
+            (1, 'a@b.com', 'active', 25, DATE '2020-01-01', 10),
+            (2, 'bad-email', 'active', -3, DATE '2999-01-01', 11),
+            (2, NULL, 'deleted', 130, DATE '2021-05-01', 99),
+            (3, 'c@d.org', NULL, NULL, NULL, NULL),
+            (4, 'Lyon', 'pending', 40, DATE '2998-01-01', 98)
+        ) t(customer_id, email, status, age, signup_date, country_id)
+    """)
+    conn.execute("CREATE TABLE public.countries AS SELECT * FROM (VALUES (10), (11), (12)) t(id)")
+    yield conn
+    conn.close()
+
+
+FAILING_CASES = [
+    ('unique', {'column_name': 'customer_id'}, 1, {'2'}),
+    ('not_null', {'column_name': 'email'}, 1, {'Row positions: 1'}),
+    ('email_format', {'column_name': 'email'}, 2, {'bad-email', 'Lyon'}),
+    ('accepted_values', {'column_name': 'status', 'accepted_values': ['active', 'pending']}, 1, {'deleted'}),
+    ('range_check', {'column_name': 'age', 'min_value': 0, 'max_value': 120}, 2, {'-3', '130'}),
+    ('future_date', {'column_name': 'signup_date'}, 2, {'2999-01-01', '2998-01-01'}),
+    ('relationship', {'column_name': 'country_id', 'reference_table': 'countries', 'reference_column': 'id'}, 2, {'99', '98'}),
+]
+
+PASSING_CASES = [
+    ('unique', {'column_name': 'email'}),
+    ('not_null', {'column_name': 'customer_id'}),
+    ('accepted_values', {'column_name': 'status', 'accepted_values': ['active', 'pending', 'deleted']}),
+    ('range_check', {'column_name': 'age', 'min_value': -10}),
+    ('relationship', {'column_name': 'customer_id', 'reference_table': 'customers', 'reference_column': 'customer_id'}),
+]
+
+# Échantillon par partition (inscriptions 2020-2021, 2 lignes sur 5) : les
+# exemples viennent de l'échantillon, les comptages de toute la table
+PARTITION_SAMPLE = {
+    'partitioned_by': 'signup_date',
+    'partition_strategy': 'range',
+    'partition_start': '2020-01-01',
+    'partition_end': '2021-12-31',
+}
+
+SAMPLED_FAILING_CASES = [
+    ('not_null', {'column_name': 'email'}, 1, {'Row positions: 1'}),
+    ('accepted_values', {'column_name': 'status', 'accepted_values': ['active', 'pending']}, 1, {'deleted'}),
+    ('range_check', {'column_name': 'age', 'min_value': 0, 'max_value': 120}, 2, {'130'}),
+    ('relationship', {'column_name': 'country_id', 'reference_table': 'countries', 'reference_column': 'id'}, 2, {'99'}),
+    # Violations absentes de l'échantillon : le test échoue sans exemple
+    ('email_format', {'column_name': 'email'}, 2, {''}),
+    ('future_date', {'column_name': 'signup_date'}, 2, {''}),
+]
+
+def _examples(invalid_examples):
+    """Extrait l'ensemble des exemples (l'ordre de STRING_AGG n'est pas garanti)"""
+    if invalid_examples.startswith('Row positions'):
+        return {invalid_examples}
+    values = invalid_examples.split(': ', 1)[-1]
+    return set(values.split(', '))
+
+
+class TestSQLMacros:
+
+    @pytest.mark.parametrize('test_type,params,failed_rows,examples', FAILING_CASES)
+    def test_failing_macro_results(self, duckdb_conn, test_type, params, failed_rows, examples):
+        """Les macros retournent le même nombre de violations et les mêmes exemples"""
+        sql = Level1Engine().compile_test(test_type, params, 'customers')
+
+        rows = duckdb_conn.execute(sql).df().to_dict('records')
+
+        assert len(rows) == 1
+        assert rows[0]['column_name'] == params['column_name']
+        assert rows[0]['failed_rows'] == failed_rows
+        assert rows[0]['total_rows'] == 5
+        assert _examples(rows[0]['invalid_examples']) == examples
+
+    @pytest.mark.parametrize('test_type,params', PASSING_CASES)
+    def test_passing_macro_returns_no_rows(self, duckdb_conn, test_type, params):
+        """Aucune ligne n'est retournée quand il n'y a pas de violation"""
+        sql = Level1Engine().compile_test(test_type, params, 'customers')
+
+        assert len(duckdb_conn.execute(sql).df()) == 0
+
+    @pytest.mark.parametrize('test_type', ['not_null', 'email_format', 'accepted_values', 'range_check', 'future_date'])
+    def test_row_count_computed_once(self, test_type):
+        """Le comptage total de la table n'apparaît qu'une seule fois"""
+        params = {'column_name': 'col', 'accepted_values': ['a'], 'min_value': 0}
+        sql = Level1Engine().compile_test(test_type, params, 'customers')
+
+        assert sql.count('COUNT(*) AS total_rows') == 1
+        assert sql.count('public.customers') == 2
+
+    def test_cached_total_rows_is_inlined(self, duckdb_conn):
+        """Le nombre de lignes connu du cache remplace le COUNT(*) de la table"""
+        sql = Level1Engine().compile_test(
+            'not_null', {'column_name': 'email'}, 'customers', total_rows=5
+        )
+
+        assert 'COUNT(*) AS total_rows' not in sql
+        assert sql.count('public.customers') == 1
+
+        rows = duckdb_conn.execute(sql).df().to_dict('records')
+        assert rows[0]['failed_rows'] == 1
+        assert rows[0]['total_rows'] == 5
+
+    def test_relationship_against_key_set(self, duckdb_conn):
+        """Le test de relation donne le même résultat sur l'ensemble de clés partagé"""
+        duckdb_conn.execute(
+            "CREATE TABLE public.country_keys AS SELECT DISTINCT id FROM public.countries"
+        )
+        params = {
+            'column_name': 'country_id', 'reference_table': 'countries',
+            'reference_column': 'id', 'reference_keys_table': 'country_keys',
+        }
+        sql = Level1Engine().compile_test('relationship', params, 'customers')
+
+        assert 'public.country_keys' in sql
+        rows = duckdb_conn.execute(sql).df().to_dict('records')
+        assert rows[0]['failed_rows'] == 2
+        assert _examples(rows[0]['invalid_examples']) == {'99', '98'}
+
+    @pytest.mark.parametrize('test_type,params,failed_rows,examples', SAMPLED_FAILING_CASES)
+    def test_sampled_counts_cover_the_table(self, duckdb_conn, test_type, params, failed_rows, examples):
+        """Avec un échantillon, les exemples viennent de l'échantillon et les comptages de toute la table"""
+        sql = Level1Engine().compile_test(
+            test_type, params, 'customers', sample_config=PARTITION_SAMPLE
+        )
+
+        rows = duckdb_conn.execute(sql).df().to_dict('records')
+
+        assert len(rows) == 1
+        assert rows[0]['failed_rows'] == failed_rows
+        assert rows[0]['total_rows'] == 5
+        assert _examples(rows[0]['invalid_examples']) == examples
+
+    def test_sampled_unique_counts_sampled_duplicates(self, duckdb_conn):
+        """Les doublons d'un test unique sont cherchés dans l'échantillon seulement"""
+        sql = Level1Engine().compile_test(
+            'unique', {'column_name': 'customer_id'}, 'customers', sample_config=PARTITION_SAMPLE
+        )
+
+        assert len(duckdb_conn.execute(sql).df()) == 0
+
+    def test_materialized_sample_counts_the_model(self, duckdb_conn):
+        """Un échantillon matérialisé fournit les exemples, le modèle les comptages"""
+        duckdb_conn.execute(
+            "CREATE TABLE public.customers_sample AS SELECT * FROM public.customers WHERE customer_id = 2"
+        )
+        sql = Level1Engine().compile_test(
+            'range_check', {'column_name': 'age', 'min_value': 0, 'max_value': 120},
+            'customers_sample', count_source='customers',
+        )
+
+        rows = duckdb_conn.execute(sql).df().to_dict('records')
+        assert rows[0]['failed_rows'] == 2
+        assert rows[0]['total_rows'] == 5
+        assert _examples(rows[0]['invalid_examples']) == {'-3', '130'}
@@ -0,0 +1,152 @@
+# tests/test_level1/test_utils.py
+"""
+Tests pour qc2plus.level1.utils (construction des clauses d'échantillonnage)
+"""
+
+import pytest
+
+from qc2plus.level1.utils import build_sample_clause
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+class TestBuildSampleClause:
+    """Tests de build_sample_clause"""
+
+    def test_no_sampling(self):
+        """Sans configuration, la table complète est lue"""
+        assert build_sample_clause(None, "public", "customers") == "public.customers"
+
+    @pytest.mark.parametrize(
+        "db_type, expected",
+        [
+            ("postgresql", "FROM public.customers TABLESAMPLE BERNOULLI (10.000000)"),
+            ("snowflake", "FROM public.customers SAMPLE BERNOULLI (10.000000)"),
+            ("bigquery", "FROM public.customers TABLESAMPLE SYSTEM (10.000000 PERCENT)"),
+        ],
+    )
+    def test_native_percentage_sampling(self, db_type, expected):
+        """Le pourcentage utilise l'échantillonnage natif, sans tri ni COUNT(*)"""
+        sql = _normalize(
+            build_sample_clause(
+                {"method": "random", "percentage": 0.1}, "public", "customers", db_type
+            )
+        )
+        assert expected in sql
+        assert "ORDER BY" not in sql
+        assert "COUNT(*)" not in sql
+
+    def test_block_sampling(self):
+        """La méthode block utilise TABLESAMPLE SYSTEM"""
+        sql = build_sample_clause(
+            {"method": "block", "percentage": 0.05}, "public", "customers"
+        )
+        assert "TABLESAMPLE SYSTEM (5.000000)" in sql
+
+    def test_redshift_falls_back_to_random_filter(self):
+        """Redshift n'a pas de TABLESAMPLE : un filtre aléatoire en un seul scan"""
+        sql = _normalize(
+            build_sample_clause(
+                {"method": "random", "percentage": 0.1},
+                "public",
+                "customers",
+                "redshift",
+            )
+        )
+        assert "WHERE RANDOM() < 0.1" in sql
+        assert "ORDER BY" not in sql
+
+    def test_size_with_row_count_uses_native_sampling(self):
+        """Une taille est convertie en taux grâce au nombre de lignes connu"""
+        sql = _normalize(
+            build_sample_clause(
+                {"method": "random", "size": 1000},
+                "public",
+                "customers",
+                row_count=100000,
+            )
+        )
+        assert "TABLESAMPLE BERNOULLI (1.200000)" in sql
+        assert sql.endswith("LIMIT 1000 ) AS sampled_data")
+
+    @pytest.mark.parametrize("size", [1, 10, 100, 1000])
+    def test_small_sizes_oversampled_by_a_wider_margin(self, size):
+        """Pour une petite taille, la marge couvre l'écart type du nombre de lignes tirées"""
+        from qc2plus.level1.utils import _resolve_sample_fraction
+
+        expected = _resolve_sample_fraction({"size": size}, 1000000) * 1000000
+        assert expected >= size * 1.2
+        assert expected - 4 * expected ** 0.5 >= size - 1e-6
+
+    def test_size_without_row_count(self):
+        """Sans nombre de lignes : SAMPLE (n ROWS) sur Snowflake, tri aléatoire ailleurs"""
+        config = {"method": "random", "size": 500}
+        snowflake = build_sample_clause(config, "public", "customers", "snowflake")
+        postgres = build_sample_clause(config, "public", "customers", "postgresql")
+
+        assert "SAMPLE ROW (500 ROWS)" in snowflake
+        assert "ORDER BY RANDOM()" in postgres
+
+    def test_hash_sampling_is_deterministic(self):
+        """L'échantillon hash dépend uniquement de la clé"""
+        config = {
+            "method": "hash",
+            "key": "customer_id",
+            "percentage": 0.1,
+            "partitioned_by": "created_at",
+            "partition_strategy": "range",
+            "partition_start": "2024-01-01",
+            "partition_end": "2024-01-31",
+        }
+        sql = _normalize(build_sample_clause(config, "public", "customers"))
+
+        assert (
+            "created_at BETWEEN '2024-01-01' AND '2024-01-31' AND "
+            "ABS(MOD(CAST(hashtext(CAST(customer_id AS TEXT)) AS BIGINT), 1000)) < 100"
+        ) in sql
+        assert sql == _normalize(build_sample_clause(config, "public", "customers"))
+
+    @pytest.mark.parametrize("db_type", ["postgresql", "snowflake"])
+    def test_filtered_size_sample_takes_size_filtered_rows(self, db_type):
+        """Avec une partition, la taille porte sur les lignes filtrées et non sur la table"""
+        sql = _normalize(
+            build_sample_clause(
+                {"method": "random", "size": 10000, "partitioned_by": "d",
+                 "partition_strategy": "list", "partition_list": ["2024-01-01"]},
+                "public",
+                "events",
+                db_type,
+                row_count=100000000,
+                row_filter="id > 100",
+            )
+        )
+        assert "SAMPLE" not in sql
+        assert "WHERE d IN ('2024-01-01') AND id > 100 ORDER BY RANDOM()" in sql
+        assert sql.endswith("LIMIT 10000 ) AS sampled_data")
+
+    def test_hash_sampling_tiny_fraction_is_not_empty(self):
+        """Une fraction hash minuscule garde au moins un compartiment"""
+        sql = _normalize(
+            build_sample_clause(
+                {"method": "hash", "key": "id", "percentage": 0.0001},
+                "public",
+                "events",
+            )
+        )
+        assert "1000)) < 1 " in sql
+
+    def test_hash_sampling_requires_key(self):
+        """La méthode hash exige une colonne clé"""
+        with pytest.raises(ValueError):
+            build_sample_clause(
+                {"method": "hash", "percentage": 0.1}, "public", "customers"
+            )
+
+    def test_row_filter_without_sampling(self):
+        """Un filtre de lignes seul restreint la table lue"""
+        sql = _normalize(
+            build_sample_clause(None, "public", "orders", row_filter="id > 100")
+        )
+        assert sql == "( SELECT * FROM public.orders WHERE id > 100 ) AS partitioned_data"
@@ -0,0 +1,55 @@
+# tests/test_level2/test_worker.py
+"""
+Tests pour qc2plus.level2.worker (calcul des analyses Level 2 dans des processus)
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qc2plus.level2.temporal import TemporalAnalyzer
+from qc2plus.level2.worker import analysis_failed, compute_analysis, warm_up
+
+
+class TestLevel2Worker:
+
+    def test_process_pool_matches_in_thread_analysis(self, mock_connection_manager):
+        """Le calcul dans un processus donne le même résultat que analyze()"""
+        values = 100 + 10 * np.sin(np.arange(60) * 2 * np.pi / 7)
+        values[45] = 400
+        mock_connection_manager.execute_query.return_value = pd.DataFrame({
+            'period_date': pd.date_range('2024-01-01', periods=60),
+            'count': values,
+        })
+        config = {'metrics': ['count'], 'window_days': 60}
+        analyzer = TemporalAnalyzer(mock_connection_manager)
+
+        expected = analyzer.analyze('orders', config)
+        data = analyzer.fetch_data('orders', config)
+        with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=warm_up,
+        ) as pool:
+            result = pool.submit(compute_analysis, 'temporal', 'orders', config, data).result()
+
+        assert result['passed'] is expected['passed'] is False
+        assert result['anomalies_count'] == expected['anomalies_count']
+        assert result['message'] == expected['message']
+
+    def test_pooled_fetch_error_matches_analyze(self, mock_connection_manager):
+        """Un échec de lecture des données donne le même résultat qu'avec analyze()"""
+        mock_connection_manager.execute_query.side_effect = RuntimeError('relation "orders" does not exist')
+        config = {'metrics': ['count'], 'window_days': 60}
+        analyzer = TemporalAnalyzer(mock_connection_manager)
+
+        expected = analyzer.analyze('orders', config)
+        with pytest.raises(RuntimeError) as error:
+            analyzer.fetch_data('orders', config)
+        result = analysis_failed('temporal', 'orders', error.value)
+
+        assert result == expected
+        assert set(result) == {'passed', 'error', 'anomalies_count', 'message'}
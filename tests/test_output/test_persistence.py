@@ -67,4 +67,33 @@ class TestLevel1Engine:
         
         assert 'unique_customer_id' in results
         assert 'not_null_email' in results
-        assert results['unique_customer_id']['passed'] == True
\ No newline at end of file
+        assert results['unique_customer_id']['passed'] == True
+
+class TestPersistenceManager:
+
+    def test_timeout_status_is_persisted(self, mock_connection_manager):
+        """Les tests interrompus par leur timeout sont enregistrés avec le statut 'timeout'"""
+        from unittest.mock import patch
+        from qc2plus.persistence.persistence import PersistenceManager
+
+        mock_connection_manager.quality_config = {'schema': 'quality'}
+        manager = PersistenceManager(mock_connection_manager)
+        results = {
+            'target': 'dev',
+            'models': {
+                'orders': {
+                    'level1': {
+                        'relationship_customer_id': {
+                            'passed': False, 'status': 'timeout', 'severity': 'critical',
+                        },
+                        'not_null_order_id': {'passed': True},
+                    },
+                },
+            },
+        }
+
+        with patch.object(manager, '_batch_insert_test_results') as batch_insert:
+            manager.save_test_results(results)
+
+        records = batch_insert.call_args[0][0]
+        assert [record['status'] for record in records] == ['timeout', 'passed']